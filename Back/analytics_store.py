@@ -0,0 +1,362 @@
+"""
+Columnar copy of campaigns for the dashboard aggregates.
+
+campaigns is exported to Parquet partitioned by month and platform, in
+hive layout:
+
+    analytics_store/month=2024-11/platform=Google%20Ads/data.parquet
+
+Queries run through DuckDB over that dataset. DuckDB reads only the
+columns a query names and skips partitions that its WHERE clause rules
+out.
+
+Exports are incremental. Each partition has a fingerprint of its rows in
+campaign_daily_rollup, and only partitions whose fingerprint changed are
+rewritten. Fields outside the rollup (Campaign_Name, Location, Ad_ID)
+are not fingerprinted; use --full after bulk edits to those.
+
+With ANALYTICS_BACKEND=parquet, writes reported through data_events
+trigger a re-export ANALYTICS_REFRESH_SECONDS later.
+
+pyarrow and duckdb are only imported when the store is used.
+
+    python analytics_store.py export
+    python analytics_store.py export --full
+"""
+import argparse
+import hashlib
+import json
+import logging
+import os
+import shutil
+import threading
+import time
+import urllib.parse
+from datetime import datetime
+
+import mysql.connector
+import numpy as np
+
+import data_events
+import derived_metrics
+import rollup
+from config import DB_CONFIG, ANALYTICS_BACKEND, ANALYTICS_PARQUET_DIR, ANALYTICS_REFRESH_SECONDS
+
+logger = logging.getLogger(__name__)
+
+MANIFEST_FILE = "_manifest.json"
+PART_FILE = "data.parquet"
+# Hive's name for an empty / NULL partition value; DuckDB reads it as NULL
+NULL_PARTITION = "__HIVE_DEFAULT_PARTITION__"
+UNDATED_MONTH = rollup.UNDATED[:7]
+MONTH_EXPR = f"LEFT({rollup.DATE_EXPR}, 7)"
+
+FETCH_SIZE = 10000
+# Rows per Parquet row group, and the cap on rows buffered across all partitions
+ROW_GROUP_ROWS = 65536
+MAX_BUFFERED_ROWS = 2_000_000
+
+TEXT_COLUMNS = ["Ad_ID", "Campaign_Name", "Device", "Keyword", "Location"]
+INT_COLUMNS = ["Impressions", "Clicks", "Conversions"]
+FLOAT_COLUMNS = ["Cost", "Sale_Amount"]
+EXPORT_SELECT = f"""
+    {MONTH_EXPR}, COALESCE(Platform, ''), {rollup.DATE_EXPR},
+    Ad_ID, Campaign_Name, COALESCE(Device, ''), COALESCE(Keyword, ''), Location,
+    Impressions, Clicks, Conversions, Cost, Sale_Amount
+"""
+
+_export_lock = threading.Lock()
+_last_export = None
+
+
+# ---------------- Layout ----------------
+def partition_dir(root, month, platform):
+    value = urllib.parse.quote(platform, safe="") if platform else NULL_PARTITION
+    return os.path.join(root, f"month={month}", f"platform={value}")
+
+
+def _load_manifest(root):
+    try:
+        with open(os.path.join(root, MANIFEST_FILE)) as f:
+            return json.load(f)
+    except FileNotFoundError:
+        return {}
+
+
+def _save_manifest(root, manifest):
+    tmp = os.path.join(root, MANIFEST_FILE + ".tmp")
+    with open(tmp, "w") as f:
+        json.dump(manifest, f)
+    os.replace(tmp, os.path.join(root, MANIFEST_FILE))
+
+
+def schema():
+    import pyarrow as pa
+    return pa.schema(
+        [("ad_date", pa.date32())]
+        + [(c, pa.string()) for c in TEXT_COLUMNS]
+        + [(c, pa.int64()) for c in INT_COLUMNS]
+        + [(c, pa.float64()) for c in FLOAT_COLUMNS]
+    )
+
+
+def to_table(rows):
+    """Rows of (ad_date, *TEXT_COLUMNS, *INT_COLUMNS, *FLOAT_COLUMNS) -> Arrow table."""
+    import pyarrow as pa
+    cols = list(zip(*rows))
+    n_text = len(TEXT_COLUMNS)
+    arrays = [pa.array(np.array([str(d) for d in cols[0]], dtype="datetime64[D]"))]
+    arrays += [pa.array([None if v is None else str(v) for v in col], pa.string()) for col in cols[1:1 + n_text]]
+    numeric = cols[1 + n_text:]
+    arrays += [pa.array(derived_metrics.as_column(col).astype(np.int64)) for col in numeric[:len(INT_COLUMNS)]]
+    arrays += [pa.array(derived_metrics.as_column(col)) for col in numeric[len(INT_COLUMNS):]]
+    return pa.Table.from_arrays(arrays, schema=schema())
+
+
+class PartitionWriter:
+    """Streams rows into one Parquet file per changed partition, swapped in on close()."""
+
+    def __init__(self, root):
+        self.root = root
+        self._writers = {}
+        self._buffers = {}
+        self._buffered = 0
+        self.rows = 0
+
+    def add(self, key, row):
+        buffer = self._buffers.setdefault(key, [])
+        buffer.append(row)
+        self._buffered += 1
+        if len(buffer) >= ROW_GROUP_ROWS:
+            self._flush(key)
+        elif self._buffered >= MAX_BUFFERED_ROWS:
+            for k in list(self._buffers):
+                self._flush(k)
+
+    def add_table(self, key, table):
+        self._writer(key, table.schema).write_table(table, row_group_size=ROW_GROUP_ROWS)
+        self.rows += table.num_rows
+
+    def _writer(self, key, table_schema):
+        import pyarrow.parquet as pq
+        if key not in self._writers:
+            month, platform = key
+            directory = partition_dir(self.root, month, platform)
+            os.makedirs(directory, exist_ok=True)
+            tmp = os.path.join(directory, PART_FILE + ".tmp")
+            self._writers[key] = (pq.ParquetWriter(tmp, table_schema, compression="zstd"), tmp)
+        return self._writers[key][0]
+
+    def _flush(self, key):
+        rows = self._buffers.pop(key)
+        self._buffered -= len(rows)
+        self.add_table(key, to_table(rows))
+
+    def close(self):
+        for key in list(self._buffers):
+            self._flush(key)
+        for key, (writer, tmp) in self._writers.items():
+            writer.close()
+            os.replace(tmp, os.path.join(os.path.dirname(tmp), PART_FILE))
+        return set(self._writers)
+
+
+# ---------------- Export ----------------
+def partition_fingerprints(cursor):
+    """{(month, platform): digest of that partition's rollup rows}."""
+    cursor.execute(f"""
+        SELECT LEFT(rollup_date, 7), Platform, rollup_date, Device, Keyword,
+               row_count, impressions, clicks, conversions, cost, sale_amount
+        FROM {rollup.ROLLUP_TABLE}
+        ORDER BY rollup_date, Platform, Device, Keyword
+    """)
+    digests = {}
+    for row in cursor.fetchall():
+        digests.setdefault((str(row[0]), row[1]), hashlib.sha1()).update(repr(row[2:]).encode())
+    return {key: d.hexdigest() for key, d in digests.items()}
+
+
+def export(root=ANALYTICS_PARQUET_DIR, full=False):
+    """Rewrite the partitions whose rollup fingerprint changed (all of them with full=True)."""
+    global _last_export
+    with _export_lock:
+        start = time.perf_counter()
+        os.makedirs(root, exist_ok=True)
+        manifest = {tuple(k.split("|", 1)): v for k, v in _load_manifest(root).items()}
+
+        conn = mysql.connector.connect(**DB_CONFIG)
+        cursor = conn.cursor()
+        try:
+            fingerprints = partition_fingerprints(cursor)
+            changed = {k for k, digest in fingerprints.items() if full or manifest.get(k) != digest}
+            removed = set(manifest) - set(fingerprints)
+
+            writer = PartitionWriter(root)
+            if changed:
+                months = {m for m, _ in changed}
+                where = ""
+                if months != {m for m, _ in fingerprints}:
+                    # Month keys come from the rollup (YYYY-MM), safe to inline
+                    where = f"WHERE {MONTH_EXPR} IN ({', '.join(repr(m) for m in sorted(months))})"
+                cursor.execute(f"SELECT {EXPORT_SELECT} FROM campaigns {where}")
+                while True:
+                    rows = cursor.fetchmany(FETCH_SIZE)
+                    if not rows:
+                        break
+                    for row in rows:
+                        key = (str(row[0]), row[1])
+                        if key in changed:
+                            writer.add(key, row[2:])
+            writer.close()
+        finally:
+            cursor.close()
+            conn.close()
+
+        for month, platform in removed:
+            shutil.rmtree(partition_dir(root, month, platform), ignore_errors=True)
+        _save_manifest(root, {f"{m}|{p}": digest for (m, p), digest in fingerprints.items()})
+
+        _last_export = {
+            "partitions": len(fingerprints),
+            "rewritten": len(changed),
+            "removed": len(removed),
+            "rows": writer.rows,
+            "seconds": round(time.perf_counter() - start, 3),
+            "finished_at": datetime.now().isoformat(timespec="seconds")
+        }
+        return _last_export
+
+
+_refresh_timer = None
+_refresh_lock = threading.Lock()
+
+
+def schedule_refresh(campaign_names=None):
+    """data_events listener: re-export changed partitions shortly after a write."""
+    global _refresh_timer
+    with _refresh_lock:
+        if _refresh_timer is not None:
+            return
+        _refresh_timer = threading.Timer(ANALYTICS_REFRESH_SECONDS, _refresh)
+        _refresh_timer.daemon = True
+        _refresh_timer.start()
+
+
+def _refresh():
+    global _refresh_timer
+    with _refresh_lock:
+        _refresh_timer = None
+    try:
+        export()
+    except Exception as e:
+        logger.error(f"Error in analytics_store refresh: {str(e)}")
+
+
+# ---------------- Queries ----------------
+_duckdb = None
+_duckdb_lock = threading.Lock()
+
+
+def _connection():
+    global _duckdb
+    if _duckdb is None:
+        with _duckdb_lock:
+            if _duckdb is None:
+                import duckdb
+                _duckdb = duckdb.connect()
+    return _duckdb
+
+
+def _source(root):
+    pattern = os.path.join(root, "*", "*", PART_FILE).replace("'", "''")
+    return (f"read_parquet('{pattern}', hive_partitioning = true, "
+            f"hive_types = {{'month': VARCHAR, 'platform': VARCHAR}})")
+
+
+def query(sql, params=None, root=ANALYTICS_PARQUET_DIR):
+    """Run DuckDB SQL; `campaigns` in the FROM clause is written as {campaigns}."""
+    cursor = _connection().cursor()  # one cursor per call, DuckDB connections are not thread-safe
+    try:
+        return cursor.execute(sql.replace("{campaigns}", _source(root)), params or []).fetchall()
+    finally:
+        cursor.close()
+
+
+def campaign_totals(root=ANALYTICS_PARQUET_DIR):
+    """(SUM(Sale_Amount), SUM(Cost), SUM(Clicks), SUM(Impressions), SUM(Conversions))."""
+    return query("""
+        SELECT SUM(Sale_Amount), SUM(Cost), SUM(Clicks), SUM(Impressions), SUM(Conversions)
+        FROM {campaigns}
+    """, root=root)[0]
+
+
+def monthly_kpis(root=ANALYTICS_PARQUET_DIR):
+    """Rows of ('Nov 2024', sales, cost, clicks, impressions) for dated months, oldest first."""
+    rows = query("""
+        SELECT month, SUM(Sale_Amount), SUM(Cost), SUM(Clicks), SUM(Impressions)
+        FROM {campaigns}
+        WHERE month > ?
+        GROUP BY month
+        ORDER BY month
+    """, [UNDATED_MONTH], root=root)
+    return [(datetime.strptime(row[0], "%Y-%m").strftime("%b %Y"), *row[1:]) for row in rows]
+
+
+def keyword_conversions(limit=5, root=ANALYTICS_PARQUET_DIR):
+    """(top keywords by conversions, total conversions)."""
+    top = query("""
+        SELECT Keyword, SUM(Conversions) AS total_conversions
+        FROM {campaigns}
+        GROUP BY Keyword
+        ORDER BY total_conversions DESC
+        LIMIT ?
+    """, [limit], root=root)
+    total = query("SELECT SUM(Conversions) FROM {campaigns}", root=root)[0][0]
+    return top, total
+
+
+def device_totals(root=ANALYTICS_PARQUET_DIR):
+    """Rows of (Device, SUM(Impressions), SUM(Conversions))."""
+    return query("""
+        SELECT Device, SUM(Impressions), SUM(Conversions)
+        FROM {campaigns}
+        GROUP BY Device
+    """, root=root)
+
+
+def data_version(root=ANALYTICS_PARQUET_DIR):
+    """Changes whenever an export finishes: the manifest's modification time (0 before the first export)."""
+    try:
+        return os.stat(os.path.join(root, MANIFEST_FILE)).st_mtime_ns
+    except FileNotFoundError:
+        return 0
+
+
+def stats():
+    manifest = _load_manifest(ANALYTICS_PARQUET_DIR)
+    return {
+        "backend": ANALYTICS_BACKEND,
+        "path": ANALYTICS_PARQUET_DIR,
+        "partitions": len(manifest),
+        "last_export": _last_export
+    }
+
+
+if ANALYTICS_BACKEND == "parquet":
+    data_events.subscribe(schedule_refresh)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Maintain the Parquet analytics store")
+    parser.add_argument("command", choices=["export"])
+    parser.add_argument("--full", action="store_true", help="rewrite every partition")
+    parser.add_argument("--path", default=ANALYTICS_PARQUET_DIR)
+    args = parser.parse_args()
+
+    report = export(args.path, full=args.full)
+    print(f"✅ Exported {report['rows']:,} rows: {report['rewritten']} of {report['partitions']} "
+          f"partition(s) rewritten, {report['removed']} removed, in {report['seconds']:.1f}s")
+
+
+if __name__ == "__main__":
+    main()
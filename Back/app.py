@@ -1,715 +1,632 @@
-from flask import Flask, jsonify, request
+from flask import Flask, Response, jsonify, request, stream_with_context
 from flask_cors import CORS
-import mysql.connector
-import numpy as np
 import time
-import requests
+from datetime import datetime, timedelta
 import logging
-import joblib
-from tensorflow.keras.models import load_model
-import os
-from huggingface_hub import InferenceClient
+
+from config import ANALYTICS_BACKEND, DEMO_DELAY_SECONDS, PREDICT_CHUNK_SIZE
+from db_pool import pool_stats
+import analytics_store
+import anomaly
+import budget_optimizer
+import budget_simulator
+import chat
+import datastore
+import derived_metrics
+import data_events
+import json_encoding
+import prediction_cache
+import predictor
+from batcher import QueueFull
+from chat import ChatBusy, ChatTimeout
+from predictor import predict_campaign, predict_rows
+import realtime_metrics
+import realtime_stream
+import request_metrics
+import response_cache
+import rollup
 
 
 logger = logging.getLogger(__name__)
 logging.basicConfig(level=logging.INFO)
 
 app = Flask(__name__)
-CORS(app)
+CORS(app, expose_headers=["X-Next-After"])
+request_metrics.init_app(app)
+json_encoding.init_app(app)
 
 
-def get_db_connection():
-    return mysql.connector.connect(
-        host="localhost",
-        user="root",
-        password="",
-        database="adintelli"
-    )
+def demo_delay():
+    """Artificial latency for demos; disabled unless ADINTELLI_DEMO_DELAY is set."""
+    if DEMO_DELAY_SECONDS > 0:
+        time.sleep(DEMO_DELAY_SECONDS)
 
 
 def calculateROI():
-    conn = mysql.connector.connect(
-        host="localhost",
-        user="root",
-        password="",
-        database="adintelli"
-    )
-    cursor = conn.cursor()
-    cursor.execute("SELECT SUM(Sale_Amount), SUM(Cost) FROM campaigns")
-    total_sales, total_cost = cursor.fetchone()
-    roi = ((total_sales - total_cost) / total_cost) * 100
-    cursor.close()
-    conn.close()
-    return roi
+    totals = datastore.campaign_totals()
+    return derived_metrics.roi(totals.sales, totals.cost)
 
 def calculateCTR():
     """
     CTR = (Total Clicks / Total Impressions) * 100
     """
-    conn = mysql.connector.connect(
-        host="localhost",
-        user="root",
-        password="",
-        database="adintelli"
-    )
-    cursor = conn.cursor()
-    cursor.execute("SELECT SUM(Clicks), SUM(Impressions) FROM campaigns")
-    total_clicks, total_impressions = cursor.fetchone()
-    ctr = (total_clicks / total_impressions) * 100
-    cursor.close()
-    conn.close()
-    return ctr
+    totals = datastore.campaign_totals()
+    return derived_metrics.ctr(totals.clicks, totals.impressions)
 
 def get_total_conversions():
-    conn = mysql.connector.connect(
-        host="localhost",
-        user="root",
-        password="",
-        database="adintelli"
-    )
-    cursor = conn.cursor()
-    cursor.execute("SELECT SUM(Conversions) FROM campaigns")
-    total_conversions = cursor.fetchone()[0]  # single value
-    cursor.close()
-    conn.close()
-    return total_conversions
+    return datastore.campaign_totals().conversions
 
 def calculate_campaign_score():
-    conn = mysql.connector.connect(
-        host="localhost",
-        user="root",
-        password="",
-        database="adintelli"
-    )
-    cursor = conn.cursor()
-    
     # Get total values
-    cursor.execute("SELECT SUM(Sale_Amount), SUM(Cost), SUM(Clicks), SUM(Impressions), SUM(Conversions) FROM campaigns")
-    total_sales, total_cost, total_clicks, total_impressions, total_conversions = cursor.fetchone()
-    
-    # ROI %
-    roi = ((total_sales - total_cost) / total_cost) * 100 if total_cost else 0
-    
-    # CTR %
-    ctr = (total_clicks / total_impressions) * 100 if total_impressions else 0
-    
-    # Conversion Rate %
-    conv_rate = (total_conversions / total_clicks) * 100 if total_clicks else 0
-    
-    # Simple average for Campaign Score
-    campaign_score = (roi + ctr + conv_rate) / 3
-    
-    cursor.close()
-    conn.close()
-    
-    return campaign_score
-
-def get_platform_data():
-    conn = mysql.connector.connect(
-        host="localhost",
-        user="root",
-        password="",
-        database="adintelli"
+    if ANALYTICS_BACKEND == "parquet":
+        totals = [v or 0 for v in analytics_store.campaign_totals()]
+    else:
+        totals = datastore.campaign_totals()
+
+    # Simple average of ROI %, CTR % and Conversion Rate %
+    return derived_metrics.campaign_score(*totals)
+
+def platform_entries(rows):
+    """Rows of (Platform, SUM(Conversions), SUM(Cost), SUM(Clicks)) -> platform cards."""
+    cols = derived_metrics.as_column
+    costs = cols([r[2] for r in rows])
+    cpcs = derived_metrics.cpc(costs, cols([r[3] for r in rows]))
+    return [{
+        "platform": platform or "Unknown",
+        "conversion": conversions or 0,
+        "cost": float(cost),
+        "cpc": float(cpc)
+    } for (platform, conversions, _, _), cost, cpc in zip(rows, costs, cpcs)]
+
+def get_platform_data(start_date=None, end_date=None, top_n=None):
+    """
+    Conversions, cost and CPC for every platform in a single GROUP BY pass.
+    Optionally restricted to an Ad_Date range and the top N platforms by cost.
+    """
+    rows = datastore.platform_totals(start_date, end_date)
+    if top_n:
+        rows = rows[:int(top_n)]
+    return platform_entries(rows)
+
+def get_executive_summary():
+    """
+    All Executive Overview metrics from one aggregate pass over campaigns:
+    ROI, CTR, conversions, campaign score and per-platform data.
+    """
+    return summarize_platforms(datastore.platform_summary())
+
+def summarize_platforms(rows):
+    """Executive summary from per-platform (Platform, sales, cost, clicks, impressions, conversions) rows."""
+    total_sales, total_cost, total_clicks, total_impressions, total_conversions = (
+        derived_metrics.as_column([r[i] for r in rows]).sum() for i in range(1, 6)
     )
-    cursor = conn.cursor()
 
-    platforms = ["Google", "Facebook", "Linkedin", "Twitter"]
-    result = []
+    roi = derived_metrics.roi(total_sales, total_cost)
+    ctr = derived_metrics.ctr(total_clicks, total_impressions)
+    campaign_score = derived_metrics.campaign_score(total_sales, total_cost, total_clicks,
+                                                    total_impressions, total_conversions)
 
-    for platform in platforms:
-        cursor.execute(
-            "SELECT SUM(Conversions), SUM(Cost), SUM(Clicks) FROM campaigns WHERE Platform=%s",
-            (platform,)
-        )
-        total_conversions, total_cost, total_clicks = cursor.fetchone()
-        cpc = (total_cost / total_clicks) if total_clicks else 0
+    platforms = platform_entries([(r[0], r[5], r[2], r[3]) for r in rows])
 
-        result.append({
-            "platform": platform,
-            "conversion": total_conversions or 0,
-            "cost": float(total_cost or 0),
-            "cpc": float(cpc)
-        })
+    return {
+        "roi": float(roi),
+        "ctr": float(ctr),
+        "total_conversions": float(total_conversions),
+        "campaign_score": float(campaign_score),
+        "platforms": platforms
+    }
 
-    cursor.close()
-    conn.close()
-    return result
+@app.route("/getExecutiveSummary", methods=["GET"])
+def executive_summary():
+    demo_delay()
+    return jsonify(get_executive_summary())
+
+@app.route("/getServerStats", methods=["GET"])
+def server_stats():
+    return jsonify({
+        "db_pool": pool_stats(),
+        "predict_batcher": predictor.batcher.stats(),
+        "prediction_cache": prediction_cache.cache.stats(),
+        "realtime_stream": realtime_stream.broadcaster.stats(),
+        "analytics_store": analytics_store.stats(),
+        "chat": chat.service.stats(),
+        "response_cache": response_cache.cache.stats(),
+        "anomaly": anomaly.detector.stats(),
+        "budget_simulator": budget_simulator.simulator.stats(),
+        "budget_optimizer": budget_optimizer.optimizer.stats()
+    })
+
+def metrics_text():
+    """Request metrics, chat reply latency by answer path and response cache outcomes, in Prometheus text format."""
+    return "".join([
+        request_metrics.render(),
+        request_metrics.histogram_text("adintelli_chat_reply_milliseconds", "Chat reply latency by answer path.",
+                                       ["source"], chat.service.latency_ms),
+        request_metrics.counter_text("adintelli_response_cache_total", "Response cache lookups by outcome; not_modified counts the 304s.",
+                                     ["outcome"], response_cache.cache.counts())
+    ])
+
+@app.route("/metrics", methods=["GET"])
+def metrics():
+    return Response(metrics_text(), content_type=request_metrics.CONTENT_TYPE)
 
 @app.route("/getPlatformData", methods=["GET"])
 def platform_data():
-    time.sleep(1)
-    return jsonify(get_platform_data())
+    demo_delay()
+    return jsonify(get_platform_data(
+        start_date=request.args.get("start_date"),
+        end_date=request.args.get("end_date"),
+        top_n=request.args.get("top", type=int)
+    ))
 
 @app.route("/getCampaignScore", methods=["GET"])
 def get_campaign_score():
-    time.sleep(1)
+    demo_delay()
     camp_score = calculate_campaign_score()
     return jsonify({"campaign_score": float(camp_score)})
 
 @app.route("/getConversions", methods=["GET"])
 def total_conversions():
-    time.sleep(1)
+    demo_delay()
     total_cov = get_total_conversions()
     return jsonify({"total_conversions": float(total_cov)})
 
 @app.route('/getROI', methods=['GET'])
 def roi():
-    time.sleep(1)
+    demo_delay()
     roi_value = calculateROI()
     return jsonify({"roi": float(roi_value)})
 
 @app.route('/getCTR', methods=['GET'])
 def get_ctr():
-    time.sleep(1)
+    demo_delay()
     ctr_value = calculateCTR()
     return jsonify({"ctr": float(ctr_value)})
 
 
-@app.route('/getAllCampaigns', methods=['GET'])
-def get_all_campaigns():
-    time.sleep(1)
-    conn = mysql.connector.connect(
-        host="localhost",
-        user="root",
-        password="",
-        database="adintelli"
-    )
-    cursor = conn.cursor(dictionary=True)
+CAMPAIGN_SORT_COLUMNS = {
+    "ad_id": "Ad_ID",
+    "name": "Campaign_Name",
+    "date": "Ad_Date",
+    "cost": "Cost",
+    "sale_amount": "Sale_Amount",
+    "impressions": "Impressions",
+    "clicks": "Clicks",
+    "conversions": "Conversions"
+}
+MAX_PAGE_LIMIT = 5000
+MAX_BATCH_PREDICT = 10000
+STREAM_FETCH_SIZE = 1000
+
+
+def campaign_rows(rows):
+    """Campaign rows with CTR/CPC/ROAS computed column-wise for the whole batch."""
+    derived = derived_metrics.compute(derived_metrics.columns_from_rows(rows))
+    ctr = derived["ctr"].round(2)
+    cpc = derived["cpc"].round(2)
+    roas = derived["roas"].round(2)
+    return [{
+        "ad_id": c['Ad_ID'],
+        "campaign_name": c['Campaign_Name'],
+        "cost": c['Cost'] or 0,
+        "sale_amount": c['Sale_Amount'] or 0,
+        "impressions": c['Impressions'] or 0,
+        "clicks": c['Clicks'] or 0,
+        "conversions": c['Conversions'] or 0,
+        "ctr": float(ctr[i]),
+        "cpc": float(cpc[i]),
+        "roas": float(roas[i])
+    } for i, c in enumerate(rows)]
+
+
+def build_campaigns_query(args, limit):
+    """
+    Keyset-paginated campaigns query from request args.
 
-    cursor.execute("SELECT Campaign_Name, Cost, Sale_Amount, Impressions, Clicks, Conversions FROM campaigns")
-    campaigns = cursor.fetchall()
+    Rows are ordered by (sort column, Ad_ID); `after` is the Ad_ID of the
+    last row of the previous page, so no OFFSET scan is ever needed.
+    """
+    sort_key = args.get("sort", "ad_id")
+    if sort_key not in CAMPAIGN_SORT_COLUMNS:
+        raise ValueError(f"sort must be one of: {', '.join(CAMPAIGN_SORT_COLUMNS)}")
+    sort_col = CAMPAIGN_SORT_COLUMNS[sort_key]
+    descending = args.get("order", "asc").lower() == "desc"
+    cmp = "<" if descending else ">"
+    direction = "DESC" if descending else "ASC"
+
+    conditions = []
+    params = []
+    if args.get("platform"):
+        conditions.append("Platform = %s")
+        params.append(args["platform"])
+    if args.get("start_date"):
+        conditions.append("Ad_Date >= %s")
+        params.append(args["start_date"])
+    if args.get("end_date"):
+        conditions.append("Ad_Date <= %s")
+        params.append(args["end_date"])
+    if args.get("name"):
+        conditions.append("Campaign_Name LIKE %s")
+        params.append(f"%{args['name']}%")
+
+    after = args.get("after")
+    if after:
+        if sort_col == "Ad_ID":
+            conditions.append(f"Ad_ID {cmp} %s")
+            params.append(after)
+        else:
+            conditions.append(
+                f"({sort_col} {cmp} (SELECT {sort_col} FROM campaigns WHERE Ad_ID = %s)"
+                f" OR ({sort_col} = (SELECT {sort_col} FROM campaigns WHERE Ad_ID = %s) AND Ad_ID {cmp} %s))"
+            )
+            params.extend([after, after, after])
+
+    query = "SELECT Ad_ID, Campaign_Name, Cost, Sale_Amount, Impressions, Clicks, Conversions FROM campaigns"
+    if conditions:
+        query += " WHERE " + " AND ".join(conditions)
+    query += f" ORDER BY {sort_col} {direction}"
+    if sort_col != "Ad_ID":
+        query += f", Ad_ID {direction}"
+    if limit:
+        query += " LIMIT %s"
+        params.append(limit)
+    return query, tuple(params)
+
+
+def iter_campaign_batches(query, params):
+    """Yield lists of campaign rows from an unbuffered server-side cursor, one batch at a time."""
+    for rows in datastore.stream_rows(query, params, STREAM_FETCH_SIZE):
+        yield campaign_rows(rows)
+
+
+def stream_json_array(batches):
+    # One encoder call per batch rather than per row
+    yield b"["
+    first = True
+    for batch in batches:
+        if batch:
+            yield (b"" if first else b",") + app.json.dumps_bytes(batch)[1:-1]
+            first = False
+    yield b"]"
+
+
+def stream_ndjson(batches):
+    for batch in batches:
+        yield b"".join(app.json.dumps_bytes(row) + b"\n" for row in batch)
 
-    result = []
-    for c in campaigns:
-        impressions = c['Impressions'] or 0
-        clicks = c['Clicks'] or 0
-        cost = c['Cost'] or 0
-        sale_amount = c['Sale_Amount'] or 0
-        conversions = c['Conversions'] or 0
-
-        # Calculations
-        ctr = (clicks / impressions * 100) if impressions > 0 else 0
-        cpc = (cost / clicks) if clicks > 0 else 0
-        roas = (sale_amount / cost) if cost > 0 else 0
 
-        result.append({
-            "campaign_name": c['Campaign_Name'],
-            "cost": cost,
-            "sale_amount": sale_amount,
-            "impressions": impressions,
-            "clicks": clicks,
-            "conversions": conversions,
-            "ctr": round(ctr, 2),
-            "cpc": round(cpc, 2),
-            "roas": round(roas, 2)
-        })
-
-    cursor.close()
-    conn.close()
-    return jsonify(result)
+@app.route('/getAllCampaigns', methods=['GET'])
+def get_all_campaigns():
+    """
+    Campaigns with derived CTR/CPC/ROAS.
 
-def get_db_connection():
-    return mysql.connector.connect(
-        host="localhost",
-        user="root",
-        password="",
-        database="adintelli"
-    )
+    Query params: limit, after (Ad_ID keyset cursor), sort, order,
+    platform, start_date, end_date, name, format=json|ndjson.
+    With a limit, one page is returned and X-Next-After carries the cursor
+    for the next page; without one, every row is streamed.
+    """
+    demo_delay()
+    limit = request.args.get("limit", type=int)
+    if limit is not None:
+        limit = max(1, min(limit, MAX_PAGE_LIMIT))
+    try:
+        query, params = build_campaigns_query(request.args, limit)
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+
+    ndjson = request.args.get("format") == "ndjson"
+    stream = stream_ndjson if ndjson else stream_json_array
+    mimetype = "application/x-ndjson" if ndjson else "application/json"
+
+    if not limit:
+        body = stream(iter_campaign_batches(query, params))
+        encoding = json_encoding.negotiate(request)
+        if encoding:
+            body = json_encoding.compress_chunks(body, encoding)
+        response = Response(stream_with_context(body), mimetype=mimetype)
+        if encoding:
+            json_encoding.mark_encoded(response, encoding)
+        return response
+
+    page = [row for batch in iter_campaign_batches(query, params) for row in batch]
+    response = Response(b"".join(stream([page])), mimetype=mimetype)
+    if len(page) == limit:
+        response.headers["X-Next-After"] = str(page[-1]["ad_id"])
+    return response
+
+def refresh_realtime_metrics():
+    """Write a fresh set of simulated metrics to every campaign and summarize them."""
+    with datastore.driver.transaction() as cursor:
+        # Fetch all campaigns
+        cursor.execute("SELECT Ad_ID, Cost, Campaign_Name FROM campaigns")
+        campaigns = cursor.fetchall()
+        ad_ids = [c[0] for c in campaigns]
+        costs = derived_metrics.as_column([c[1] for c in campaigns])
+
+        # Randomize metrics and write them in one set-based update keyed on Ad_ID
+        metrics = realtime_metrics.simulate_metrics(len(ad_ids))
+        if ad_ids:
+            realtime_metrics.bulk_update_metrics(cursor, ad_ids, metrics, dialect=datastore.driver.name)
+
+        # Metrics were rewritten in place, so recompute the rollup in the same transaction
+        rollup.rebuild(cursor)
+        datastore.bump_data_version(cursor)
+    data_events.campaigns_changed()
+    anomaly.detector.observe(ad_ids, metrics["clicks"], metrics["impressions"], metrics["conversions"], costs,
+                             [c[2] for c in campaigns])
+
+    # Aggregate from the same arrays that were written
+    return realtime_metrics.summarize(costs, metrics)
 
 @app.route('/realTime', methods=['GET'])
 def real_time_update():
-    conn = get_db_connection()
-    cursor = conn.cursor(dictionary=True)
-
-    # Fetch all campaigns
-    cursor.execute("SELECT Campaign_Name, Cost, Clicks, Impressions, Conversions FROM campaigns")
-    campaigns = cursor.fetchall()
-
-    total_clicks = 0
-    total_impressions = 0
-    total_conversions = 0
-    total_cpc = 0
-    count = len(campaigns)
-
-    for c in campaigns:
-        campaign_name = c['Campaign_Name']
-
-        # Randomize metrics
-        clicks = np.random.randint(0, 51)
-        impressions = np.random.randint(0, 101)
-        conversions = np.random.randint(0, 16)
-
-        # Update DB
-        cursor.execute(
-            "UPDATE campaigns SET Clicks=%s, Impressions=%s, Conversions=%s WHERE Campaign_Name=%s",
-            (clicks, impressions, conversions, campaign_name)
-        )
-
-        # Aggregate
-        total_clicks += clicks
-        total_impressions += impressions
-        total_conversions += conversions
-        cost = c['Cost'] or 0
-        total_cpc += (cost / clicks) if clicks > 0 else 0
-
-    conn.commit()
-    cursor.close()
-    conn.close()
-
-    avg_ctr = (total_clicks / total_impressions * 100) if total_impressions else 0
-    avg_conversions = (total_conversions / count) if count else 0
-
-    result = {
-        "total_campaigns": count,
-        "total_impressions": total_impressions,
-        "avg_ctr": round(avg_ctr, 2),
-        "total_clicks": total_clicks,
-        "avg_conversions": round(avg_conversions, 2),
-        "total_cpc": round(total_cpc, 2)
+    return jsonify(refresh_realtime_metrics())
+
+
+def alerts_args(args):
+    """Keyword arguments of anomaly.detector.recent() from /getAlerts query params."""
+    return {
+        "limit": max(1, min(args.get("limit", 50, type=int), anomaly.detector.alerts.maxlen)),
+        "after": args.get("after", 0, type=int),
+        "kind": args.get("type") or None,
+        "campaign": args.get("campaign") or None
     }
 
-    return jsonify(result)
+@app.route('/getAlerts', methods=['GET'])
+def get_alerts():
+    """
+    Performance alerts from the streaming anomaly detector, newest first.
+
+    Query params: limit, after (only alerts with a larger id, for polling),
+    type (critical/warning/success), campaign.
+    """
+    return jsonify(anomaly.detector.recent(**alerts_args(request.args)))
+
+
+@app.route('/realTime/stream', methods=['GET'])
+def real_time_stream():
+    """
+    Server-Sent Events feed of live metrics: a full 'snapshot' event on
+    connect, then 'delta' events with only the changed fields each tick.
+    """
+    subscription = realtime_stream.broadcaster.subscribe()
+    return Response(
+        stream_with_context(realtime_stream.broadcaster.sse_events(subscription)),
+        mimetype="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
 
 
 def get_kpi_data():
     try:
-        conn = get_db_connection()
-        if not conn:
-            return {"error": "Database connection failed"}
-        cursor = conn.cursor()
-        cursor.execute("""
-            SELECT 
-                DATE_FORMAT(Ad_Date, '%b') AS month,
-                SUM(Sale_Amount) AS total_sales,
-                SUM(Cost) AS total_cost,
-                SUM(Clicks) AS total_clicks,
-                SUM(Impressions) AS total_impressions
-            FROM campaigns
-            GROUP BY DATE_FORMAT(Ad_Date, '%b')
-            ORDER BY MIN(Ad_Date)
-        """)
-        kpi_data = []
-        for row in cursor.fetchall():
-            month, total_sales, total_cost, total_clicks, total_impressions = row
-            roi = ((total_sales - total_cost) / total_cost) * 100 if total_cost else 0
-            ctr = (total_clicks / total_impressions) * 100 if total_impressions else 0
-            kpi_data.append({
-                "name": month,
-                "roi": round(float(roi), 2),
-                "ctr": round(float(ctr), 2)
-            })
-        cursor.close()
-        conn.close()
-        return kpi_data
+        # Monthly buckets keyed by year and month so the same month in
+        # different years is not merged
+        if ANALYTICS_BACKEND == "parquet":
+            rows = analytics_store.monthly_kpis()
+        else:
+            rows = datastore.monthly_kpis()
+        return kpi_entries(rows)
     except Exception as e:
         logger.error(f"Error in get_kpi_data: {str(e)}")
+        response_cache.dont_cache()
         return {"error": f"Failed to fetch KPI data: {str(e)}"}
 
+def kpi_entries(rows):
+    """Monthly (label, sales, cost, clicks, impressions) rows -> ROI/CTR chart points."""
+    cols = [derived_metrics.as_column([row[i] for row in rows]) for i in range(1, 5)]
+    total_sales, total_cost, total_clicks, total_impressions = cols
+    roi = derived_metrics.roi(total_sales, total_cost).round(2)
+    ctr = derived_metrics.ctr(total_clicks, total_impressions).round(2)
+    return [{
+        "name": row[0],
+        "roi": float(roi[i]),
+        "ctr": float(ctr[i])
+    } for i, row in enumerate(rows)]
+
 def get_campaign_performance():
     try:
-        conn = get_db_connection()
-        if not conn:
-            return {"error": "Database connection failed"}
-        cursor = conn.cursor()
         # Fetch top 5 keywords by conversions to avoid overwhelming the chart
-        cursor.execute("""
-            SELECT Keyword, SUM(Conversions) as total_conversions
-            FROM campaigns
-            GROUP BY Keyword
-            ORDER BY total_conversions DESC
-            LIMIT 5
-        """)
-        keywords = cursor.fetchall()
-        cursor.execute("SELECT SUM(Conversions) FROM campaigns")
-        total_conversions = cursor.fetchone()[0] or 1
-        colors = ["#4CAF50", "#2196F3", "#FFC107", "#F44336", "#9C27B0"]
-        result = []
-        for i, (keyword, conversions) in enumerate(keywords):
-            value = (conversions / total_conversions * 100) if total_conversions else 0
-            result.append({
-                "name": keyword or "Unknown",
-                "value": round(float(value), 2),
-                "color": colors[i % len(colors)]
-            })
-        cursor.close()
-        conn.close()
-        return result
+        if ANALYTICS_BACKEND == "parquet":
+            keywords, total_conversions = analytics_store.keyword_conversions(limit=5)
+        else:
+            keywords, total_conversions = datastore.keyword_conversions(limit=5)
+        return keyword_entries(keywords, total_conversions)
     except Exception as e:
         logger.error(f"Error in get_campaign_performance: {str(e)}")
+        response_cache.dont_cache()
         return {"error": f"Failed to fetch campaign performance: {str(e)}"}
 
+def keyword_entries(keywords, total_conversions):
+    """Top (keyword, conversions) pairs -> share-of-conversions pie slices."""
+    total_conversions = total_conversions or 1
+    colors = ["#4CAF50", "#2196F3", "#FFC107", "#F44336", "#9C27B0"]
+    result = []
+    for i, (keyword, conversions) in enumerate(keywords):
+        value = (conversions / total_conversions * 100) if total_conversions else 0
+        result.append({
+            "name": keyword or "Unknown",
+            "value": round(float(value), 2),
+            "color": colors[i % len(colors)]
+        })
+    return result
+
 # NEW ROUTES FOR CHARTS DATA
+SAMPLE_WEEKLY_TRENDS = [
+    {"date": "Mon", "impressions": 18000, "clicks": 540, "conversions": 12},
+    {"date": "Tue", "impressions": 22000, "clicks": 660, "conversions": 15},
+    {"date": "Wed", "impressions": 19000, "clicks": 570, "conversions": 11},
+    {"date": "Thu", "impressions": 25000, "clicks": 750, "conversions": 18},
+    {"date": "Fri", "impressions": 28000, "clicks": 840, "conversions": 21},
+    {"date": "Sat", "impressions": 15000, "clicks": 450, "conversions": 9},
+    {"date": "Sun", "impressions": 12000, "clicks": 360, "conversions": 7}
+]
+
+SAMPLE_DEVICE_DEMOGRAPHICS = [
+    {"device": "Mobile", "impressions": 45000, "conversions": 23},
+    {"device": "Desktop", "impressions": 89000, "conversions": 67},
+    {"device": "Tablet", "impressions": 23000, "conversions": 12}
+]
+
+def weekly_trends_since():
+    return datetime.now().date() - timedelta(days=7)
+
 def get_weekly_trends():
     try:
-        conn = get_db_connection()
-        cursor = conn.cursor()
-        
         # Get data for the last 7 days grouped by date
-        cursor.execute("""
-            SELECT 
-                DATE(Ad_Date) as date,
-                SUM(Impressions) as impressions,
-                SUM(Clicks) as clicks,
-                SUM(Conversions) as conversions
-            FROM campaigns 
-            WHERE Ad_Date >= DATE_SUB(CURDATE(), INTERVAL 7 DAY)
-            AND Ad_Date IS NOT NULL
-            AND Ad_Date != ''
-            GROUP BY DATE(Ad_Date)
-            ORDER BY date
-        """)
-        
-        # Create a dictionary to store data by date
-        db_data = {}
-        for row in cursor.fetchall():
-            date, impressions, clicks, conversions = row
-            if date:  # Only process if date is not None
-                db_data[date] = {
-                    "impressions": impressions or 0,
-                    "clicks": clicks or 0,
-                    "conversions": conversions or 0
-                }
-        
-        cursor.close()
-        conn.close()
-        
-        # Generate complete week data (last 7 days)
-        from datetime import datetime, timedelta
-        trends = []
-        days = ['Mon', 'Tue', 'Wed', 'Thu', 'Fri', 'Sat', 'Sun']
-        
-        # Start from 6 days ago to get a full week
-        for i in range(7):
-            current_date = datetime.now() - timedelta(days=6-i)
-            date_key = current_date.date()
-            day_name = days[current_date.weekday()]
-            
-            # Use database data if available, otherwise use sample data
-            if date_key in db_data:
-                data = db_data[date_key]
-            else:
-                # Generate sample data with some variation
-                base_impressions = 20000 + (i * 2000)
-                base_clicks = int(base_impressions * 0.03)  # 3% CTR
-                base_conversions = int(base_clicks * 0.02)  # 2% conversion rate
-                
-                data = {
-                    "impressions": base_impressions,
-                    "clicks": base_clicks,
-                    "conversions": base_conversions
-                }
-            
-            trends.append({
-                "date": day_name,
-                "impressions": data["impressions"],
-                "clicks": data["clicks"],
-                "conversions": data["conversions"]
-            })
-        
-        return trends
-        
+        return weekly_trend_entries(datastore.daily_totals(weekly_trends_since()))
     except Exception as e:
         logger.error(f"Error in get_weekly_trends: {str(e)}")
+        response_cache.dont_cache()
         # Return sample data if there's an error
-        return [
-            {"date": "Mon", "impressions": 18000, "clicks": 540, "conversions": 12},
-            {"date": "Tue", "impressions": 22000, "clicks": 660, "conversions": 15},
-            {"date": "Wed", "impressions": 19000, "clicks": 570, "conversions": 11},
-            {"date": "Thu", "impressions": 25000, "clicks": 750, "conversions": 18},
-            {"date": "Fri", "impressions": 28000, "clicks": 840, "conversions": 21},
-            {"date": "Sat", "impressions": 15000, "clicks": 450, "conversions": 9},
-            {"date": "Sun", "impressions": 12000, "clicks": 360, "conversions": 7}
-        ]
+        return SAMPLE_WEEKLY_TRENDS
+
+def weekly_trend_entries(daily_rows):
+    """Per-day (date, impressions, clicks, conversions) rows -> the last 7 days, gaps filled with sample data."""
+    db_data = {}
+    for date, impressions, clicks, conversions in daily_rows:
+        db_data[date] = {
+            "impressions": impressions,
+            "clicks": clicks,
+            "conversions": conversions
+        }
+    
+    # Generate complete week data (last 7 days)
+    trends = []
+    days = ['Mon', 'Tue', 'Wed', 'Thu', 'Fri', 'Sat', 'Sun']
+    
+    # Start from 6 days ago to get a full week
+    for i in range(7):
+        current_date = datetime.now() - timedelta(days=6-i)
+        date_key = current_date.date()
+        day_name = days[current_date.weekday()]
+        
+        # Use database data if available, otherwise use sample data
+        if date_key in db_data:
+            data = db_data[date_key]
+        else:
+            # Generate sample data with some variation
+            base_impressions = 20000 + (i * 2000)
+            base_clicks = int(base_impressions * 0.03)  # 3% CTR
+            base_conversions = int(base_clicks * 0.02)  # 2% conversion rate
+            
+            data = {
+                "impressions": base_impressions,
+                "clicks": base_clicks,
+                "conversions": base_conversions
+            }
+        
+        trends.append({
+            "date": day_name,
+            "impressions": data["impressions"],
+            "clicks": data["clicks"],
+            "conversions": data["conversions"]
+        })
+    
+    return trends
 
 def get_device_demographics():
     try:
-        conn = get_db_connection()
-        cursor = conn.cursor()
-        
         # Get data grouped by device
-        cursor.execute("""
-            SELECT 
-                Device,
-                SUM(Impressions) as impressions,
-                SUM(Conversions) as conversions
-            FROM campaigns 
-            GROUP BY Device
-        """)
-        
-        demographics = []
-        for row in cursor.fetchall():
-            device, impressions, conversions = row
-            demographics.append({
-                "device": device or "Unknown",
-                "impressions": impressions or 0,
-                "conversions": conversions or 0
-            })
-        
-        cursor.close()
-        conn.close()
-        
-        # If no data, return sample data
-        if not demographics:
-            return [
-                {"device": "Mobile", "impressions": 45000, "conversions": 23},
-                {"device": "Desktop", "impressions": 89000, "conversions": 67},
-                {"device": "Tablet", "impressions": 23000, "conversions": 12}
-            ]
-        
-        return demographics
+        if ANALYTICS_BACKEND == "parquet":
+            rows = analytics_store.device_totals()
+        else:
+            rows = datastore.device_totals()
+        return device_entries(rows)
     except Exception as e:
         logger.error(f"Error in get_device_demographics: {str(e)}")
-        return [
-            {"device": "Mobile", "impressions": 45000, "conversions": 23},
-            {"device": "Desktop", "impressions": 89000, "conversions": 67},
-            {"device": "Tablet", "impressions": 23000, "conversions": 12}
-        ]
+        response_cache.dont_cache()
+        return SAMPLE_DEVICE_DEMOGRAPHICS
+
+def device_entries(rows):
+    """Per-device (Device, impressions, conversions) rows; sample data when there are none."""
+    demographics = []
+    for device, impressions, conversions in rows:
+        demographics.append({
+            "device": device or "Unknown",
+            "impressions": impressions or 0,
+            "conversions": conversions or 0
+        })
+    
+    # If no data, return sample data
+    if not demographics:
+        return SAMPLE_DEVICE_DEMOGRAPHICS
+    
+    return demographics
 
 @app.route('/getWeeklyTrends', methods=['GET'])
+@response_cache.cached
 def weekly_trends():
     return jsonify(get_weekly_trends())
 
 @app.route('/getDeviceDemographics', methods=['GET'])
+@response_cache.cached
 def device_demographics():
     return jsonify(get_device_demographics())
 
 @app.route('/getKpiData', methods=['GET'])
+@response_cache.cached
 def kpi_data():
     return jsonify(get_kpi_data())
 
 @app.route('/getCampaignPerformance', methods=['GET'])
+@response_cache.cached
 def campaign_performance():
     return jsonify(get_campaign_performance())
 
 @app.route('/getPredictiveInsights', methods=['GET'])
+@response_cache.cached
 def predictive_insights():
     try:
-        conn = get_db_connection()
-        cursor = conn.cursor()
-        
-        # Query the predictive_insights table
-        cursor.execute("""
-            SELECT Campaign_Name, Spend, Status, CPC, Bidding_Strategy, 
-                   Conversions, Revenue, Profitable, Recommendation 
-            FROM predictive_insights
-            ORDER BY Campaign_Name
-        """)
-        
-        results = cursor.fetchall()
-        columns = [desc[0] for desc in cursor.description]
-        
-        # Convert to list of dictionaries
-        data = []
-        for row in results:
-            data.append(dict(zip(columns, row)))
-        
-        cursor.close()
-        conn.close()
-        
-        return jsonify(data)
+        return jsonify(datastore.predictive_insights())
         
     except Exception as e:
         logger.error(f"Error fetching predictive insights: {str(e)}")
         return jsonify({"error": ""}), 500
 
 
-# Initialize client once
-client = InferenceClient(api_key=HF_API_KEY)
+def chat_message():
+    data = request.get_json(silent=True) or {}
+    return data.get("message", "")
+
 
 @app.route("/chat", methods=["POST"])
-def chat():
-    data = request.json
-    user_message = data.get("message", "")
+def chat_route():
+    user_message = chat_message()
     if not user_message:
         return jsonify({"reply": "No message received."})
 
     try:
-        completion = client.chat.completions.create(
-            model=HF_MODEL,
-            messages=[
-                {"role": "system", "content": """You are a helpful assistant of the site ADIntelli and will now help user solve their problems.
-                you should not go more than 3 max lines, its your limit.
-                    AdIntelli Frontend User Interface Guide
-Navigation Structure
-Main Dashboard Sections (Sidebar Navigation)
-1. Executive Overview
-Location: Main dashboard landing page
-Contains:
-Total ROI percentage card
-Click-Through Rate (CTR) card
-Total Conversions counter
-Campaign Score with progress bar
-Performance trends line chart (ROI vs CTR over months)
-Campaign distribution pie chart
-Platform performance cards (Google, Facebook, LinkedIn, Twitter)
-2. Campaign Management
-Location: Second tab in sidebar
-Contains:
-Active campaigns list with metrics (impressions, clicks, conversions, CTR, CPC, ROAS)
-Weekly performance trends chart
-Audience demographics bar chart
-Performance alerts section with anomaly detection
-3. Budget Optimization
-Location: Third tab in sidebar
-Contains:
-Budget overview cards (Total Budget, Spent, Remaining, Avg ROAS)
-Campaign budget status with progress bars
-AI budget recommendations
-ROI forecast area chart
-Platform budget allocation bar chart
-Budget simulator with slider
-4. Real-Time Monitoring
-Location: Fourth tab in sidebar
-Contains:
-Live metrics cards (Active Campaigns, Impressions, CTR, Clicks, Conversions, CPC)
-Live performance line chart
-Live spend tracking area chart
-Live alerts and notifications
-Quick action buttons
-AI Assistant Panel
-Location: Right sidebar (desktop only)
-Contains: Chat interface with AI assistant for campaign insights and recommendations
-Header Features
-Search Bar: Global search functionality
-Notifications Bell: Shows alerts and updates
-Settings: User preferences
-User Avatar: Profile access
-User Workflow Guide
-To view overall performance: Go to Executive Overview tab
-To manage campaigns: Go to Campaign Management tab
-To optimize budget: Go to Budget Optimization tab
-To monitor live data: Go to Real-Time Monitoring tab
-To get AI help: Use the AI Assistant panel on the right
-Response Guidelines for AI Assistant
-The AI assistant should provide concise, 3-line maximum responses that:
-Direct users to the correct dashboard section
-Explain what they'll find there
-Suggest specific actions they can take
-Example responses:
-"Go to Executive Overview tab to see your ROI and CTR metrics. You'll find performance trends and platform data there. Click on any metric card for detailed breakdown."
-"Visit Campaign Management tab to view all active campaigns. You can see performance metrics and weekly trends. Use the alerts section to identify optimization opportunities."
-"Check Budget Optimization tab for AI recommendations. You'll see budget status, forecasts, and can use the simulator. Apply suggested changes to improve performance."
-                  """},
-                {"role": "user", "content": user_message}
-            ],
-        )
-
-
-        # Extract reply text safely
-        reply = completion.choices[0].message.get("content", "")
-        if not reply:
-            reply = "Model returned empty response."
-
+        reply = chat.service.reply(user_message).text
+    except ChatBusy as e:
+        return jsonify({"reply": str(e)}), 503, {"Retry-After": "1"}
+    except ChatTimeout as e:
+        return jsonify({"reply": str(e)}), 504
     except Exception as e:
         reply = f"Error calling model: {str(e)}"
 
     return jsonify({"reply": reply})
 
 
-
-
-
-
-DB_CONFIG = {
-    "host": "localhost",
-    "user": "root",
-    "password": "",      # update if needed
-    "database": "adintelli"
-}
-
-MODEL_PATH = "multi_task_model2.keras"
-PLATFORM_ENCODER_PATH = "platform_encoder.save"
-BID_ENCODER_PATH = "bid_strategy_encoder.save"
-BUDGET_REC_ENCODER_PATH = "budget_rec_encoder.save"
-AUDIENCE_ENCODER_PATH = "audience_exp_encoder.save"
-SCALER_PATH = "feature_scaler.save"
-
-# ---------------- Load ML Components ----------------
-model = load_model(MODEL_PATH)
-platform_encoder = joblib.load(PLATFORM_ENCODER_PATH)
-bid_strategy_encoder = joblib.load(BID_ENCODER_PATH)
-budget_rec_encoder = joblib.load(BUDGET_REC_ENCODER_PATH)
-audience_exp_encoder = joblib.load(AUDIENCE_ENCODER_PATH)
-scaler = joblib.load(SCALER_PATH)
+@app.route("/chat/stream", methods=["POST"])
+def chat_stream_route():
+    """
+    Same body as /chat; the reply arrives as Server-Sent Events: 'token'
+    events with text as it is generated, then 'done' with the full reply
+    (or 'error').
+    """
+    user_message = chat_message()
+    if not user_message:
+        return jsonify({"reply": "No message received."})
+    return Response(
+        stream_with_context(chat.sse_events(chat.service, user_message)),
+        mimetype="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
 
 
 # ---------------- Fetch only 1 row ----------------
 def fetch_one_campaign():
-    conn = mysql.connector.connect(**DB_CONFIG)
-    cursor = conn.cursor(dictionary=True)
-    cursor.execute("""
-        SELECT * FROM campaigns 
-        ORDER BY `Ad_ID` DESC LIMIT 1
-    """)
-    row = cursor.fetchone()
-    conn.close()
-    return row
-
-
-# ---------------- Prediction ----------------
-def predict_campaign(row):
-    row = row.copy()
-
-    # Fix platform naming (add " Ads")
-    row['Platform'] = str(row.get('Platform', 'Unknown')) + " Ads"
-    row['platform_encoded'] = platform_encoder.transform([row['Platform']])[0]
-
-    # Budget distribution parsing
-    if isinstance(row.get('recommended_budget_distribution'), str):
-        parts = row['recommended_budget_distribution'].split(',')
-        percentages = []
-        for part in parts:
-            try:
-                percent = float(part.strip().split('%')[0])
-            except:
-                percent = 0.0
-            percentages.append(percent)
-        while len(percentages) < 3:
-            percentages.append(0.0)
-        budget_alpha, budget_beta, budget_gamma = percentages
-    else:
-        budget_alpha = budget_beta = budget_gamma = 0.0
-
-    # CTR = (Clicks / Impressions) * 100
-    impressions = float(row.get("Impressions", 0))
-    clicks = float(row.get("Clicks", 0))
-    ctr = (clicks / impressions * 100) if impressions > 0 else 0.0
-
-    # ROAS = Sale_Amount / Cost
-    spend = float(row.get("Cost", 0))
-    sale_amount = float(row.get("Sale_Amount", 0))
-    roas = (sale_amount / spend) if spend > 0 else 0.0
-
-    # Prepare model input
-    X_input = np.array([[row['platform_encoded'], impressions, clicks, spend,
-                         row.get("Conversions", 0), ctr, roas,
-                         budget_alpha, budget_beta, budget_gamma]])
-    X_scaled = scaler.transform(X_input)
-    preds_list = model.predict(X_scaled)
-
-    output_names = ['campaign_score', 'roi_forecast', 'avg_perf_score', 'budget_dist',
-                    'budget_realloc', 'performance_alerts', 'budget_rec',
-                    'audience_exp', 'bid_strategy']
-    preds = {name: pred for name, pred in zip(output_names, preds_list)}
-
-    # Build result
-    result = {}
-    result["Campaign Name"] = row.get("Campaign_Name", "Unknown")
-    result["Campaign Score"] = round(float(preds['campaign_score'].ravel()[0]), 2)
-    result["Performance Alerts"] = "Triggered" if float(preds['performance_alerts'].ravel()[0]) > 0.5 else "Normal"
-    result["Budget Reallocation (%)"] = round(float(preds['budget_realloc'].ravel()[0]), 2)
-
-    bid_idx = np.argmax(preds['bid_strategy'])
-    result["Bid Strategy Optimization"] = bid_strategy_encoder.inverse_transform([bid_idx])[0]
-
-    result["ROI Forecast (ROAS)"] = round(float(preds['roi_forecast'].ravel()[0]), 2)
-    result["Avg Performance Score"] = round(float(preds['avg_perf_score'].ravel()[0]), 2)
-    result["Audience Expansion"] = "Yes" if float(preds['audience_exp'].ravel()[0]) > 0.5 else "No"
-
-    budget_idx = np.argmax(preds['budget_rec'])
-    result["Budget Recommendation"] = budget_rec_encoder.inverse_transform([budget_idx])[0]
-
-    return result
+    return datastore.latest_campaign()
 
 
 # ---------------- Flask Route ----------------
@@ -720,20 +637,125 @@ def predict_route():
     if not campaign_name:
         return jsonify({"error": "campaign_name parameter is required"}), 400
 
+    cached = prediction_cache.cache.get_for_campaign(campaign_name)
+    if cached is not None:
+        return jsonify(cached)
+
     # Fetch campaign by name
-    conn = mysql.connector.connect(**DB_CONFIG)
-    cursor = conn.cursor(dictionary=True)
-    cursor.execute("SELECT * FROM campaigns WHERE Campaign_Name = %s LIMIT 1", (campaign_name,))
-    campaign = cursor.fetchone()
-    conn.close()
+    campaign = datastore.campaign_by_name(campaign_name)
 
     if not campaign:
         return jsonify({"error": f"No campaign found with name '{campaign_name}'"}), 404
 
-    prediction = predict_campaign(campaign)
+    try:
+        prediction = predict_campaign(campaign)
+    except QueueFull as e:
+        return jsonify({"error": str(e)}), 503, {"Retry-After": "1"}
     return jsonify(prediction)
 
 
+def fetch_campaigns_by(column, values):
+    """First campaigns row per value of `column`, fetched with a single IN (...) query."""
+    first = {}
+    for row in datastore.campaigns_by(column, values):
+        first.setdefault(str(row[column]), row)
+    return first
+
+
+def iter_all_campaign_chunks():
+    yield from datastore.iter_campaign_chunks(PREDICT_CHUNK_SIZE)
+
+
+@app.route("/predict/batch", methods=["POST"])
+def predict_batch_route():
+    """
+    Predictions for many campaigns at once.
+
+    Body: {"campaign_names": [...]}, {"ad_ids": [...]} or {"campaigns": "all"}.
+    Rows are fetched in one query and scored with one model.predict per chunk.
+    """
+    data = request.get_json() or {}
+
+    if data.get("campaigns") == "all":
+        predictions = []
+        for rows in iter_all_campaign_chunks():
+            predictions.extend(predict_rows(rows))
+        return jsonify({"predictions": predictions, "not_found": []})
+
+    if data.get("ad_ids"):
+        column, keys = "Ad_ID", [str(v) for v in data["ad_ids"]]
+    elif data.get("campaign_names"):
+        column, keys = "Campaign_Name", [str(v) for v in data["campaign_names"]]
+    else:
+        return jsonify({"error": "campaign_names, ad_ids or campaigns='all' is required"}), 400
+
+    keys = list(dict.fromkeys(keys))
+    if len(keys) > MAX_BATCH_PREDICT:
+        return jsonify({"error": f"At most {MAX_BATCH_PREDICT} campaigns per request"}), 400
+
+    found = fetch_campaigns_by(column, keys)
+    rows = [found[k] for k in keys if k in found]
+    return jsonify({
+        "predictions": predict_rows(rows),
+        "not_found": [k for k in keys if k not in found]
+    })
+
+
+def simulate_keys(data):
+    """(column, unique keys) of the campaigns a /simulateBudget body names."""
+    if data.get("ad_ids"):
+        column, keys = "Ad_ID", [str(v) for v in data["ad_ids"]]
+    elif data.get("campaign_names"):
+        column, keys = "Campaign_Name", [str(v) for v in data["campaign_names"]]
+    else:
+        raise ValueError("campaign_names or ad_ids is required")
+    return column, list(dict.fromkeys(keys))
+
+
+@app.route("/simulateBudget", methods=["POST"])
+def simulate_budget_route():
+    """
+    Forecast curves over a spend grid for the Budget Optimization tab.
+
+    Body: {"campaign_names": [...]} or {"ad_ids": [...]}, plus the grid as
+    "scales" (multiples of current spend), "total_budgets" (portfolio
+    totals, split in proportion to current spend) or "min_scale",
+    "max_scale" and "steps". The model runs once over the whole grid.
+    """
+    data = request.get_json() or {}
+    try:
+        column, keys = simulate_keys(data)
+        grid = budget_simulator.grid_args(data)
+        found = fetch_campaigns_by(column, keys)
+        rows = [found[k] for k in keys if k in found]
+        if not rows:
+            return jsonify({"error": "None of the campaigns were found", "not_found": keys}), 404
+        result = budget_simulator.simulate(rows, grid)
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+    result["not_found"] = [k for k in keys if k not in found]
+    return jsonify(result)
+
+
+@app.route("/optimizeBudget", methods=["POST"])
+def optimize_budget_route():
+    """
+    Split a total budget across platforms or campaigns for the most
+    conversions or the best ROAS, from response curves fitted to their
+    daily history.
+
+    Body: {"total_budget": 50000, "level": "platform" | "campaign",
+    "objective": "conversions" | "roas", "days": 30,
+    "constraints": {"Google Ads": {"min": 5000, "max": 20000}},
+    "min_scale": 0, "max_scale": 3}. Constraint amounts are totals over
+    `days`; units without one may spend between min_scale and max_scale
+    times their average daily spend.
+    """
+    data = request.get_json() or {}
+    try:
+        return jsonify(budget_optimizer.optimizer.optimize(**budget_optimizer.optimize_args(data)))
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
 
 
 if __name__ == "__main__":
@@ -0,0 +1,503 @@
+"""
+ASGI mode of the API: the routes and JSON shapes of app.py, served from
+an asyncio event loop.
+
+- Dashboard reads go through async_datastore (an aiomysql pool, or the
+  SQLite driver in worker threads), so a request waiting on the database
+  does not hold a thread.
+- Model predictions are CPU-bound and run in a bounded thread pool;
+  once ASYNC_PREDICT_MAX_PENDING are queued, /predict answers 503.
+- /chat awaits the shared chat.service reply without holding a thread.
+- /realTime/stream clients wait on the event loop, not one thread each.
+
+Writes (/realTime) and the Parquet backend keep their synchronous code
+and run in worker threads.
+
+    python asgi_app.py --bind 127.0.0.1:5001
+    hypercorn asgi_app:app --bind 127.0.0.1:5001
+"""
+import argparse
+import asyncio
+import contextvars
+import functools
+import logging
+from concurrent.futures import ThreadPoolExecutor
+
+from quart import Quart, Response, jsonify, request
+
+import analytics_store
+import anomaly
+import app as wsgi_app
+import budget_optimizer
+import budget_simulator
+import async_datastore
+import chat
+import derived_metrics
+import json_encoding
+import prediction_cache
+import predictor
+import realtime_stream
+import request_metrics
+import response_cache
+from batcher import QueueFull
+from chat import ChatBusy, ChatTimeout
+from config import (ANALYTICS_BACKEND, DEMO_DELAY_SECONDS, PREDICT_CHUNK_SIZE,
+                    ASYNC_PREDICT_WORKERS, ASYNC_PREDICT_MAX_PENDING)
+from db_pool import pool_stats
+from predictor import predict_campaign, predict_rows
+
+logger = logging.getLogger(__name__)
+logging.basicConfig(level=logging.INFO)
+
+app = Quart(__name__)
+request_metrics.init_async_app(app)
+json_encoding.init_async_app(app)
+
+
+class BoundedExecutor:
+    """Thread pool for blocking calls that rejects work once `max_pending` calls are queued or running."""
+
+    def __init__(self, workers, max_pending, name):
+        self.max_pending = max_pending
+        self.name = name
+        self._pool = ThreadPoolExecutor(max_workers=workers, thread_name_prefix=name)
+        self._workers = workers
+        self._pending = 0
+        self._rejected = 0
+
+    async def run(self, fn, *args):
+        # Only touched from the event loop thread, so the counter needs no lock
+        if self._pending >= self.max_pending:
+            self._rejected += 1
+            raise QueueFull(f"{self.name} is full ({self.max_pending} pending)")
+        self._pending += 1
+        try:
+            # Run in a copy of the request's context so DB and model time is charged to it
+            call = functools.partial(contextvars.copy_context().run, fn, *args)
+            return await asyncio.get_running_loop().run_in_executor(self._pool, call)
+        finally:
+            self._pending -= 1
+
+    def shutdown(self):
+        self._pool.shutdown(wait=False)
+
+    def stats(self):
+        return {"workers": self._workers, "pending": self._pending,
+                "max_pending": self.max_pending, "rejected": self._rejected}
+
+
+predict_executor = BoundedExecutor(ASYNC_PREDICT_WORKERS, ASYNC_PREDICT_MAX_PENDING, "predict-executor")
+
+
+@app.before_serving
+async def startup():
+    await async_datastore.connect()
+
+
+@app.after_serving
+async def shutdown():
+    await async_datastore.close()
+    predict_executor.shutdown()
+
+
+@app.after_request
+async def add_cors_headers(response):
+    response.headers["Access-Control-Allow-Origin"] = "*"
+    response.headers["Access-Control-Expose-Headers"] = "X-Next-After"
+    if request.method == "OPTIONS":
+        response.headers["Access-Control-Allow-Headers"] = request.headers.get("Access-Control-Request-Headers", "*")
+        response.headers["Access-Control-Allow-Methods"] = "GET, POST, OPTIONS"
+    return response
+
+
+async def demo_delay():
+    """Artificial latency for demos; disabled unless ADINTELLI_DEMO_DELAY is set."""
+    if DEMO_DELAY_SECONDS > 0:
+        await asyncio.sleep(DEMO_DELAY_SECONDS)
+
+
+async def campaign_totals():
+    if ANALYTICS_BACKEND == "parquet":
+        return [v or 0 for v in await asyncio.to_thread(analytics_store.campaign_totals)]
+    return await async_datastore.campaign_totals()
+
+
+@app.route("/getExecutiveSummary", methods=["GET"])
+async def executive_summary():
+    await demo_delay()
+    return jsonify(wsgi_app.summarize_platforms(await async_datastore.platform_summary()))
+
+
+@app.route("/getServerStats", methods=["GET"])
+async def server_stats():
+    return jsonify({
+        "db_pool": pool_stats(),
+        "async_db": async_datastore.stats(),
+        "predict_executor": predict_executor.stats(),
+        "predict_batcher": predictor.batcher.stats(),
+        "prediction_cache": prediction_cache.cache.stats(),
+        "realtime_stream": realtime_stream.broadcaster.stats(),
+        "analytics_store": analytics_store.stats(),
+        "chat": chat.service.stats(),
+        "response_cache": response_cache.cache.stats(),
+        "anomaly": anomaly.detector.stats(),
+        "budget_simulator": budget_simulator.simulator.stats(),
+        "budget_optimizer": budget_optimizer.optimizer.stats()
+    })
+
+
+@app.route("/metrics", methods=["GET"])
+async def metrics():
+    return Response(wsgi_app.metrics_text(), content_type=request_metrics.CONTENT_TYPE)
+
+
+@app.route("/getPlatformData", methods=["GET"])
+async def platform_data():
+    await demo_delay()
+    rows = await async_datastore.platform_totals(request.args.get("start_date"), request.args.get("end_date"))
+    top_n = request.args.get("top", type=int)
+    if top_n:
+        rows = rows[:top_n]
+    return jsonify(wsgi_app.platform_entries(rows))
+
+
+@app.route("/getCampaignScore", methods=["GET"])
+async def get_campaign_score():
+    await demo_delay()
+    totals = await campaign_totals()
+    return jsonify({"campaign_score": float(derived_metrics.campaign_score(*totals))})
+
+
+@app.route("/getConversions", methods=["GET"])
+async def total_conversions():
+    await demo_delay()
+    totals = await async_datastore.campaign_totals()
+    return jsonify({"total_conversions": float(totals.conversions)})
+
+
+@app.route('/getROI', methods=['GET'])
+async def roi():
+    await demo_delay()
+    totals = await async_datastore.campaign_totals()
+    return jsonify({"roi": float(derived_metrics.roi(totals.sales, totals.cost))})
+
+
+@app.route('/getCTR', methods=['GET'])
+async def get_ctr():
+    await demo_delay()
+    totals = await async_datastore.campaign_totals()
+    return jsonify({"ctr": float(derived_metrics.ctr(totals.clicks, totals.impressions))})
+
+
+async def iter_campaign_batches(query, params):
+    async for rows in async_datastore.stream_rows(query, params, wsgi_app.STREAM_FETCH_SIZE):
+        yield wsgi_app.campaign_rows(rows)
+
+
+async def stream_json_array(batches):
+    yield b"["
+    first = True
+    async for batch in batches:
+        if batch:
+            yield (b"" if first else b",") + app.json.dumps_bytes(batch)[1:-1]
+            first = False
+    yield b"]"
+
+
+async def stream_ndjson(batches):
+    async for batch in batches:
+        yield b"".join(app.json.dumps_bytes(row) + b"\n" for row in batch)
+
+
+@app.route('/getAllCampaigns', methods=['GET'])
+async def get_all_campaigns():
+    """Same query params and paging as the WSGI route."""
+    await demo_delay()
+    limit = request.args.get("limit", type=int)
+    if limit is not None:
+        limit = max(1, min(limit, wsgi_app.MAX_PAGE_LIMIT))
+    try:
+        query, params = wsgi_app.build_campaigns_query(request.args, limit)
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+
+    ndjson = request.args.get("format") == "ndjson"
+    stream = stream_ndjson if ndjson else stream_json_array
+    mimetype = "application/x-ndjson" if ndjson else "application/json"
+
+    if not limit:
+        body = stream(iter_campaign_batches(query, params))
+        encoding = json_encoding.negotiate(request)
+        if encoding:
+            body = json_encoding.compress_chunks_async(body, encoding)
+        response = Response(body, mimetype=mimetype)
+        if encoding:
+            json_encoding.mark_encoded(response, encoding)
+        response.timeout = None  # the full table can take longer than RESPONSE_TIMEOUT
+        return response
+
+    page = [row async for batch in iter_campaign_batches(query, params) for row in batch]
+    render = wsgi_app.stream_ndjson if ndjson else wsgi_app.stream_json_array
+    response = Response(b"".join(render([page])), mimetype=mimetype)
+    if len(page) == limit:
+        response.headers["X-Next-After"] = str(page[-1]["ad_id"])
+    return response
+
+
+@app.route('/realTime', methods=['GET'])
+async def real_time_update():
+    return jsonify(await asyncio.to_thread(wsgi_app.refresh_realtime_metrics))
+
+
+@app.route('/getAlerts', methods=['GET'])
+async def get_alerts():
+    """Same query params as the WSGI route."""
+    return jsonify(anomaly.detector.recent(**wsgi_app.alerts_args(request.args)))
+
+
+@app.route('/realTime/stream', methods=['GET'])
+async def real_time_stream():
+    subscription = await realtime_stream.broadcaster.subscribe_async()
+    response = Response(
+        realtime_stream.broadcaster.sse_events_async(subscription),
+        mimetype="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
+    response.timeout = None  # open until the client disconnects
+    return response
+
+
+async def get_kpi_data():
+    try:
+        if ANALYTICS_BACKEND == "parquet":
+            rows = await asyncio.to_thread(analytics_store.monthly_kpis)
+        else:
+            rows = await async_datastore.monthly_kpis()
+        return wsgi_app.kpi_entries(rows)
+    except Exception as e:
+        logger.error(f"Error in get_kpi_data: {str(e)}")
+        response_cache.dont_cache()
+        return {"error": f"Failed to fetch KPI data: {str(e)}"}
+
+
+async def get_campaign_performance():
+    try:
+        if ANALYTICS_BACKEND == "parquet":
+            keywords, total = await asyncio.to_thread(analytics_store.keyword_conversions, 5)
+        else:
+            keywords, total = await async_datastore.keyword_conversions(limit=5)
+        return wsgi_app.keyword_entries(keywords, total)
+    except Exception as e:
+        logger.error(f"Error in get_campaign_performance: {str(e)}")
+        response_cache.dont_cache()
+        return {"error": f"Failed to fetch campaign performance: {str(e)}"}
+
+
+async def get_weekly_trends():
+    try:
+        return wsgi_app.weekly_trend_entries(await async_datastore.daily_totals(wsgi_app.weekly_trends_since()))
+    except Exception as e:
+        logger.error(f"Error in get_weekly_trends: {str(e)}")
+        response_cache.dont_cache()
+        return wsgi_app.SAMPLE_WEEKLY_TRENDS
+
+
+async def get_device_demographics():
+    try:
+        if ANALYTICS_BACKEND == "parquet":
+            rows = await asyncio.to_thread(analytics_store.device_totals)
+        else:
+            rows = await async_datastore.device_totals()
+        return wsgi_app.device_entries(rows)
+    except Exception as e:
+        logger.error(f"Error in get_device_demographics: {str(e)}")
+        response_cache.dont_cache()
+        return wsgi_app.SAMPLE_DEVICE_DEMOGRAPHICS
+
+
+@app.route('/getWeeklyTrends', methods=['GET'])
+@response_cache.cached_async
+async def weekly_trends():
+    return jsonify(await get_weekly_trends())
+
+
+@app.route('/getDeviceDemographics', methods=['GET'])
+@response_cache.cached_async
+async def device_demographics():
+    return jsonify(await get_device_demographics())
+
+
+@app.route('/getKpiData', methods=['GET'])
+@response_cache.cached_async
+async def kpi_data():
+    return jsonify(await get_kpi_data())
+
+
+@app.route('/getCampaignPerformance', methods=['GET'])
+@response_cache.cached_async
+async def campaign_performance():
+    return jsonify(await get_campaign_performance())
+
+
+@app.route('/getPredictiveInsights', methods=['GET'])
+@response_cache.cached_async
+async def predictive_insights():
+    try:
+        return jsonify(await async_datastore.predictive_insights())
+    except Exception as e:
+        logger.error(f"Error fetching predictive insights: {str(e)}")
+        return jsonify({"error": ""}), 500
+
+
+async def chat_message():
+    data = await request.get_json(silent=True) or {}
+    return data.get("message", "")
+
+
+@app.route("/chat", methods=["POST"])
+async def chat_route():
+    user_message = await chat_message()
+    if not user_message:
+        return jsonify({"reply": "No message received."})
+
+    try:
+        reply = (await chat.service.reply_async(user_message)).text
+    except ChatBusy as e:
+        return jsonify({"reply": str(e)}), 503, {"Retry-After": "1"}
+    except ChatTimeout as e:
+        return jsonify({"reply": str(e)}), 504
+    except Exception as e:
+        reply = f"Error calling model: {str(e)}"
+
+    return jsonify({"reply": reply})
+
+
+async def iterate_in_thread(iterator):
+    """Drive a blocking iterator from the event loop, one item per worker-thread hop."""
+    done = object()
+    while (item := await asyncio.to_thread(next, iterator, done)) is not done:
+        yield item
+
+
+@app.route("/chat/stream", methods=["POST"])
+async def chat_stream_route():
+    user_message = await chat_message()
+    if not user_message:
+        return jsonify({"reply": "No message received."})
+    response = Response(
+        iterate_in_thread(chat.sse_events(chat.service, user_message)),
+        mimetype="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
+    response.timeout = None
+    return response
+
+
+@app.route("/predict", methods=["POST"])
+async def predict_route():
+    data = await request.get_json()
+    campaign_name = data.get("campaign_name")
+    if not campaign_name:
+        return jsonify({"error": "campaign_name parameter is required"}), 400
+
+    cached = prediction_cache.cache.get_for_campaign(campaign_name)
+    if cached is not None:
+        return jsonify(cached)
+
+    campaign = await async_datastore.campaign_by_name(campaign_name)
+    if not campaign:
+        return jsonify({"error": f"No campaign found with name '{campaign_name}'"}), 404
+
+    try:
+        prediction = await predict_executor.run(predict_campaign, campaign)
+    except QueueFull as e:
+        return jsonify({"error": str(e)}), 503, {"Retry-After": "1"}
+    return jsonify(prediction)
+
+
+async def fetch_campaigns_by(column, values):
+    """First campaigns row per value of `column`, fetched with a single IN (...) query."""
+    first = {}
+    for row in await async_datastore.campaigns_by(column, values):
+        first.setdefault(str(row[column]), row)
+    return first
+
+
+@app.route("/predict/batch", methods=["POST"])
+async def predict_batch_route():
+    data = await request.get_json() or {}
+
+    try:
+        if data.get("campaigns") == "all":
+            predictions = []
+            async for rows in async_datastore.iter_campaign_chunks(PREDICT_CHUNK_SIZE):
+                predictions.extend(await predict_executor.run(predict_rows, rows))
+            return jsonify({"predictions": predictions, "not_found": []})
+
+        if data.get("ad_ids"):
+            column, keys = "Ad_ID", [str(v) for v in data["ad_ids"]]
+        elif data.get("campaign_names"):
+            column, keys = "Campaign_Name", [str(v) for v in data["campaign_names"]]
+        else:
+            return jsonify({"error": "campaign_names, ad_ids or campaigns='all' is required"}), 400
+
+        keys = list(dict.fromkeys(keys))
+        if len(keys) > wsgi_app.MAX_BATCH_PREDICT:
+            return jsonify({"error": f"At most {wsgi_app.MAX_BATCH_PREDICT} campaigns per request"}), 400
+
+        found = await fetch_campaigns_by(column, keys)
+        rows = [found[k] for k in keys if k in found]
+        return jsonify({
+            "predictions": await predict_executor.run(predict_rows, rows),
+            "not_found": [k for k in keys if k not in found]
+        })
+    except QueueFull as e:
+        return jsonify({"error": str(e)}), 503, {"Retry-After": "1"}
+
+
+@app.route("/simulateBudget", methods=["POST"])
+async def simulate_budget_route():
+    """Same body as the WSGI route; the simulation runs on the predict executor."""
+    data = await request.get_json() or {}
+    try:
+        column, keys = wsgi_app.simulate_keys(data)
+        grid = budget_simulator.grid_args(data)
+        found = await fetch_campaigns_by(column, keys)
+        rows = [found[k] for k in keys if k in found]
+        if not rows:
+            return jsonify({"error": "None of the campaigns were found", "not_found": keys}), 404
+        result = await predict_executor.run(budget_simulator.simulate, rows, grid)
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+    except QueueFull as e:
+        return jsonify({"error": str(e)}), 503, {"Retry-After": "1"}
+    result["not_found"] = [k for k in keys if k not in found]
+    return jsonify(result)
+
+
+@app.route("/optimizeBudget", methods=["POST"])
+async def optimize_budget_route():
+    """Same body as the WSGI route; fitting and solving run in a worker thread."""
+    data = await request.get_json() or {}
+    try:
+        args = budget_optimizer.optimize_args(data)
+        return jsonify(await asyncio.to_thread(budget_optimizer.optimizer.optimize, **args))
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+
+
+def main():
+    from hypercorn.asyncio import serve
+    from hypercorn.config import Config
+
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--bind", default="127.0.0.1:5001")
+    args = parser.parse_args()
+
+    config = Config()
+    config.bind = [args.bind]
+    asyncio.run(serve(app, config))
+
+
+if __name__ == "__main__":
+    main()
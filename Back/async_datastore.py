@@ -0,0 +1,226 @@
+"""
+Async counterpart of datastore.py for the ASGI server (asgi_app.py).
+
+Runs the same named statements and returns the same row types, through
+one of two drivers chosen by DATA_DRIVER:
+
+- "mysql": an aiomysql connection pool on the event loop, so a request
+  waiting on MySQL does not hold a thread
+- "sqlite": the synchronous datastore driver in worker threads (sqlite3
+  has no async API)
+
+Call connect() once the event loop is running and close() on shutdown.
+"""
+import asyncio
+import contextvars
+from concurrent.futures import ThreadPoolExecutor
+from datetime import date
+from typing import AsyncIterator, Dict, List, Optional, Sequence, Tuple
+
+import datastore
+import request_metrics
+import rollup
+from config import DATA_DRIVER, DB_CONFIG, DB_POOL_SIZE, DB_POOL_RECYCLE
+from datastore import (CampaignTotals, DailyTotals, DeviceTotals, MonthlyKpi, PlatformSummary,
+                       PlatformTotals, Statement, STATEMENTS)
+
+
+# ---------------- Drivers ----------------
+class AsyncMySQLDriver:
+    name = "mysql"
+
+    def __init__(self, config=DB_CONFIG, maxsize=DB_POOL_SIZE):
+        self.config = dict(config)
+        self.maxsize = maxsize
+        self._pool = None
+        self._lock = None
+
+    async def connect(self):
+        import aiomysql
+        if self._lock is None:
+            self._lock = asyncio.Lock()
+        async with self._lock:
+            if self._pool is None:
+                config = dict(self.config)
+                config["db"] = config.pop("database")
+                self._pool = await aiomysql.create_pool(minsize=1, maxsize=self.maxsize, autocommit=True,
+                                                        pool_recycle=DB_POOL_RECYCLE, **config)
+        return self._pool
+
+    async def close(self):
+        if self._pool is not None:
+            self._pool.close()
+            await self._pool.wait_closed()
+            self._pool = None
+
+    async def fetchall(self, statement: Statement, params: Sequence = (), dictionary=False) -> list:
+        import aiomysql
+        pool = self._pool or await self.connect()
+        async with pool.acquire() as conn:
+            async with conn.cursor(aiomysql.DictCursor if dictionary else aiomysql.Cursor) as cursor:
+                with request_metrics.timed("db"):
+                    await cursor.execute(statement.mysql, tuple(params) or None)
+                    return list(await cursor.fetchall())
+
+    async def stream(self, statement: Statement, params: Sequence = (), batch_size=1000,
+                     dictionary=True) -> AsyncIterator[list]:
+        """Unbuffered server-side cursor, read batch by batch."""
+        import aiomysql
+        pool = self._pool or await self.connect()
+        async with pool.acquire() as conn:
+            async with conn.cursor(aiomysql.SSDictCursor if dictionary else aiomysql.SSCursor) as cursor:
+                with request_metrics.timed("db"):
+                    await cursor.execute(statement.mysql, tuple(params) or None)
+                while True:
+                    with request_metrics.timed("db"):
+                        rows = await cursor.fetchmany(batch_size)
+                    if not rows:
+                        break
+                    yield list(rows)
+
+    def stats(self):
+        if self._pool is None:
+            return {"driver": self.name, "open": False}
+        return {"driver": self.name, "open": True, "size": self._pool.size,
+                "free": self._pool.freesize, "maxsize": self._pool.maxsize}
+
+
+class ThreadedDriver:
+    """A synchronous datastore driver run in worker threads."""
+
+    def __init__(self, sync_driver):
+        self.sync = sync_driver
+        self.name = sync_driver.name
+
+    async def connect(self):
+        pass
+
+    async def close(self):
+        pass
+
+    def _fetchall(self, statement, params, dictionary):
+        with self.sync.cursor(dictionary=dictionary) as cursor:
+            cursor.execute(self.sync.sql(statement), tuple(params))
+            return cursor.fetchall()
+
+    async def fetchall(self, statement: Statement, params: Sequence = (), dictionary=False) -> list:
+        return await asyncio.to_thread(self._fetchall, statement, params, dictionary)
+
+    async def stream(self, statement: Statement, params: Sequence = (), batch_size=1000,
+                     dictionary=True) -> AsyncIterator[list]:
+        # The per-thread SQLite connection cannot follow a cursor across
+        # threads, so one thread owns the cursor for the whole stream and
+        # reads it batch by batch with fetchmany
+        loop = asyncio.get_running_loop()
+        context = contextvars.copy_context()  # request_metrics' "db" timing
+        with ThreadPoolExecutor(max_workers=1, thread_name_prefix="sqlite-stream") as executor:
+            def call(fn, *args):
+                return loop.run_in_executor(executor, context.run, fn, *args)
+
+            cursor_cm = self.sync.stream(dictionary=dictionary)
+            cursor = await call(cursor_cm.__enter__)
+            try:
+                await call(cursor.execute, self.sync.sql(statement), tuple(params))
+                while True:
+                    rows = await call(cursor.fetchmany, batch_size)
+                    if not rows:
+                        break
+                    yield rows
+            finally:
+                await call(cursor_cm.__exit__, None, None, None)
+
+    def stats(self):
+        return {"driver": self.name, "threaded": True}
+
+
+def _create_driver():
+    if DATA_DRIVER == "mysql":
+        return AsyncMySQLDriver()
+    return ThreadedDriver(datastore.driver)
+
+
+driver = _create_driver()
+
+
+async def connect():
+    await driver.connect()
+
+
+async def close():
+    await driver.close()
+
+
+def stats():
+    return driver.stats()
+
+
+async def fetchall(name: str, params: Sequence = (), dictionary=False) -> list:
+    return await driver.fetchall(STATEMENTS[name], params, dictionary)
+
+
+async def fetchone(name: str, params: Sequence = (), dictionary=False):
+    rows = await fetchall(name, params, dictionary)
+    return rows[0] if rows else None
+
+
+async def data_version() -> int:
+    row = await fetchone("data_version")
+    return int(row[0]) if row else 0
+
+
+# ---------------- Typed queries ----------------
+async def campaign_totals() -> CampaignTotals:
+    return CampaignTotals.from_row(await fetchone("campaign_totals"))
+
+
+async def platform_totals(start_date: Optional[str] = None, end_date: Optional[str] = None) -> List[PlatformTotals]:
+    rows = await fetchall(*datastore.platform_totals_query(start_date, end_date))
+    return [PlatformTotals.from_row(r) for r in rows]
+
+
+async def platform_summary() -> List[PlatformSummary]:
+    return [PlatformSummary.from_row(r) for r in await fetchall("platform_summary")]
+
+
+async def monthly_kpis() -> List[MonthlyKpi]:
+    return [MonthlyKpi.from_row(r) for r in await fetchall("monthly_kpis", (rollup.UNDATED,))]
+
+
+async def keyword_conversions(limit: int = 5) -> Tuple[List[Tuple[str, float]], float]:
+    top, total = await asyncio.gather(fetchall("keyword_conversions", (int(limit),)),
+                                      fetchone("rollup_conversions"))
+    return datastore.keyword_totals(top, total)
+
+
+async def daily_totals(since: date) -> List[DailyTotals]:
+    return [DailyTotals.from_row(r) for r in await fetchall("daily_totals", (since.isoformat(),))]
+
+
+async def device_totals() -> List[DeviceTotals]:
+    return [DeviceTotals.from_row(r) for r in await fetchall("device_totals")]
+
+
+async def predictive_insights() -> List[Dict]:
+    return await fetchall("predictive_insights", dictionary=True)
+
+
+async def campaign_by_name(name: str) -> Optional[Dict]:
+    return await fetchone("campaign_by_name", (name,), dictionary=True)
+
+
+async def latest_campaign() -> Optional[Dict]:
+    return await fetchone("latest_campaign", dictionary=True)
+
+
+async def campaigns_by(column: str, values: Sequence) -> List[Dict]:
+    statement = datastore.campaigns_by_statement(column, len(values))
+    return await driver.fetchall(statement, values, dictionary=True)
+
+
+def stream_rows(sql: str, params: Sequence = (), batch_size: int = 1000, dictionary=True) -> AsyncIterator[list]:
+    """Run ad-hoc SQL (with %s markers) and yield its rows in batches."""
+    return driver.stream(Statement(sql), params, batch_size, dictionary)
+
+
+def iter_campaign_chunks(batch_size: int) -> AsyncIterator[List[Dict]]:
+    return driver.stream(STATEMENTS["all_campaigns"], (), batch_size)
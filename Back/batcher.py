@@ -0,0 +1,105 @@
+import logging
+import queue
+import threading
+import time
+from concurrent.futures import Future
+
+from histogram import Histogram
+
+logger = logging.getLogger(__name__)
+
+
+class QueueFull(Exception):
+    """Raised when the batcher queue is at capacity (backpressure)."""
+
+
+class MicroBatcher:
+    """
+    In-process dynamic batcher.
+
+    Callers submit single items and block until their result is ready. A
+    worker thread takes the first waiting item, keeps collecting until
+    `max_batch_size` items are queued or `window_ms` has passed, runs
+    `run_batch(items)` once and hands each caller its own result.
+    `run_batch` must return one result per item, in order.
+    """
+
+    def __init__(self, run_batch, max_batch_size=32, window_ms=5, max_queue=1024, name="batcher"):
+        self.run_batch = run_batch
+        self.max_batch_size = max_batch_size
+        self.window = window_ms / 1000.0
+        self.name = name
+
+        self._queue = queue.Queue(maxsize=max_queue)
+        self._thread = None
+        self._start_lock = threading.Lock()
+
+        self.batch_sizes = Histogram([1, 2, 4, 8, 16, 32, 64, 128, 256])
+        self.queue_depths = Histogram([0, 1, 2, 4, 8, 16, 32, 64, 128, 256, 512, 1024])
+        self.wait_ms = Histogram([0.5, 1, 2, 5, 10, 25, 50, 100, 250, 1000])
+        self._rejected = 0
+        self._batches = 0
+        self._errors = 0
+
+    def _ensure_started(self):
+        if self._thread is None:
+            with self._start_lock:
+                if self._thread is None:
+                    self._thread = threading.Thread(target=self._loop, name=self.name, daemon=True)
+                    self._thread.start()
+
+    def submit(self, item, timeout=None):
+        """Queue one item and wait for its result; raises QueueFull when the queue is full."""
+        self._ensure_started()
+        self.queue_depths.observe(self._queue.qsize())
+        future = Future()
+        try:
+            self._queue.put_nowait((item, future, time.perf_counter()))
+        except queue.Full:
+            self._rejected += 1
+            raise QueueFull(f"{self.name} queue is full ({self._queue.maxsize} pending)")
+        return future.result(timeout=timeout)
+
+    def _collect(self):
+        batch = [self._queue.get()]
+        deadline = time.perf_counter() + self.window
+        while len(batch) < self.max_batch_size:
+            remaining = deadline - time.perf_counter()
+            if remaining <= 0:
+                break
+            try:
+                batch.append(self._queue.get(timeout=remaining))
+            except queue.Empty:
+                break
+        return batch
+
+    def _loop(self):
+        while True:
+            batch = self._collect()
+            started = time.perf_counter()
+            for _, _, enqueued in batch:
+                self.wait_ms.observe((started - enqueued) * 1000)
+            self.batch_sizes.observe(len(batch))
+            self._batches += 1
+            try:
+                results = self.run_batch([item for item, _, _ in batch])
+                for (_, future, _), result in zip(batch, results):
+                    future.set_result(result)
+            except Exception as e:
+                self._errors += 1
+                logger.error(f"Error in {self.name} batch of {len(batch)}: {str(e)}")
+                for _, future, _ in batch:
+                    if not future.done():
+                        future.set_exception(e)
+
+    def stats(self):
+        return {
+            "queue_depth": self._queue.qsize(),
+            "queue_max": self._queue.maxsize,
+            "batches": self._batches,
+            "rejected": self._rejected,
+            "errors": self._errors,
+            "batch_size": self.batch_sizes.snapshot(),
+            "queue_depth_on_submit": self.queue_depths.snapshot(),
+            "queue_wait_ms": self.wait_ms.snapshot()
+        }
@@ -0,0 +1,160 @@
+"""
+Compare the dashboard aggregates on MySQL and on the Parquet/DuckDB store.
+
+By default this writes a synthetic store of --rows campaigns (50M) to
+--path and times the four aggregate queries on it. With --mysql the same
+queries are also timed against the configured database, both on the raw
+campaigns table and on the rollup tables the app uses. Use --export to
+build the Parquet store from that database instead of synthetic data, so
+both sides see the same rows.
+
+    python bench_analytics_backends.py --rows 50000000
+    python bench_analytics_backends.py --export --mysql
+"""
+import argparse
+import os
+import statistics
+import time
+
+import numpy as np
+
+import analytics_store
+import rollup
+from config import DB_CONFIG
+
+PLATFORMS = ["Google Ads", "Meta Ads", "LinkedIn Ads", "Twitter Ads", "Bing Ads"]
+DEVICES = ["Mobile", "Desktop", "Tablet"]
+KEYWORDS = [f"keyword {i}" for i in range(200)]
+LOCATIONS = ["hyderabad", "bangalore", "chennai", "delhi", "mumbai"]
+SLICE_ROWS = 1_000_000
+
+MYSQL_RAW = {
+    "campaign_totals": "SELECT SUM(Sale_Amount), SUM(Cost), SUM(Clicks), SUM(Impressions), SUM(Conversions) FROM campaigns",
+    "monthly_kpis": f"""
+        SELECT LEFT({rollup.DATE_EXPR}, 7) AS m, SUM(Sale_Amount), SUM(Cost), SUM(Clicks), SUM(Impressions)
+        FROM campaigns GROUP BY m ORDER BY m
+    """,
+    "keyword_conversions": "SELECT Keyword, SUM(Conversions) AS c FROM campaigns GROUP BY Keyword ORDER BY c DESC LIMIT 5",
+    "device_totals": "SELECT Device, SUM(Impressions), SUM(Conversions) FROM campaigns GROUP BY Device"
+}
+MYSQL_ROLLUP = {
+    "campaign_totals": """
+        SELECT SUM(sale_amount), SUM(cost), SUM(clicks), SUM(impressions), SUM(conversions)
+        FROM campaign_daily_rollup
+    """,
+    "monthly_kpis": f"""
+        SELECT month_start, SUM(sale_amount), SUM(cost), SUM(clicks), SUM(impressions)
+        FROM campaign_monthly_rollup WHERE month_start > '{rollup.UNDATED}'
+        GROUP BY month_start ORDER BY month_start
+    """,
+    "keyword_conversions": """
+        SELECT Keyword, SUM(conversions) AS c FROM campaign_daily_rollup GROUP BY Keyword ORDER BY c DESC LIMIT 5
+    """,
+    "device_totals": "SELECT Device, SUM(impressions), SUM(conversions) FROM campaign_daily_rollup GROUP BY Device"
+}
+
+
+def synthetic_partition(month, n, rng, id_offset):
+    import pyarrow as pa
+    first_day = np.datetime64(f"{month}-01")
+    days = (np.datetime64(f"{month}-01", "M") + 1 - first_day).astype(int)
+
+    def pick(values):
+        return pa.array(values).take(pa.array(rng.integers(0, len(values), n)))
+
+    clicks = rng.integers(0, 500, n)
+    return pa.Table.from_arrays([
+        pa.array(first_day + rng.integers(0, days, n)),
+        pa.array(np.arange(id_offset, id_offset + n)).cast(pa.string()),
+        pick([f"Campaign {i}" for i in range(5000)]),
+        pick(DEVICES),
+        pick(KEYWORDS),
+        pick(LOCATIONS),
+        pa.array(clicks * 20),
+        pa.array(clicks),
+        pa.array(clicks // 25),
+        pa.array(np.round(clicks * 0.8, 2)),
+        pa.array(clicks * 3.0)
+    ], schema=analytics_store.schema())
+
+
+def build_synthetic(path, rows, months=24):
+    month_keys = [str(np.datetime64("2024-01") + i) for i in range(months)]
+    partitions = [(m, p) for m in month_keys for p in PLATFORMS]
+    per_partition = rows // len(partitions)
+    rng = np.random.default_rng(0)
+    writer = analytics_store.PartitionWriter(path)
+    offset = 0
+    for key in partitions:
+        remaining = per_partition
+        while remaining:
+            n = min(SLICE_ROWS, remaining)
+            writer.add_table(key, synthetic_partition(key[0], n, rng, offset))
+            offset += n
+            remaining -= n
+    writer.close()
+    return offset
+
+
+def store_size(path):
+    return sum(os.path.getsize(os.path.join(d, f)) for d, _, files in os.walk(path) for f in files)
+
+
+def timed(fn, repeat):
+    samples = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        samples.append((time.perf_counter() - start) * 1000)
+    return statistics.median(samples)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rows", type=int, default=50_000_000)
+    parser.add_argument("--path", default="bench_analytics_store")
+    parser.add_argument("--export", action="store_true", help="export the configured database instead of synthetic rows")
+    parser.add_argument("--mysql", action="store_true", help="also time the MySQL backend")
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    start = time.perf_counter()
+    if args.export:
+        report = analytics_store.export(args.path, full=True)
+        rows = report["rows"]
+    else:
+        rows = build_synthetic(args.path, args.rows)
+    print(f"📦 {rows:,} rows in {args.path} ({store_size(args.path) / 1e6:,.0f} MB) "
+          f"written in {time.perf_counter() - start:.1f}s")
+
+    parquet = {
+        "campaign_totals": lambda: analytics_store.campaign_totals(root=args.path),
+        "monthly_kpis": lambda: analytics_store.monthly_kpis(root=args.path),
+        "keyword_conversions": lambda: analytics_store.keyword_conversions(root=args.path),
+        "device_totals": lambda: analytics_store.device_totals(root=args.path)
+    }
+    results = {name: {"parquet": timed(fn, args.repeat)} for name, fn in parquet.items()}
+
+    if args.mysql:
+        import mysql.connector
+        conn = mysql.connector.connect(**DB_CONFIG)
+        cursor = conn.cursor()
+
+        def run(sql):
+            cursor.execute(sql)
+            cursor.fetchall()
+
+        for name in parquet:
+            results[name]["mysql raw"] = timed(lambda: run(MYSQL_RAW[name]), args.repeat)
+            results[name]["mysql rollup"] = timed(lambda: run(MYSQL_ROLLUP[name]), args.repeat)
+        cursor.close()
+        conn.close()
+
+    backends = list(next(iter(results.values())))
+    print(f"{'query (median ms)':<22}" + "".join(f"{b:>14}" for b in backends))
+    for name, timings in results.items():
+        print(f"{name:<22}" + "".join(f"{timings[b]:>14.1f}" for b in backends))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,83 @@
+"""
+Benchmark: streaming anomaly detection at a million campaigns.
+
+Feeds rounds of synthetic metrics (Poisson clicks, impressions and
+conversions) for every campaign through AnomalyDetector, in the batch
+sizes /realTime and ingest use, then injects click spikes into a few
+campaigns per round and reports throughput, per-event latency, state
+size, false alerts and how many injected spikes were caught.
+
+Needs no database.
+
+    python bench_anomaly.py --campaigns 1000000 --rounds 12
+"""
+import argparse
+import time
+
+import numpy as np
+
+from anomaly import AnomalyDetector
+
+
+def synthetic_round(rng, n):
+    return (rng.poisson(30, n), rng.poisson(1000, n), rng.poisson(5, n), np.full(n, 50.0))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--campaigns", type=int, default=1_000_000)
+    parser.add_argument("--rounds", type=int, default=12, help="observations per campaign")
+    parser.add_argument("--batch", type=int, default=10_000, help="campaigns per observe() call")
+    parser.add_argument("--spikes", type=int, default=100, help="campaigns given 3x clicks in the last round")
+    parser.add_argument("--single", type=int, default=10_000, help="timed one-campaign observe() calls")
+    args = parser.parse_args()
+    n = args.campaigns
+
+    rng = np.random.default_rng(0)
+    keys = [f"ad-{i}" for i in range(n)]
+    names = [f"Campaign {i % 5000}" for i in range(n)]
+    detector = AnomalyDetector(max_alerts=max(1000, n))
+
+    print(f"📦 {n:,} campaigns, {args.rounds} rounds, batches of {args.batch:,}\n")
+    false_alerts = 0
+    for round_no in range(args.rounds):
+        clicks, impressions, conversions, cost = synthetic_round(rng, n)
+        last = round_no == args.rounds - 1
+        spiked = rng.choice(n, args.spikes, replace=False) if last else np.array([], dtype=np.int64)
+        clicks[spiked] *= 3
+
+        start = time.perf_counter()
+        alerts = []
+        for lo in range(0, n, args.batch):
+            hi = lo + args.batch
+            alerts += detector.observe(keys[lo:hi], clicks[lo:hi], impressions[lo:hi], conversions[lo:hi],
+                                       cost[lo:hi], names[lo:hi])
+        elapsed = time.perf_counter() - start
+
+        spiked_keys = {keys[i] for i in spiked}
+        caught = {a["ad_id"] for a in alerts if a["ad_id"] in spiked_keys and a["metric"] == "ctr"}
+        false_round = sum(1 for a in alerts if a["ad_id"] not in spiked_keys)
+        if round_no >= detector.min_observations:
+            false_alerts += false_round
+        note = f"   caught {len(caught)}/{len(spiked_keys)} spikes" if last else ""
+        print(f"round {round_no + 1:>3}: {elapsed * 1000:>8.0f} ms {n / elapsed:>12,.0f} events/s "
+              f"{elapsed / n * 1e6:>6.2f} µs/event {false_round:>7,} other alerts{note}")
+
+    scored = n * len(detector.ewma[0]) * max(1, args.rounds - detector.min_observations)
+    print(f"\n📊 false alert rate after warm-up: {false_alerts / scored:.3%} of scored metric values")
+
+    latencies = []
+    for i in rng.integers(0, n, args.single):
+        t = time.perf_counter()
+        detector.observe([keys[i]], [30], [1000], [5], [50.0])
+        latencies.append((time.perf_counter() - t) * 1e6)
+    print(f"⏱️  single-campaign observe (insertIntoDB): p50 {np.percentile(latencies, 50):.1f} µs, "
+          f"p99 {np.percentile(latencies, 99):.1f} µs")
+
+    stats = detector.stats()
+    print(f"💾 state arrays {stats['state_bytes'] / 1e6:.1f} MB for {stats['campaigns']:,} campaigns "
+          f"({stats['state_bytes'] / stats['capacity']:.0f} bytes each)")
+
+
+if __name__ == "__main__":
+    main()
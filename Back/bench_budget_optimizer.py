@@ -0,0 +1,112 @@
+"""
+Benchmark: /optimizeBudget's curve fit and allocation solver.
+
+Builds synthetic units with known curves conversions = a * spend^b, a
+daily history drawn from them with noise, then for each size:
+
+- times fit_curves over the history and reports how close the fitted
+  elasticities come to the true ones
+- times solve() on a budget 20% above current spend, with every unit
+  held between 0.2x and 3x its current spend
+- checks the KKT conditions (every unit not at a bound has the same
+  marginal return) and the lift over splitting the budget in proportion
+  to current spend
+
+A heap-based greedy allocation in small increments, which is optimal for
+concave curves up to the increment size, checks the solver on a small
+portfolio. Needs no database. The target is well under a second for
+thousands of campaigns.
+
+    python bench_budget_optimizer.py --units 1000 5000 10000 50000
+"""
+import argparse
+import heapq
+import time
+
+import numpy as np
+
+import budget_optimizer
+
+
+def synthetic_history(n, days, rng):
+    """(units, cost, conversions) per unit and day, and the true a, b and mean daily spend."""
+    a = rng.lognormal(-1.0, 0.6, n)
+    b = rng.uniform(0.3, 0.9, n)
+    current = rng.lognormal(4.0, 1.0, n)
+    cost = current[:, None] * rng.lognormal(0.0, 0.4, (n, days))
+    conversions = a[:, None] * cost ** b[:, None] * rng.lognormal(0.0, 0.2, (n, days))
+    units = np.repeat(np.array([f"Campaign {i}" for i in range(n)], dtype=object), days)
+    return units, cost.ravel(), conversions.ravel(), a, b, current
+
+
+def greedy(a, b, budget, lo, hi, increments):
+    """Reference: start at lo, then hand out the budget in equal increments to the best marginal gain."""
+    step = (budget - lo.sum()) / increments
+    spend = lo.copy()
+    gain = lambda i: a[i] * ((spend[i] + step) ** b[i] - spend[i] ** b[i])
+    heap = [(-gain(i), i) for i in range(len(a)) if spend[i] + step <= hi[i]]
+    heapq.heapify(heap)
+    for _ in range(increments):
+        _, i = heapq.heappop(heap)
+        spend[i] += step
+        if spend[i] + step <= hi[i]:
+            heapq.heappush(heap, (-gain(i), i))
+    return spend
+
+
+def best_ms(fn, repeat):
+    best, result = None, None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = fn()
+        elapsed = (time.perf_counter() - start) * 1000
+        best = elapsed if best is None else min(best, elapsed)
+    return best, result
+
+
+def check_greedy(rng, n=200, increments=20000):
+    a, b, current = rng.lognormal(-1.0, 0.6, n), rng.uniform(0.3, 0.9, n), rng.lognormal(4.0, 1.0, n)
+    budget, lo, hi = current.sum() * 1.2, current * 0.2, current * 3.0
+    spend, _, _ = budget_optimizer.solve(a, b, budget, lo, hi)
+    reference = greedy(a, b, budget, lo, hi, increments)
+    ours, theirs = (a * spend ** b).sum(), (a * reference ** b).sum()
+    ok = "✅" if ours >= theirs * (1 - 1e-6) else "❌"
+    print(f"{ok} greedy check ({n} units, {increments:,} increments): solver {ours:,.3f} vs greedy {theirs:,.3f}"
+          f" conversions/day, max spend gap {np.abs(spend - reference).max():.2f}\n")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--units", type=int, nargs="+", default=[1000, 5000, 10000, 50000])
+    parser.add_argument("--days", type=int, default=90, help="days of history per unit")
+    parser.add_argument("--repeat", type=int, default=5, help="best of N runs")
+    args = parser.parse_args()
+    rng = np.random.default_rng(0)
+
+    check_greedy(rng)
+    print(f"{'units':>8} {'fit':>10} {'solve':>10} {'steps':>6} {'KKT spread':>11} {'at bound':>9} "
+          f"{'b error':>8} {'lift':>7}")
+    for n in args.units:
+        units, cost, conversions, _, true_b, _ = synthetic_history(n, args.days, rng)
+        fit_ms, curves = best_ms(lambda: budget_optimizer.fit_curves(units, cost, conversions), args.repeat)
+        b_error = np.abs(curves.b - true_b).mean()
+
+        current = curves.current
+        budget, lo, hi = current.sum() * 1.2, current * 0.2, current * 3.0
+        solve_ms, (spend, _, steps) = best_ms(
+            lambda: budget_optimizer.solve(curves.a, curves.b, budget, lo, hi), args.repeat)
+
+        free = (spend > lo * (1 + 1e-9)) & (spend < hi * (1 - 1e-9))
+        marginal = curves.a[free] * curves.b[free] * spend[free] ** (curves.b[free] - 1)
+        spread = marginal.max() / marginal.min() - 1 if free.any() else 0.0
+        optimized = curves.predict(spend).sum()
+        proportional = curves.predict(current * budget / current.sum()).sum()
+
+        target = "✅" if fit_ms + solve_ms < 1000 else "❌"
+        print(f"{target} {n:>6,} {fit_ms:>7.1f} ms {solve_ms:>7.2f} ms {steps:>6} {spread:>11.1e} "
+              f"{1 - free.mean():>9.1%} {b_error:>8.3f} {(optimized / proportional - 1):>+7.1%}")
+    print("\n📊 KKT spread: max/min marginal return over the units not at a bound, minus 1")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,85 @@
+"""
+Latency of /simulateBudget's simulation: campaigns x spend levels in one
+model call, against scoring each level with its own predict_rows call.
+
+Uses synthetic campaign rows, so no database is needed (the model and
+encoders in this directory are loaded). Reports the cold path (features,
+scaler, model, curves) and the warm path, where a repeat slider move is
+served from the curve cache. The target is under 100 ms cold for 50
+campaigns x 100 levels.
+
+    python bench_budget_simulator.py --campaigns 50 --steps 100
+"""
+import argparse
+import time
+
+import numpy as np
+
+import budget_simulator
+import prediction_cache
+import predictor
+from bench_predict_batch import synthetic_rows
+
+
+def timed_ms(fn, repeat):
+    samples = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        samples.append((time.perf_counter() - start) * 1000)
+    return samples
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--campaigns", type=int, default=50)
+    parser.add_argument("--steps", type=int, default=100)
+    parser.add_argument("--repeat", type=int, default=20)
+    parser.add_argument("--per-level", type=int, default=10, help="levels timed for the one-call-per-level baseline")
+    args = parser.parse_args()
+
+    rows = synthetic_rows(args.campaigns)
+    grid = {"steps": args.steps}
+    # Warm up the model so graph building is not counted
+    predictor.predict_rows(synthetic_rows(8))
+
+    def cold():
+        budget_simulator.simulator.cache.invalidate()
+        return budget_simulator.simulate(rows, grid)
+
+    print(f"📦 {args.campaigns} campaigns x {args.steps} levels = {args.campaigns * args.steps:,} model rows\n")
+    cold_ms = timed_ms(cold, args.repeat)
+    warm_ms = timed_ms(lambda: budget_simulator.simulate(rows, grid), args.repeat)
+
+    # Where the cold time goes
+    scales = budget_simulator.scale_grid(np.array([r["Cost"] for r in rows]), **grid)
+    X = predictor.build_feature_matrix(rows)
+    phases = {}
+    start = time.perf_counter()
+    features = budget_simulator.grid_features(X, scales)
+    phases["features"] = time.perf_counter() - start
+    start = time.perf_counter()
+    scaled = predictor.components().scaler.transform(features)
+    phases["scaler"] = time.perf_counter() - start
+    start = time.perf_counter()
+    predictor.run_model(scaled, chunk_size=len(scaled))
+    phases["model"] = time.perf_counter() - start
+
+    # Baseline: one predict_rows call per spend level (uncached rows)
+    def per_level():
+        for k in scales[:args.per_level]:
+            level = [{**r, "Cost": r["Cost"] * k, "Campaign_Name": f"{r['Campaign_Name']} @{k:.4f}"} for r in rows]
+            prediction_cache.cache.invalidate()
+            predictor.predict_rows(level)
+    per_level_ms = min(timed_ms(per_level, 3)) / min(args.per_level, len(scales)) * len(scales)
+
+    target = "✅" if np.percentile(cold_ms, 50) < 100 else "❌"
+    print(f"{target} cold (model)       p50 {np.percentile(cold_ms, 50):>8.1f} ms   p95 {np.percentile(cold_ms, 95):>8.1f} ms")
+    print(f"⚡ warm (curve cache) p50 {np.percentile(warm_ms, 50):>8.1f} ms   p95 {np.percentile(warm_ms, 95):>8.1f} ms")
+    print(f"🐢 one call per level      {per_level_ms:>8.1f} ms (extrapolated from {args.per_level} levels)")
+    print("\n⏱️  cold phases: " + ", ".join(f"{name} {seconds * 1000:.1f} ms" for name, seconds in phases.items()))
+    print(f"📊 {budget_simulator.simulator.stats()}")
+
+
+if __name__ == "__main__":
+    main()
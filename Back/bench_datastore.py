@@ -0,0 +1,57 @@
+"""
+Time the typed datastore queries on the active driver.
+
+Select the driver the same way the service does, so the numbers match what
+the dashboard sees:
+
+    ADINTELLI_DATA_DRIVER=sqlite python bench_datastore.py
+    ADINTELLI_DATA_DRIVER=mysql python bench_datastore.py --repeat 20 --explain
+"""
+import argparse
+import statistics
+import time
+from datetime import date, timedelta
+
+import datastore
+
+QUERIES = {
+    "campaign_totals": datastore.campaign_totals,
+    "platform_totals": datastore.platform_totals,
+    "platform_summary": datastore.platform_summary,
+    "monthly_kpis": datastore.monthly_kpis,
+    "keyword_conversions": datastore.keyword_conversions,
+    "daily_totals": lambda: datastore.daily_totals(date.today() - timedelta(days=7)),
+    "device_totals": datastore.device_totals,
+    "predictive_insights": datastore.predictive_insights,
+    "latest_campaign": datastore.latest_campaign,
+    "campaign_costs": datastore.campaign_costs
+}
+
+
+def timed(fn, repeat):
+    samples = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        samples.append((time.perf_counter() - start) * 1000)
+    return statistics.median(samples), max(samples)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--repeat", type=int, default=10)
+    parser.add_argument("--explain", action="store_true", help="print each statement's query plan too")
+    args = parser.parse_args()
+
+    print(f"📊 driver: {datastore.driver.name}")
+    print(f"{'query':<22}{'median ms':>12}{'max ms':>12}")
+    for name, fn in QUERIES.items():
+        median, worst = timed(fn, args.repeat)
+        print(f"{name:<22}{median:>12.2f}{worst:>12.2f}")
+        if args.explain:
+            for row in datastore.explain(name):
+                print("    ", row)
+
+
+if __name__ == "__main__":
+    main()
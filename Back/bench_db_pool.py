@@ -0,0 +1,70 @@
+"""
+Compare requests/sec for connect-per-request vs the shared connection pool.
+
+Each simulated request runs the same query as /getROI. Run against a live
+MySQL instance:
+
+    python bench_db_pool.py --requests 2000 --concurrency 16
+"""
+import argparse
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import mysql.connector
+
+from config import DB_CONFIG
+from db_pool import ConnectionPool
+
+QUERY = "SELECT SUM(Sale_Amount), SUM(Cost) FROM campaigns"
+
+
+def request_with_new_connection():
+    conn = mysql.connector.connect(**DB_CONFIG)
+    cursor = conn.cursor()
+    cursor.execute(QUERY)
+    cursor.fetchone()
+    cursor.close()
+    conn.close()
+
+
+def make_pooled_request(pool):
+    def request_with_pool():
+        pooled = pool.acquire()
+        try:
+            cursor = pooled.conn.cursor()
+            cursor.execute(QUERY)
+            cursor.fetchone()
+            cursor.close()
+        finally:
+            pool.release(pooled)
+    return request_with_pool
+
+
+def run(label, fn, total, concurrency):
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency) as executor:
+        for future in [executor.submit(fn) for _ in range(total)]:
+            future.result()
+    elapsed = time.perf_counter() - start
+    print(f"{label:<24} {total} requests in {elapsed:.2f}s -> {total / elapsed:,.0f} req/s")
+    return total / elapsed
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--requests", type=int, default=1000)
+    parser.add_argument("--concurrency", type=int, default=16)
+    parser.add_argument("--pool-size", type=int, default=10)
+    args = parser.parse_args()
+
+    before = run("connect per request", request_with_new_connection, args.requests, args.concurrency)
+
+    pool = ConnectionPool(DB_CONFIG, size=args.pool_size)
+    after = run(f"pool (size {args.pool_size})", make_pooled_request(pool), args.requests, args.concurrency)
+    print(f"speedup: {after / before:.2f}x")
+    print(f"pool stats: {pool.stats()}")
+    pool.close()
+
+
+if __name__ == "__main__":
+    main()
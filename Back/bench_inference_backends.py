@@ -0,0 +1,62 @@
+"""
+Cold-start time and per-inference latency for the Keras and ONNX backends.
+
+Cold start is measured in a fresh interpreter: runtime import + model load
++ first prediction. Run export_model.py first so the ONNX model exists.
+
+    python bench_inference_backends.py --backends keras onnx
+"""
+import argparse
+import subprocess
+import sys
+import time
+
+import numpy as np
+
+import model_runtime
+
+COLD_START_SCRIPT = """
+import time
+start = time.perf_counter()
+import numpy as np
+import model_runtime
+runtime = model_runtime.load_runtime({backend!r})
+runtime.predict(np.zeros((1, 10), dtype=np.float32))
+print(time.perf_counter() - start)
+"""
+
+
+def cold_start(backend):
+    out = subprocess.run([sys.executable, "-c", COLD_START_SCRIPT.format(backend=backend)],
+                         capture_output=True, text=True, check=True)
+    return float(out.stdout.strip().splitlines()[-1])
+
+
+def latency(runtime, batch, iterations):
+    X = np.random.default_rng(0).normal(size=(batch, 10)).astype(np.float32)
+    runtime.predict(X)
+    timings = []
+    for _ in range(iterations):
+        start = time.perf_counter()
+        runtime.predict(X)
+        timings.append((time.perf_counter() - start) * 1000)
+    return np.percentile(timings, 50), np.percentile(timings, 99)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--backends", nargs="+", default=["keras", "onnx"])
+    parser.add_argument("--iterations", type=int, default=200)
+    args = parser.parse_args()
+
+    for backend in args.backends:
+        print(f"== {backend}")
+        print(f"   cold start (import + load + first predict): {cold_start(backend):.2f}s")
+        runtime = model_runtime.load_runtime(backend)
+        for batch in (1, 64, 1024):
+            p50, p99 = latency(runtime, batch, args.iterations)
+            print(f"   batch {batch:>5}: p50 {p50:8.2f} ms   p99 {p99:8.2f} ms")
+
+
+if __name__ == "__main__":
+    main()
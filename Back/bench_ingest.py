@@ -0,0 +1,107 @@
+"""
+Compare the old one-row-per-connection insert with ingest.ingest_records.
+
+Loads synthetic campaigns into a copy of the campaigns table (CREATE TABLE
+... LIKE campaigns), so the real data and rollup are untouched. The legacy
+path is timed on --legacy-rows rows and extrapolated. Each ingest method is
+run twice; the second run upserts the same Ad_IDs and must leave the row
+count unchanged.
+
+    python bench_ingest.py --rows 1000000
+    python bench_ingest.py --rows 1000000 --methods insert load_data --batch-size 10000
+"""
+import argparse
+import time
+
+import mysql.connector
+import numpy as np
+
+import ingest
+from config import DB_CONFIG
+
+TABLE = "campaigns_ingest_bench"
+PLATFORMS = ["Google Ads", "Meta Ads", "LinkedIn Ads", "Twitter Ads"]
+DEVICES = ["Mobile", "Desktop", "Tablet"]
+KEYWORDS = ["data analytics", "online course", "learn python", "ml training"]
+
+
+def synthetic_records(n, seed=0):
+    """Generator of campaign dicts, as an API or file reader would yield them."""
+    rng = np.random.default_rng(seed)
+    clicks = rng.integers(0, 500, n)
+    days = rng.integers(0, 365, n)
+    for i in range(n):
+        yield {
+            "Ad_ID": f"bench-{i}",
+            "Clicks": int(clicks[i]),
+            "Impressions": int(clicks[i] * 20),
+            "Campaign_Name": f"Campaign {i % 5000}",
+            "Cost": f"{clicks[i] * 0.8:.2f}",
+            "Leads": int(clicks[i] // 10),
+            "Conversions": int(clicks[i] // 25),
+            "Conversion Rate": 0.04,
+            "Sale_Amount": float(clicks[i] * 3),
+            "Ad_Date": str(np.datetime64("2024-01-01") + int(days[i])),
+            "Location": "hyderabad",
+            "Device": DEVICES[i % len(DEVICES)],
+            "Keyword": KEYWORDS[i % len(KEYWORDS)],
+            "Platform": PLATFORMS[i % len(PLATFORMS)]
+        }
+
+
+def legacy_insert(records):
+    """The old insertIntoDB: connect, INSERT one row, commit, close."""
+    sql = f"INSERT INTO {TABLE} ({ingest.COLUMN_LIST}) VALUES ({', '.join(['%s'] * len(ingest.COLUMNS))})"
+    for record in records:
+        conn = mysql.connector.connect(**DB_CONFIG)
+        cursor = conn.cursor()
+        cursor.execute(sql, tuple(record[c] for c in ingest.COLUMNS))
+        conn.commit()
+        cursor.close()
+        conn.close()
+
+
+def reset_table(cursor):
+    cursor.execute(f"DROP TABLE IF EXISTS {TABLE}")
+    cursor.execute(f"CREATE TABLE {TABLE} LIKE campaigns")
+
+
+def count_rows(cursor):
+    cursor.execute(f"SELECT COUNT(*) FROM {TABLE}")
+    return cursor.fetchone()[0]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rows", type=int, default=1_000_000)
+    parser.add_argument("--legacy-rows", type=int, default=2000)
+    parser.add_argument("--batch-size", type=int, default=ingest.INGEST_BATCH_SIZE)
+    parser.add_argument("--methods", nargs="+", default=["insert", "load_data"], choices=sorted(ingest.WRITERS))
+    args = parser.parse_args()
+
+    conn = mysql.connector.connect(**DB_CONFIG, allow_local_infile=True)
+    cursor = conn.cursor()
+    try:
+        reset_table(cursor)
+        start = time.perf_counter()
+        legacy_insert(synthetic_records(args.legacy_rows, seed=1))
+        legacy_rate = args.legacy_rows / (time.perf_counter() - start)
+        print(f"legacy insertIntoDB: {legacy_rate:,.0f} rows/s "
+              f"(~{args.rows / legacy_rate / 3600:.1f} h for {args.rows:,} rows)")
+
+        for method in args.methods:
+            reset_table(cursor)
+            conn.commit()
+            for label in ["load", "re-run"]:
+                report = ingest.ingest_records(synthetic_records(args.rows), batch_size=args.batch_size,
+                                               method=method, table=TABLE, update_rollup=False, conn=conn)
+                print(f"{method:>10} {label:>7}: {report['rows']:,} rows in {report['seconds']:.1f}s "
+                      f"= {report['rows_per_sec']:,} rows/s, table rows {count_rows(cursor):,}")
+    finally:
+        cursor.execute(f"DROP TABLE IF EXISTS {TABLE}")
+        cursor.close()
+        conn.close()
+
+
+if __name__ == "__main__":
+    main()
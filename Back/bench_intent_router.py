@@ -0,0 +1,101 @@
+"""
+How many chat questions does the intent router answer locally, how
+often is it right, and how fast?
+
+Runs a labelled set of typical questions (navigation ones with the
+section that should answer them, plus questions only the model can
+answer) through IntentRouter and reports the local hit rate, wrong local
+answers, and routing latency for each path.
+
+    python bench_intent_router.py
+    python bench_intent_router.py --repeat 2000 --min-score 0.35
+"""
+import argparse
+import time
+
+import numpy as np
+
+import chat
+from config import CHAT_ROUTER_MIN_SCORE, CHAT_ROUTER_MIN_MARGIN
+from intent_router import IntentRouter
+
+# (question, section that should answer it, or None for the model)
+QUESTIONS = [
+    ("Where is the budget simulator?", "Budget Optimization"),
+    ("How do I optimize my budget?", "Budget Optimization"),
+    ("where can I see AI budget recommendations", "Budget Optimization"),
+    ("Where is the ROI forecast chart?", "Budget Optimization"),
+    ("how much budget is remaining", "Budget Optimization"),
+    ("how do I monitor campaigns in real time", "Real-Time Monitoring"),
+    ("where's live spend tracking", "Real-Time Monitoring"),
+    ("show me live data", "Real-Time Monitoring"),
+    ("where are the quick action buttons", "Real-Time Monitoring"),
+    ("where do I find audience demographics", "Campaign Management"),
+    ("where can I see weekly trends", "Campaign Management"),
+    ("how do I manage campaigns", "Campaign Management"),
+    ("where is anomaly detection", "Campaign Management"),
+    ("where are the performance alerts", "Campaign Management"),
+    ("where is the campaign distribution pie chart", "Executive Overview"),
+    ("how do I view overall performance", "Executive Overview"),
+    ("where are total conversions", "Executive Overview"),
+    ("where is the search bar", "Search Bar"),
+    ("where is my profile", "User Avatar"),
+    ("how do I get AI help", "AI Assistant Panel"),
+    ("Which campaigns should I pause to improve ROAS?", None),
+    ("why did my conversions drop yesterday", None),
+    ("write me ad copy for a shoe sale", None),
+    ("what is a good CPC for LinkedIn ads", None),
+    ("compare Google and Facebook for B2B leads", None),
+    ("hello", None),
+    ("should I move budget from Twitter to Google?", None),
+    ("what does CTR mean", None),
+]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--repeat", type=int, default=1000, help="timed routings per question")
+    parser.add_argument("--min-score", type=float, default=CHAT_ROUTER_MIN_SCORE)
+    parser.add_argument("--min-margin", type=float, default=CHAT_ROUTER_MIN_MARGIN)
+    args = parser.parse_args()
+
+    start = time.perf_counter()
+    router = IntentRouter.from_guide(chat.SYSTEM_PROMPT, min_score=args.min_score, min_margin=args.min_margin)
+    print(f"📚 {len(router.intents)} intents, {len(router.index)} terms, "
+          f"built in {(time.perf_counter() - start) * 1000:.1f} ms")
+
+    latency_us = {"local": [], "model": []}
+    outcomes = {"right": 0, "wrong": 0, "missed": 0, "model": 0}
+    print(f"\n{'question':<50} {'route':<24} {'score':>6} {'margin':>7}")
+    for question, expected in QUESTIONS:
+        match = router.route(question)
+        best = router.best(question)
+        path = "local" if match else "model"
+        for _ in range(args.repeat):
+            t = time.perf_counter()
+            router.route(question)
+            latency_us[path].append((time.perf_counter() - t) * 1e6)
+
+        if match is None:
+            outcome = "missed" if expected else "model"
+        else:
+            outcome = "right" if match.intent.section == expected else "wrong"
+        outcomes[outcome] += 1
+        icon = {"right": "✅", "model": "✅", "missed": "➖", "wrong": "❌"}[outcome]
+        route = match.intent.section if match else "model"
+        print(f"{question[:49]:<50} {icon} {route:<21} {best.score if best else 0:>6.2f} "
+              f"{best.margin if best else 0:>7.2f}")
+
+    navigation = sum(1 for _, expected in QUESTIONS if expected)
+    local = outcomes["right"] + outcomes["wrong"]
+    print(f"\n📊 answered locally: {local}/{len(QUESTIONS)} ({local / len(QUESTIONS):.0%}), "
+          f"{outcomes['right']}/{navigation} navigation questions, {outcomes['wrong']} wrong section, "
+          f"{outcomes['model']}/{len(QUESTIONS) - navigation} others left to the model")
+    for path, samples in latency_us.items():
+        if samples:
+            print(f"⏱️  {path:<6} routing p50 {np.percentile(samples, 50):.0f} µs, "
+                  f"p99 {np.percentile(samples, 99):.0f} µs")
+
+
+if __name__ == "__main__":
+    main()
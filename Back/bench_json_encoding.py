@@ -0,0 +1,137 @@
+"""
+Benchmark: /getAllCampaigns serialization time and bytes on the wire.
+
+Encodes synthetic campaign rows (Decimal cost and sale amount, as MySQL
+returns them) the way the streamed route does, one encoder call per
+fetch batch, with Flask's default provider encoding row by row (the
+previous behaviour), the stdlib provider and the orjson provider, then
+compresses the body with every available Content-Encoding.
+
+Needs no database. With --url, a running server's /getAllCampaigns is
+fetched with each Accept-Encoding instead.
+
+    python bench_json_encoding.py --rows 100000
+    python bench_json_encoding.py --url http://localhost:5000
+"""
+import argparse
+import time
+from decimal import Decimal
+
+import numpy as np
+import requests
+from flask import Flask
+from flask.json.provider import DefaultJSONProvider
+
+import json_encoding
+
+
+def synthetic_campaigns(n):
+    """Rows shaped like app.campaign_rows() output."""
+    rng = np.random.default_rng(0)
+    platforms = ["Google Ads", "Facebook Ads", "Instagram Ads", "LinkedIn Ads", "Twitter Ads"]
+    cost = rng.uniform(0, 500, n).round(2)
+    sales = rng.uniform(0, 1500, n).round(2)
+    impressions = rng.integers(0, 1000, n)
+    clicks = rng.integers(0, 50, n)
+    return [{
+        "ad_id": i + 1,
+        "campaign_name": f"{platforms[i % len(platforms)]} Campaign {i % 250}",
+        "cost": Decimal(f"{cost[i]:.2f}"),
+        "sale_amount": Decimal(f"{sales[i]:.2f}"),
+        "impressions": int(impressions[i]),
+        "clicks": int(clicks[i]),
+        "conversions": int(rng.integers(0, 15)),
+        "ctr": round(float(clicks[i] / impressions[i] * 100) if impressions[i] else 0.0, 2),
+        "cpc": round(float(cost[i] / clicks[i]) if clicks[i] else 0.0, 2),
+        "roas": round(float(sales[i] / cost[i]) if cost[i] else 0.0, 2)
+    } for i in range(n)]
+
+
+def per_row(provider, rows):
+    # The previous stream_json_array: one dumps() call per row
+    parts = ["["]
+    for i, row in enumerate(rows):
+        parts.append(("," if i else "") + provider.dumps(row))
+    parts.append("]")
+    return "".join(parts).encode()
+
+
+def per_batch(provider, rows, batch_size):
+    chunks = [b"["]
+    for start in range(0, len(rows), batch_size):
+        body = provider.dumps_bytes(rows[start:start + batch_size])[1:-1]
+        chunks.append((b"," if start else b"") + body)
+    chunks.append(b"]")
+    return b"".join(chunks)
+
+
+def best_of(fn, repeat):
+    best, result = None, None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = fn()
+        elapsed = time.perf_counter() - start
+        best = elapsed if best is None else min(best, elapsed)
+    return best, result
+
+
+def bench_local(args):
+    rows = synthetic_campaigns(args.rows)
+    app = Flask(__name__)
+    encoders = [("flask default, per row", lambda: per_row(DefaultJSONProvider(app), rows))]
+    encoders.append(("stdlib, per batch", lambda: per_batch(json_encoding.StdlibProvider(app), rows, args.batch)))
+    if json_encoding.orjson is not None:
+        encoders.append(("orjson, per batch",
+                         lambda: per_batch(json_encoding.OrjsonProvider(app), rows, args.batch)))
+    else:
+        print("orjson not installed; skipping orjson benchmark")
+
+    print(f"📦 {args.rows:,} rows, batches of {args.batch}\n")
+    print(f"{'encoder':<26} {'time':>10} {'rows/s':>14} {'bytes':>12}")
+    baseline, body = None, None
+    for label, fn in encoders:
+        elapsed, body = best_of(fn, args.repeat)
+        baseline = baseline or elapsed
+        print(f"{label:<26} {elapsed * 1000:>7.1f} ms {args.rows / elapsed:>14,.0f} {len(body):>12,}"
+              f"   {baseline / elapsed:.1f}x")
+
+    print(f"\n{'encoding':<26} {'time':>10} {'bytes':>12} {'ratio':>7}")
+    print(f"{'identity':<26} {0:>7.1f} ms {len(body):>12,} {1:>7.1%}")
+    chunks = [body[i:i + 64 * 1024] for i in range(0, len(body), 64 * 1024)]
+    for encoding in json_encoding.available_encodings():
+        elapsed, compressed = best_of(lambda: b"".join(json_encoding.compress_chunks(chunks, encoding)),
+                                      args.repeat)
+        print(f"{encoding:<26} {elapsed * 1000:>7.1f} ms {len(compressed):>12,} {len(compressed) / len(body):>7.1%}")
+    if "br" not in json_encoding.available_encodings():
+        print("brotli not installed; skipping br")
+
+
+def bench_url(args):
+    url = args.url.rstrip("/") + "/getAllCampaigns"
+    print(f"🌐 {url}\n")
+    print(f"{'Accept-Encoding':<18} {'time':>10} {'wire bytes':>12}")
+    for accept in ["identity", "gzip", "br"]:
+        start = time.perf_counter()
+        response = requests.get(url, headers={"Accept-Encoding": accept}, stream=True)
+        wire = sum(len(chunk) for chunk in response.raw.stream(64 * 1024, decode_content=False))
+        elapsed = time.perf_counter() - start
+        served = response.headers.get("Content-Encoding", "identity")
+        note = "" if served == accept else f"   (served {served})"
+        print(f"{accept:<18} {elapsed * 1000:>7.0f} ms {wire:>12,}{note}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rows", type=int, default=100_000)
+    parser.add_argument("--batch", type=int, default=1000, help="rows per encoder call (app.STREAM_FETCH_SIZE)")
+    parser.add_argument("--repeat", type=int, default=3, help="best of N runs")
+    parser.add_argument("--url", help="benchmark a running server instead")
+    args = parser.parse_args()
+    if args.url:
+        bench_url(args)
+    else:
+        bench_local(args)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,112 @@
+"""
+Benchmark the per-platform aggregate on a synthetic campaigns table.
+
+Builds campaigns_bench (10M rows by default) and times the old
+one-query-per-platform loop against the single GROUP BY Platform query,
+first without and then with the covering index from migration 001.
+
+    python bench_platform_data.py --rows 10000000
+    python bench_platform_data.py --reuse      # skip regenerating the table
+"""
+import argparse
+import time
+
+import mysql.connector
+import numpy as np
+
+from config import DB_CONFIG
+
+TABLE = "campaigns_bench"
+PLATFORMS = np.array(["Google", "Facebook", "Linkedin", "Twitter", "Instagram", "Bing"])
+INDEX_NAME = "idx_bench_platform_cost_clicks_conv"
+
+
+def build_table(cursor, conn, rows, batch_size=50000):
+    cursor.execute(f"DROP TABLE IF EXISTS {TABLE}")
+    cursor.execute(f"""
+        CREATE TABLE {TABLE} (
+            Ad_ID BIGINT PRIMARY KEY,
+            Platform VARCHAR(32),
+            Cost DECIMAL(12, 2),
+            Clicks INT,
+            Conversions INT,
+            Ad_Date DATE
+        )
+    """)
+    rng = np.random.default_rng(42)
+    start = time.perf_counter()
+    for offset in range(0, rows, batch_size):
+        n = min(batch_size, rows - offset)
+        ids = np.arange(offset, offset + n)
+        platforms = PLATFORMS[rng.integers(0, len(PLATFORMS), n)]
+        costs = np.round(rng.uniform(1, 500, n), 2)
+        clicks = rng.integers(0, 500, n)
+        conversions = rng.integers(0, 50, n)
+        days = rng.integers(0, 365, n)
+        values = ",".join(
+            f"({i},'{p}',{c},{k},{v},DATE_ADD('2024-01-01', INTERVAL {d} DAY))"
+            for i, p, c, k, v, d in zip(ids, platforms, costs, clicks, conversions, days)
+        )
+        cursor.execute(f"INSERT INTO {TABLE} (Ad_ID, Platform, Cost, Clicks, Conversions, Ad_Date) VALUES {values}")
+        conn.commit()
+    print(f"Generated {rows:,} rows in {time.perf_counter() - start:.1f}s")
+
+
+def per_platform_loop(cursor):
+    for platform in ["Google", "Facebook", "Linkedin", "Twitter"]:
+        cursor.execute(
+            f"SELECT SUM(Conversions), SUM(Cost), SUM(Clicks) FROM {TABLE} WHERE Platform=%s",
+            (platform,)
+        )
+        cursor.fetchone()
+
+
+def group_by_platform(cursor):
+    cursor.execute(f"""
+        SELECT Platform, SUM(Conversions), SUM(Cost), SUM(Clicks)
+        FROM {TABLE} GROUP BY Platform ORDER BY SUM(Cost) DESC
+    """)
+    cursor.fetchall()
+
+
+def timeit(label, fn, cursor, repeat):
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn(cursor)
+        timings.append(time.perf_counter() - start)
+    print(f"{label:<40} best {min(timings) * 1000:>10.1f} ms   median {np.median(timings) * 1000:>10.1f} ms")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rows", type=int, default=10_000_000)
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--reuse", action="store_true", help="reuse an existing campaigns_bench table")
+    args = parser.parse_args()
+
+    conn = mysql.connector.connect(**DB_CONFIG)
+    cursor = conn.cursor()
+    if not args.reuse:
+        build_table(cursor, conn, args.rows)
+
+    cursor.execute(f"SHOW INDEX FROM {TABLE} WHERE Key_name = %s", (INDEX_NAME,))
+    if cursor.fetchall():
+        cursor.execute(f"DROP INDEX {INDEX_NAME} ON {TABLE}")
+
+    timeit("per-platform loop (no index)", per_platform_loop, cursor, args.repeat)
+    timeit("GROUP BY Platform (no index)", group_by_platform, cursor, args.repeat)
+
+    cursor.execute(f"CREATE INDEX {INDEX_NAME} ON {TABLE} (Platform, Cost, Clicks, Conversions)")
+    timeit("per-platform loop (covering index)", per_platform_loop, cursor, args.repeat)
+    timeit("GROUP BY Platform (covering index)", group_by_platform, cursor, args.repeat)
+
+    cursor.execute(f"EXPLAIN SELECT Platform, SUM(Conversions), SUM(Cost), SUM(Clicks) FROM {TABLE} GROUP BY Platform")
+    print("EXPLAIN:", cursor.fetchall())
+
+    cursor.close()
+    conn.close()
+
+
+if __name__ == "__main__":
+    main()
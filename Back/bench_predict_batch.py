@@ -0,0 +1,63 @@
+"""
+Throughput of per-row predict_campaign vs batched predict_rows.
+
+Uses synthetic campaign rows, so no database is needed (the model and
+encoders in this directory are loaded).
+
+    python bench_predict_batch.py --sizes 1 64 1024
+"""
+import argparse
+import time
+
+import numpy as np
+
+import predictor
+
+
+def synthetic_rows(n, seed=0):
+    rng = np.random.default_rng(seed)
+    platforms = [p[:-len(" Ads")] if p.endswith(" Ads") else p for p in predictor.components().platform_encoder.classes_]
+    rows = []
+    for i in range(n):
+        impressions = int(rng.integers(100, 10000))
+        clicks = int(rng.integers(0, impressions // 10 + 1))
+        rows.append({
+            "Campaign_Name": f"Bench Campaign {i}",
+            "Platform": platforms[i % len(platforms)],
+            "Impressions": impressions,
+            "Clicks": clicks,
+            "Cost": float(rng.uniform(10, 5000)),
+            "Sale_Amount": float(rng.uniform(0, 15000)),
+            "Conversions": int(rng.integers(0, clicks + 1)),
+            "recommended_budget_distribution": "50% Search, 30% Display, 20% Video",
+        })
+    return rows
+
+
+def throughput(fn, n, repeat=3):
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - start)
+    return n / best, best
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sizes", type=int, nargs="+", default=[1, 64, 1024])
+    args = parser.parse_args()
+
+    # Warm up the model so graph building is not counted
+    predictor.predict_rows(synthetic_rows(8))
+
+    print(f"{'batch':>6} {'per-row rows/s':>16} {'batched rows/s':>16} {'speedup':>8}")
+    for size in args.sizes:
+        rows = synthetic_rows(size)
+        single, _ = throughput(lambda: [predictor.predict_campaign(r) for r in rows], size, repeat=1)
+        batched, _ = throughput(lambda: predictor.predict_rows(rows), size)
+        print(f"{size:>6} {single:>16,.0f} {batched:>16,.0f} {batched / single:>7.1f}x")
+
+
+if __name__ == "__main__":
+    main()
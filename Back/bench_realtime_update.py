@@ -0,0 +1,97 @@
+"""
+Time the /realTime write path at 10k, 100k and 1M campaigns.
+
+Compares the old per-row "UPDATE ... WHERE Campaign_Name=%s" loop (only up
+to --legacy-max rows, it is O(n^2) without an index) with the set-based
+temporary table + UPDATE ... JOIN in realtime_metrics.
+
+    python bench_realtime_update.py --sizes 10000 100000 1000000
+"""
+import argparse
+import time
+
+import mysql.connector
+import numpy as np
+
+import derived_metrics
+import realtime_metrics
+from config import DB_CONFIG
+
+TABLE = "campaigns_rt_bench"
+
+
+def build_table(cursor, conn, n, batch_size=50000):
+    cursor.execute(f"DROP TABLE IF EXISTS {TABLE}")
+    cursor.execute(f"""
+        CREATE TABLE {TABLE} (
+            Ad_ID BIGINT PRIMARY KEY,
+            Campaign_Name VARCHAR(255),
+            Cost DECIMAL(12, 2),
+            Clicks INT,
+            Impressions INT,
+            Conversions INT
+        )
+    """)
+    rng = np.random.default_rng(1)
+    insert = f"INSERT INTO {TABLE} VALUES (%s, %s, %s, 0, 0, 0)"
+    for start in range(0, n, batch_size):
+        ids = range(start, min(n, start + batch_size))
+        costs = rng.uniform(1, 500, len(ids)).round(2).tolist()
+        cursor.executemany(insert, [(i, f"Campaign {i}", c) for i, c in zip(ids, costs)])
+    conn.commit()
+
+
+def legacy_update(cursor, conn):
+    cursor.execute(f"SELECT Campaign_Name, Cost FROM {TABLE}")
+    campaigns = cursor.fetchall()
+    total_cpc = 0
+    for name, cost in campaigns:
+        clicks = np.random.randint(0, 51)
+        impressions = np.random.randint(0, 101)
+        conversions = np.random.randint(0, 16)
+        cursor.execute(
+            f"UPDATE {TABLE} SET Clicks=%s, Impressions=%s, Conversions=%s WHERE Campaign_Name=%s",
+            (int(clicks), int(impressions), int(conversions), name)
+        )
+        total_cpc += float(cost) / clicks if clicks > 0 else 0
+    conn.commit()
+
+
+def bulk_update(cursor, conn):
+    cursor.execute(f"SELECT Ad_ID, Cost FROM {TABLE}")
+    campaigns = cursor.fetchall()
+    ad_ids = [c[0] for c in campaigns]
+    costs = derived_metrics.as_column([c[1] for c in campaigns])
+    metrics = realtime_metrics.simulate_metrics(len(ad_ids))
+    realtime_metrics.bulk_update_metrics(cursor, ad_ids, metrics, table=TABLE)
+    conn.commit()
+    return realtime_metrics.summarize(costs, metrics)
+
+
+def timed(fn, *args):
+    start = time.perf_counter()
+    fn(*args)
+    return time.perf_counter() - start
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sizes", type=int, nargs="+", default=[10_000, 100_000, 1_000_000])
+    parser.add_argument("--legacy-max", type=int, default=10_000)
+    args = parser.parse_args()
+
+    conn = mysql.connector.connect(**DB_CONFIG)
+    cursor = conn.cursor()
+    print(f"{'campaigns':>10} {'per-row loop':>14} {'set-based':>12}")
+    for n in args.sizes:
+        build_table(cursor, conn, n)
+        legacy = f"{timed(legacy_update, cursor, conn):.2f}s" if n <= args.legacy_max else "skipped"
+        bulk = timed(bulk_update, cursor, conn)
+        print(f"{n:>10,} {legacy:>14} {bulk:>11.2f}s")
+    cursor.execute(f"DROP TABLE IF EXISTS {TABLE}")
+    cursor.close()
+    conn.close()
+
+
+if __name__ == "__main__":
+    main()
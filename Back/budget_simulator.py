@@ -0,0 +1,188 @@
+"""
+Budget simulation for the Budget Optimization tab (/simulateBudget).
+
+Each campaign is simulated over a grid of spend levels, expressed as
+multiples of its current spend (1.0 = today). At each level, delivery
+(impressions, clicks, conversions) scales with spend at the campaign's
+current CPM and CPC, while CTR, ROAS and the budget split stay as they
+are. The model's ROI forecast (ROAS) then says how well each level would
+pay back:
+
+    revenue     = spend * forecast ROAS
+    conversions = revenue / current revenue per conversion
+
+Every (campaign, level) row goes through the scaler and the model in one
+call. Curves are cached per campaign row and grid: the key hashes the
+model version, the campaign's feature row and the grid, so repeat slider
+moves skip the model and a changed row can never reuse a stale curve.
+
+    python bench_budget_simulator.py --campaigns 50 --steps 100
+"""
+import threading
+
+import numpy as np
+
+import derived_metrics
+import prediction_cache
+import predictor
+from config import (SIMULATE_MIN_SCALE, SIMULATE_MAX_SCALE, SIMULATE_STEPS, SIMULATE_MAX_POINTS,
+                    SIMULATE_CACHE_SIZE, SIMULATE_CACHE_TTL)
+from prediction_cache import MemoryStore
+
+# Columns of predictor.build_feature_matrix that move with spend
+IMPRESSIONS, CLICKS, COST, CONVERSIONS, ROAS = 1, 2, 3, 4, 6
+CURVES = ["spend", "roas", "revenue", "conversions", "campaign_score"]
+
+
+def _numbers(values):
+    try:
+        return np.asarray(values, dtype=np.float64)
+    except (TypeError, ValueError):
+        return np.array([np.nan])  # fails the grid check in scale_grid
+
+
+def scale_grid(current_spend, scales=None, total_budgets=None, min_scale=SIMULATE_MIN_SCALE,
+               max_scale=SIMULATE_MAX_SCALE, steps=SIMULATE_STEPS):
+    """
+    Spend multiples to simulate: explicit `scales`, `total_budgets` split
+    across the campaigns in proportion to their current spend, or `steps`
+    evenly spaced multiples between min_scale and max_scale.
+    """
+    if scales is not None:
+        grid = _numbers(scales)
+    elif total_budgets is not None:
+        total = float(np.sum(current_spend))
+        if total <= 0:
+            raise ValueError("total_budgets needs campaigns with a current spend")
+        grid = _numbers(total_budgets) / total
+    else:
+        if not 2 <= steps <= SIMULATE_MAX_POINTS or min_scale > max_scale:
+            raise ValueError(f"steps must be between 2 and {SIMULATE_MAX_POINTS} "
+                             "and min_scale at most max_scale")
+        grid = np.linspace(min_scale, max_scale, steps)
+    if grid.ndim != 1 or not len(grid) or not np.isfinite(grid).all() or (grid < 0).any():
+        raise ValueError("the spend grid must be a non-empty list of non-negative numbers")
+    return grid
+
+
+def grid_features(X, scales):
+    """(n * steps, 10) unscaled model input: every row of X at every spend multiple, campaign-major."""
+    n, steps = len(X), len(scales)
+    grid = np.repeat(X, steps, axis=0)
+    factor = np.tile(scales, n)
+    # A campaign with no spend has no CPM/CPC to scale delivery by, so it stays as it is
+    volume = np.where(np.repeat(X[:, COST] > 0, steps), factor, 1.0)
+    for col in (IMPRESSIONS, CLICKS, CONVERSIONS):
+        grid[:, col] *= volume
+    grid[:, COST] *= factor
+    return grid
+
+
+class BudgetSimulator:
+    def __init__(self, max_entries=SIMULATE_CACHE_SIZE, ttl=SIMULATE_CACHE_TTL):
+        self.cache = MemoryStore(max_entries, ttl)
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+
+    def _count(self, hits, misses):
+        with self._lock:
+            self.hits += hits
+            self.misses += misses
+
+    def curves(self, rows, scales):
+        """{curve name: (len(rows), len(scales)) array} for campaigns rows over the spend grid."""
+        if len(rows) * len(scales) > SIMULATE_MAX_POINTS:
+            raise ValueError(f"At most {SIMULATE_MAX_POINTS} campaign x spend points per request")
+        X = predictor.build_feature_matrix(rows)
+        version = predictor.model_version()
+        keys = [prediction_cache.make_key(version, np.concatenate([x, scales])) for x in X]
+        cached = [self.cache.get(key) for key in keys]
+        missing = [i for i, curves in enumerate(cached) if curves is None]
+        self._count(len(rows) - len(missing), len(missing))
+
+        if missing:
+            fresh = self._simulate(X[missing], scales)
+            for j, i in enumerate(missing):
+                cached[i] = fresh[:, j].copy()
+                self.cache.set(keys[i], cached[i])
+        stacked = np.stack(cached, axis=1)  # (len(CURVES), n, steps)
+        return dict(zip(CURVES, stacked))
+
+    def _simulate(self, X, scales):
+        """Model forecasts for every (campaign, level) of X in one scaler and model call."""
+        n, steps = len(X), len(scales)
+        features = grid_features(X, scales)
+        preds = predictor.run_model(predictor.components().scaler.transform(features), chunk_size=len(features))
+        roas = preds["roi_forecast"][:, 0].reshape(n, steps).astype(np.float64)
+        score = preds["campaign_score"][:, 0].reshape(n, steps).astype(np.float64)
+
+        spend = features[:, COST].reshape(n, steps)
+        revenue = spend * roas
+        # Current revenue per conversion: ROAS * Cost / Conversions
+        revenue_per_conversion = derived_metrics.safe_divide(X[:, ROAS] * X[:, COST], X[:, CONVERSIONS])
+        conversions = derived_metrics.safe_divide(revenue, revenue_per_conversion[:, None])
+        return np.stack([spend, roas, revenue, conversions, score])
+
+    def stats(self):
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": round(self.hits / lookups, 4) if lookups else 0.0,
+                "entries": self.cache.size()
+            }
+
+
+def round_list(values, digits=2):
+    return np.round(values, digits).tolist()
+
+
+def simulation_response(rows, current_spend, scales, curves):
+    """The /simulateBudget body: the grid, the portfolio total curve and one curve set per campaign."""
+    total_spend = curves["spend"].sum(axis=0)
+    total_revenue = curves["revenue"].sum(axis=0)
+    return {
+        "scales": round_list(scales, 4),
+        "total": {
+            "current_spend": round(float(current_spend.sum()), 2),
+            "spend": round_list(total_spend),
+            "revenue": round_list(total_revenue),
+            "roas": round_list(derived_metrics.safe_divide(total_revenue, total_spend)),
+            "conversions": round_list(curves["conversions"].sum(axis=0))
+        },
+        "campaigns": [{
+            "campaign_name": row.get("Campaign_Name", "Unknown"),
+            "ad_id": row.get("Ad_ID"),
+            "current_spend": float(current_spend[i]),
+            **{name: round_list(curves[name][i]) for name in CURVES}
+        } for i, row in enumerate(rows)]
+    }
+
+
+def simulate(rows, grid):
+    """Response body for campaigns rows; `grid` holds the optional scales/total_budgets/min_scale/max_scale/steps."""
+    current_spend = derived_metrics.as_column([row.get("Cost") for row in rows])
+    scales = scale_grid(current_spend, **grid)
+    return simulation_response(rows, current_spend, scales, simulator.curves(rows, scales))
+
+
+def grid_args(data):
+    """scale_grid keyword arguments from a /simulateBudget body."""
+    grid = {}
+    for name in ("scales", "total_budgets"):
+        if data.get(name) is not None:
+            if not isinstance(data[name], list):
+                raise ValueError(f"{name} must be a list of numbers")
+            grid[name] = data[name]
+    for name, cast in (("min_scale", float), ("max_scale", float), ("steps", int)):
+        if data.get(name) is not None:
+            try:
+                grid[name] = cast(data[name])
+            except (TypeError, ValueError):
+                raise ValueError(f"{name} must be a number")
+    return grid
+
+
+simulator = BudgetSimulator()
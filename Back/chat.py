@@ -0,0 +1,418 @@
+"""
+Chat assistant behind /chat and /chat/stream.
+
+ChatService sits between the routes and the inference API:
+- navigation questions the UI guide answers with confidence are replied
+  to locally by intent_router.IntentRouter, without the model
+- replies are cached per normalized question ("Where is ROI?" and
+  "where is roi" share an entry) for CHAT_CACHE_TTL seconds
+- identical questions already waiting on the model share that one call
+- at most CHAT_MAX_INFLIGHT upstream calls run at once; beyond that
+  callers get ChatBusy right away rather than queueing behind the model
+- callers wait at most CHAT_TIMEOUT_SECONDS (ChatTimeout); a call that
+  outlives its caller still finishes and fills the cache
+- streamed replies are read on a pool thread, so the deadline holds
+  even while one chunk stalls; the client's read timeout (also
+  CHAT_TIMEOUT_SECONDS) then ends the stalled upstream read
+
+Point ADINTELLI_HF_BASE_URL at fake_inference_server.py to run it without
+the real API; loadtest_chat.py does that and checks each behaviour.
+"""
+import asyncio
+import json
+import queue
+import re
+import threading
+import time
+from concurrent.futures import Future, ThreadPoolExecutor, TimeoutError as FutureTimeout
+from typing import Iterator, NamedTuple
+
+import request_metrics
+from config import (HF_API_KEY, HF_MODEL, HF_BASE_URL, CHAT_TIMEOUT_SECONDS, CHAT_MAX_INFLIGHT,
+                    CHAT_MAX_TOKENS, CHAT_CACHE_TTL, CHAT_CACHE_SIZE, CHAT_ROUTER_ENABLED)
+from histogram import Histogram
+from intent_router import IntentRouter
+from prediction_cache import MemoryStore
+
+LATENCY_BOUNDS_MS = [1, 5, 25, 100, 250, 500, 1000, 2500, 5000, 10000, 30000]
+# Local answers take microseconds; the coarse bounds would put them all in one bucket
+LOCAL_LATENCY_BOUNDS_MS = [0.05, 0.1, 0.25, 0.5, 1, 5]
+EMPTY_REPLY = "Model returned empty response."
+
+CHAT_SYSTEM_PROMPT = """You are a helpful assistant of the site ADIntelli and will now help user solve their problems.
+                you should not go more than 3 max lines, its your limit.
+                    AdIntelli Frontend User Interface Guide
+Navigation Structure
+Main Dashboard Sections (Sidebar Navigation)
+1. Executive Overview
+Location: Main dashboard landing page
+Contains:
+Total ROI percentage card
+Click-Through Rate (CTR) card
+Total Conversions counter
+Campaign Score with progress bar
+Performance trends line chart (ROI vs CTR over months)
+Campaign distribution pie chart
+Platform performance cards (Google, Facebook, LinkedIn, Twitter)
+2. Campaign Management
+Location: Second tab in sidebar
+Contains:
+Active campaigns list with metrics (impressions, clicks, conversions, CTR, CPC, ROAS)
+Weekly performance trends chart
+Audience demographics bar chart
+Performance alerts section with anomaly detection
+3. Budget Optimization
+Location: Third tab in sidebar
+Contains:
+Budget overview cards (Total Budget, Spent, Remaining, Avg ROAS)
+Campaign budget status with progress bars
+AI budget recommendations
+ROI forecast area chart
+Platform budget allocation bar chart
+Budget simulator with slider
+4. Real-Time Monitoring
+Location: Fourth tab in sidebar
+Contains:
+Live metrics cards (Active Campaigns, Impressions, CTR, Clicks, Conversions, CPC)
+Live performance line chart
+Live spend tracking area chart
+Live alerts and notifications
+Quick action buttons
+AI Assistant Panel
+Location: Right sidebar (desktop only)
+Contains: Chat interface with AI assistant for campaign insights and recommendations
+Header Features
+Search Bar: Global search functionality
+Notifications Bell: Shows alerts and updates
+Settings: User preferences
+User Avatar: Profile access
+User Workflow Guide
+To view overall performance: Go to Executive Overview tab
+To manage campaigns: Go to Campaign Management tab
+To optimize budget: Go to Budget Optimization tab
+To monitor live data: Go to Real-Time Monitoring tab
+To get AI help: Use the AI Assistant panel on the right
+Response Guidelines for AI Assistant
+The AI assistant should provide concise, 3-line maximum responses that:
+Direct users to the correct dashboard section
+Explain what they'll find there
+Suggest specific actions they can take
+Example responses:
+"Go to Executive Overview tab to see your ROI and CTR metrics. You'll find performance trends and platform data there. Click on any metric card for detailed breakdown."
+"Visit Campaign Management tab to view all active campaigns. You can see performance metrics and weekly trends. Use the alerts section to identify optimization opportunities."
+"Check Budget Optimization tab for AI recommendations. You'll see budget status, forecasts, and can use the simulator. Apply suggested changes to improve performance."
+                  """
+
+# The guide is sent with every upstream call; indentation carries no
+# meaning for the model, so it is stripped once here
+SYSTEM_PROMPT = "\n".join(line.strip() for line in CHAT_SYSTEM_PROMPT.splitlines() if line.strip())
+
+
+class ChatError(Exception):
+    """Base class for errors surfaced to the chat routes."""
+
+
+class ChatBusy(ChatError):
+    """Raised when CHAT_MAX_INFLIGHT upstream calls are already running (backpressure)."""
+
+
+class ChatTimeout(ChatError):
+    """Raised when a reply is not ready within the request timeout."""
+
+
+class ChatReply(NamedTuple):
+    text: str
+    source: str  # "local", "cache", "coalesced" or "upstream"
+
+
+def normalize_question(message):
+    """Cache key text: lowercase words only, single spaces."""
+    return " ".join(re.sub(r"[^a-z0-9]+", " ", message.lower()).split())
+
+
+def chat_messages(user_message):
+    return [
+        {"role": "system", "content": SYSTEM_PROMPT},
+        {"role": "user", "content": user_message}
+    ]
+
+
+# ---------------- Upstream ----------------
+class InferenceUpstream:
+    """Hugging Face InferenceClient, or any OpenAI-compatible server when base_url is set."""
+
+    def __init__(self, model=HF_MODEL, api_key=HF_API_KEY, base_url=HF_BASE_URL,
+                 timeout=CHAT_TIMEOUT_SECONDS, max_tokens=CHAT_MAX_TOKENS):
+        from huggingface_hub import InferenceClient
+        self.model = model
+        # `timeout` is also the read timeout of every streamed chunk
+        self.max_tokens = max_tokens
+        if base_url:
+            self.client = InferenceClient(base_url=base_url, api_key=api_key or None, timeout=timeout)
+        else:
+            self.client = InferenceClient(api_key=api_key or None, timeout=timeout)
+
+    def complete(self, messages) -> str:
+        completion = self.client.chat.completions.create(model=self.model, messages=messages,
+                                                         max_tokens=self.max_tokens)
+        return completion.choices[0].message.get("content", "") or ""
+
+    def stream(self, messages) -> Iterator[str]:
+        for chunk in self.client.chat.completions.create(model=self.model, messages=messages,
+                                                         max_tokens=self.max_tokens, stream=True):
+            if chunk.choices and chunk.choices[0].delta.content:
+                yield chunk.choices[0].delta.content
+
+
+# ---------------- Service ----------------
+class ChatService:
+    def __init__(self, upstream, timeout=CHAT_TIMEOUT_SECONDS, max_inflight=CHAT_MAX_INFLIGHT,
+                 cache_ttl=CHAT_CACHE_TTL, cache_size=CHAT_CACHE_SIZE, router=None):
+        self.upstream = upstream
+        self.router = router
+        self.timeout = timeout
+        self.max_inflight = max_inflight
+        self.cache = MemoryStore(cache_size, cache_ttl)
+
+        self._slots = threading.BoundedSemaphore(max_inflight)
+        # One worker per slot, so an admitted call never waits for a thread
+        self._pool = ThreadPoolExecutor(max_workers=max_inflight, thread_name_prefix="chat-upstream")
+        self._inflight = {}  # cache key -> Future of the reply text
+        self._lock = threading.Lock()
+
+        self._counts = {"local": 0, "cache": 0, "coalesced": 0, "upstream": 0, "busy": 0, "timeout": 0, "error": 0}
+        self.latency_ms = {source: Histogram(LATENCY_BOUNDS_MS) for source in ["cache", "coalesced", "upstream"]}
+        self.latency_ms["local"] = Histogram(LOCAL_LATENCY_BOUNDS_MS)
+
+    def cache_key(self, message):
+        return f"{self.upstream.model}:{normalize_question(message)}"
+
+    def _count(self, outcome):
+        with self._lock:
+            self._counts[outcome] += 1
+
+    def _observe(self, source, started):
+        self._count(source)
+        self.latency_ms[source].observe((time.perf_counter() - started) * 1000)
+
+    def local_reply(self, message):
+        """ChatReply from the intent router, or None when the model should answer."""
+        if self.router is None:
+            return None
+        started = time.perf_counter()
+        match = self.router.route(message)
+        if match is None:
+            return None
+        self._observe("local", started)
+        return ChatReply(match.intent.answer, "local")
+
+    def _admit(self, key):
+        """
+        (future, source) for `key`: a finished future from the cache, the
+        future of an identical call already in flight, or None when this
+        caller holds a fresh upstream slot and must produce the reply.
+        """
+        text = self.cache.get(key)
+        if text is not None:
+            future = Future()
+            future.set_result(text)
+            return future, "cache"
+        with self._lock:
+            future = self._inflight.get(key)
+            if future is not None:
+                return future, "coalesced"
+            if not self._slots.acquire(blocking=False):
+                self._counts["busy"] += 1
+                raise ChatBusy(f"The assistant is busy ({self.max_inflight} questions in progress), try again shortly.")
+            future = Future()
+            self._inflight[key] = future
+            return future, None
+
+    def _finish(self, key, future, text=None, error=None, release=True):
+        """Resolve an upstream call for every waiter and free its slot (unless release=False)."""
+        try:
+            if error is not None:
+                future.set_exception(error)
+            else:
+                if text:
+                    self.cache.set(key, text)
+                future.set_result(text or EMPTY_REPLY)
+        finally:
+            with self._lock:
+                self._inflight.pop(key, None)
+            if release:
+                self._slots.release()
+
+    def _fetch(self, key, future, messages):
+        try:
+            text = self.upstream.complete(messages)
+        except Exception as e:
+            self._finish(key, future, error=e)
+        else:
+            self._finish(key, future, text)
+
+    def _pump(self, messages, chunks, cancelled):
+        """
+        Read an upstream stream into the `chunks` queue on a pool thread,
+        ending with ("done", None) or ("error", exception). The call keeps
+        its slot until the upstream read returns, even after the reader gave up.
+        """
+        stream = None
+        try:
+            stream = self.upstream.stream(messages)
+            for chunk in stream:
+                if cancelled.is_set():
+                    break
+                chunks.put(("chunk", chunk))
+            chunks.put(("done", None))
+        except Exception as e:
+            chunks.put(("error", e))
+        finally:
+            if stream is not None and hasattr(stream, "close"):
+                stream.close()
+            self._slots.release()
+
+    def submit(self, message):
+        """(Future of the reply text, source); raises ChatBusy."""
+        key = self.cache_key(message)
+        future, source = self._admit(key)
+        if source is None:
+            self._pool.submit(self._fetch, key, future, chat_messages(message))
+            source = "upstream"
+        return future, source
+
+    def reply(self, message) -> ChatReply:
+        local = self.local_reply(message)
+        if local is not None:
+            return local
+        started = time.perf_counter()
+        future, source = self.submit(message)
+        try:
+            with request_metrics.timed("model"):
+                text = future.result(timeout=self.timeout)
+        except FutureTimeout:
+            self._count("timeout")
+            raise ChatTimeout(f"The assistant did not answer within {self.timeout:g}s.")
+        except Exception:
+            self._count("error")
+            raise
+        self._observe(source, started)
+        return ChatReply(text, source)
+
+    async def reply_async(self, message) -> ChatReply:
+        """reply() for an asyncio caller; waiting holds no thread."""
+        local = self.local_reply(message)
+        if local is not None:
+            return local
+        started = time.perf_counter()
+        future, source = self.submit(message)
+        try:
+            # shield: a caller timing out must not cancel the call other waiters share
+            with request_metrics.timed("model"):
+                text = await asyncio.wait_for(asyncio.shield(asyncio.wrap_future(future)), self.timeout)
+        except asyncio.TimeoutError:
+            self._count("timeout")
+            raise ChatTimeout(f"The assistant did not answer within {self.timeout:g}s.")
+        except Exception:
+            self._count("error")
+            raise
+        self._observe(source, started)
+        return ChatReply(text, source)
+
+    def stream(self, message) -> Iterator[str]:
+        """
+        Reply text in chunks as the model produces them. Local, cached and
+        coalesced replies arrive as a single chunk; a streamed reply is
+        cached and shared with identical questions asked meanwhile.
+        """
+        local = self.local_reply(message)
+        if local is not None:
+            yield local.text
+            return
+        started = time.perf_counter()
+        deadline = started + self.timeout
+        key = self.cache_key(message)
+        future, source = self._admit(key)
+        if source is not None:
+            try:
+                text = future.result(timeout=self.timeout)
+            except FutureTimeout:
+                self._count("timeout")
+                raise ChatTimeout(f"The assistant did not answer within {self.timeout:g}s.")
+            except Exception:
+                self._count("error")
+                raise
+            self._observe(source, started)
+            yield text
+            return
+
+        # The pump thread frees the slot, so _finish below leaves it alone
+        chunks, cancelled = queue.Queue(), threading.Event()
+        self._pool.submit(self._pump, chat_messages(message), chunks, cancelled)
+        parts = []
+        try:
+            while True:
+                try:
+                    kind, value = chunks.get(timeout=max(deadline - time.perf_counter(), 0))
+                except queue.Empty:
+                    raise ChatTimeout(f"The assistant did not finish within {self.timeout:g}s.")
+                if kind == "done":
+                    break
+                if kind == "error":
+                    raise value
+                parts.append(value)
+                yield value
+        except ChatTimeout as e:
+            self._count("timeout")
+            self._finish(key, future, error=e, release=False)
+            raise
+        except GeneratorExit:
+            # Client went away mid-stream; waiters on this call get an error
+            self._finish(key, future, error=ChatError("The streamed reply was interrupted."), release=False)
+            raise
+        except Exception as e:
+            self._count("error")
+            self._finish(key, future, error=e, release=False)
+            raise
+        finally:
+            cancelled.set()
+        text = "".join(parts)
+        self._finish(key, future, text, release=False)
+        self._observe("upstream", started)
+        if not text:
+            yield EMPTY_REPLY
+
+    def stats(self):
+        with self._lock:
+            counts = dict(self._counts)
+            inflight = len(self._inflight)
+        answered = counts["local"] + counts["cache"] + counts["coalesced"] + counts["upstream"]
+        return {
+            **counts,
+            "in_flight": inflight,
+            "max_inflight": self.max_inflight,
+            "cached_replies": self.cache.size(),
+            "local_hit_rate": round(counts["local"] / answered, 4) if answered else 0.0,
+            "cache_hit_rate": round(counts["cache"] / answered, 4) if answered else 0.0,
+            "latency_ms": {source: h.snapshot() for source, h in self.latency_ms.items()}
+        }
+
+
+def sse_events(service, message):
+    """/chat/stream body: 'token' events, then 'done' with the full reply, or 'error'."""
+    parts = []
+    try:
+        for chunk in service.stream(message):
+            parts.append(chunk)
+            yield f"event: token\ndata: {json.dumps({'text': chunk})}\n\n"
+    except ChatError as e:
+        yield f"event: error\ndata: {json.dumps({'reply': str(e)})}\n\n"
+        return
+    except Exception as e:
+        yield f"event: error\ndata: {json.dumps({'reply': f'Error calling model: {str(e)}'})}\n\n"
+        return
+    yield f"event: done\ndata: {json.dumps({'reply': ''.join(parts)})}\n\n"
+
+
+service = ChatService(InferenceUpstream(),
+                      router=IntentRouter.from_guide(SYSTEM_PROMPT) if CHAT_ROUTER_ENABLED else None)
@@ -0,0 +1,158 @@
+import os
+
+# Database connection config (override with ADINTELLI_DB_* environment variables)
+DB_CONFIG = {
+    "host": os.environ.get("ADINTELLI_DB_HOST", "localhost"),
+    "user": os.environ.get("ADINTELLI_DB_USER", "root"),
+    "password": os.environ.get("ADINTELLI_DB_PASSWORD", ""),
+    "database": os.environ.get("ADINTELLI_DB_NAME", "adintelli")
+}
+
+# Connection pool settings
+DB_POOL_SIZE = int(os.environ.get("ADINTELLI_DB_POOL_SIZE", 10))
+# Seconds to wait for a free connection before giving up
+DB_POOL_TIMEOUT = float(os.environ.get("ADINTELLI_DB_POOL_TIMEOUT", 10))
+# Connections older than this (seconds) are reopened instead of reused
+DB_POOL_RECYCLE = int(os.environ.get("ADINTELLI_DB_POOL_RECYCLE", 1800))
+# Ping idle connections before handing them out
+DB_POOL_PRE_PING = os.environ.get("ADINTELLI_DB_POOL_PRE_PING", "1") == "1"
+
+# Artificial per-request delay (seconds) for demos; 0 disables it
+DEMO_DELAY_SECONDS = float(os.environ.get("ADINTELLI_DEMO_DELAY", 0))
+
+# Rows per model.predict call for batched predictions
+PREDICT_CHUNK_SIZE = int(os.environ.get("ADINTELLI_PREDICT_CHUNK_SIZE", 1024))
+
+# Micro-batching of concurrent /predict calls
+PREDICT_BATCHING_ENABLED = os.environ.get("ADINTELLI_PREDICT_BATCHING", "1") == "1"
+# Max time (ms) the first queued request waits for others to join its batch
+PREDICT_BATCH_WINDOW_MS = float(os.environ.get("ADINTELLI_PREDICT_BATCH_WINDOW_MS", 5))
+PREDICT_BATCH_MAX_SIZE = int(os.environ.get("ADINTELLI_PREDICT_BATCH_MAX_SIZE", 32))
+# Requests beyond this many queued are rejected with 503
+PREDICT_QUEUE_MAX = int(os.environ.get("ADINTELLI_PREDICT_QUEUE_MAX", 1024))
+
+# Model inference backend: "onnx", "keras" or "auto" (ONNX when the exported
+# model and onnxruntime are available, otherwise Keras)
+INFERENCE_BACKEND = os.environ.get("ADINTELLI_INFERENCE_BACKEND", "auto")
+
+# Prediction result cache: "memory" (per process), "sqlite" (local file
+# shared by all workers on the host) or "off"
+PREDICTION_CACHE_BACKEND = os.environ.get("ADINTELLI_PREDICTION_CACHE", "memory")
+PREDICTION_CACHE_TTL = float(os.environ.get("ADINTELLI_PREDICTION_CACHE_TTL", 300))
+PREDICTION_CACHE_SIZE = int(os.environ.get("ADINTELLI_PREDICTION_CACHE_SIZE", 10000))
+PREDICTION_CACHE_PATH = os.environ.get("ADINTELLI_PREDICTION_CACHE_PATH", "prediction_cache.sqlite3")
+
+# Real-time metrics stream: seconds between pushed updates and per-subscriber buffer
+REALTIME_TICK_SECONDS = float(os.environ.get("ADINTELLI_REALTIME_TICK", 2))
+REALTIME_SUBSCRIBER_BUFFER = int(os.environ.get("ADINTELLI_REALTIME_BUFFER", 16))
+
+# Bulk ingestion (ingest.py): rows per INSERT / LOAD DATA batch and the
+# write method, "insert" (multi-row INSERT) or "load_data" (LOAD DATA LOCAL
+# INFILE, needs local_infile enabled on the server)
+INGEST_BATCH_SIZE = int(os.environ.get("ADINTELLI_INGEST_BATCH_SIZE", 5000))
+INGEST_METHOD = os.environ.get("ADINTELLI_INGEST_METHOD", "insert")
+
+# Backend for the dashboard aggregates (KPIs, devices, keywords, campaign
+# score): "mysql" or "parquet" (DuckDB over the Parquet export kept by
+# analytics_store.py)
+ANALYTICS_BACKEND = os.environ.get("ADINTELLI_ANALYTICS_BACKEND", "mysql")
+ANALYTICS_PARQUET_DIR = os.environ.get("ADINTELLI_ANALYTICS_PARQUET_DIR", "analytics_store")
+# Seconds after a write before changed partitions are re-exported
+ANALYTICS_REFRESH_SECONDS = float(os.environ.get("ADINTELLI_ANALYTICS_REFRESH", 30))
+
+# Data-access driver for datastore.py: "mysql" (DB_CONFIG via the pool) or
+# "sqlite" (embedded file at SQLITE_PATH, no server needed)
+DATA_DRIVER = os.environ.get("ADINTELLI_DATA_DRIVER", "mysql")
+SQLITE_PATH = os.environ.get("ADINTELLI_SQLITE_PATH", "adintelli.sqlite3")
+
+# Hugging Face inference for /chat. HF_BASE_URL points the client at any
+# OpenAI-compatible server instead (e.g. fake_inference_server.py)
+HF_API_KEY = os.environ.get("HF_API_KEY", "")
+HF_MODEL = os.environ.get("ADINTELLI_HF_MODEL", "meta-llama/Llama-3.1-8B-Instruct")
+HF_BASE_URL = os.environ.get("ADINTELLI_HF_BASE_URL", "")
+
+# Chat assistant (chat.py): seconds a caller waits for a reply, concurrent
+# upstream calls (more are answered 503), reply length, and the cache of
+# replies per normalized question
+CHAT_TIMEOUT_SECONDS = float(os.environ.get("ADINTELLI_CHAT_TIMEOUT", 20))
+CHAT_MAX_INFLIGHT = int(os.environ.get("ADINTELLI_CHAT_MAX_INFLIGHT", 8))
+CHAT_MAX_TOKENS = int(os.environ.get("ADINTELLI_CHAT_MAX_TOKENS", 200))
+CHAT_CACHE_TTL = float(os.environ.get("ADINTELLI_CHAT_CACHE_TTL", 3600))
+CHAT_CACHE_SIZE = int(os.environ.get("ADINTELLI_CHAT_CACHE_SIZE", 1000))
+
+# ASGI server (asgi_app.py): threads that run model predictions off the
+# event loop, and how many predictions may be running or queued for them
+# before /predict answers 503
+ASYNC_PREDICT_WORKERS = int(os.environ.get("ADINTELLI_ASYNC_PREDICT_WORKERS", 8))
+ASYNC_PREDICT_MAX_PENDING = int(os.environ.get("ADINTELLI_ASYNC_PREDICT_MAX_PENDING", 256))
+
+# Local answers for /chat navigation questions (intent_router.py): a match
+# needs this cosine score and this lead over any other section to skip
+# the model
+CHAT_ROUTER_ENABLED = os.environ.get("ADINTELLI_CHAT_ROUTER", "1") == "1"
+CHAT_ROUTER_MIN_SCORE = float(os.environ.get("ADINTELLI_CHAT_ROUTER_MIN_SCORE", 0.4))
+CHAT_ROUTER_MIN_MARGIN = float(os.environ.get("ADINTELLI_CHAT_ROUTER_MIN_MARGIN", 0.1))
+
+# Request metrics on /metrics (request_metrics.py). With PROFILE_SLOW_MS
+# set, requests slower than that many ms have their sampled stacks written
+# to PROFILE_DIR as folded flame graph input; 0 leaves the profiler off
+PROFILE_SLOW_MS = float(os.environ.get("ADINTELLI_PROFILE_SLOW_MS", 0))
+PROFILE_INTERVAL_MS = float(os.environ.get("ADINTELLI_PROFILE_INTERVAL_MS", 5))
+PROFILE_DIR = os.environ.get("ADINTELLI_PROFILE_DIR", "profiles")
+
+# Dashboard response cache (response_cache.py): responses are kept per
+# route, query string and data version for up to RESPONSE_CACHE_TTL
+# seconds. The version is re-read from the database at most every
+# DATA_VERSION_POLL_SECONDS, and at once after this process writes
+RESPONSE_CACHE_ENABLED = os.environ.get("ADINTELLI_RESPONSE_CACHE", "1") == "1"
+RESPONSE_CACHE_SIZE = int(os.environ.get("ADINTELLI_RESPONSE_CACHE_SIZE", 512))
+RESPONSE_CACHE_TTL = int(os.environ.get("ADINTELLI_RESPONSE_CACHE_TTL", 300))
+DATA_VERSION_POLL_SECONDS = float(os.environ.get("ADINTELLI_DATA_VERSION_POLL_SECONDS", 2))
+
+# Response encoding (json_encoding.py): JSON_ENCODER is "auto" (orjson
+# when installed), "orjson" or "stdlib". Responses of at least
+# COMPRESS_MIN_BYTES are compressed with the first of COMPRESS_ENCODINGS
+# the client accepts ("br" needs the brotli package); 0 turns it off
+JSON_ENCODER = os.environ.get("ADINTELLI_JSON_ENCODER", "auto")
+COMPRESS_MIN_BYTES = int(os.environ.get("ADINTELLI_COMPRESS_MIN_BYTES", 1024))
+COMPRESS_ENCODINGS = [e.strip() for e in os.environ.get("ADINTELLI_COMPRESS_ENCODINGS", "br,gzip").split(",") if e.strip()]
+GZIP_LEVEL = int(os.environ.get("ADINTELLI_GZIP_LEVEL", 6))
+BROTLI_QUALITY = int(os.environ.get("ADINTELLI_BROTLI_QUALITY", 4))
+
+# Performance alerts (anomaly.py): per-campaign EWMA/Welford statistics
+# updated on every metrics write. A value ANOMALY_Z_THRESHOLD rolling
+# standard deviations from its EWMA (ANOMALY_CRITICAL_Z for a critical
+# alert) raises an alert once a campaign has ANOMALY_MIN_OBSERVATIONS
+# values; the rolling variance may not fall below ANOMALY_VARIANCE_FLOOR
+# of the long-run one. The newest ANOMALY_MAX_ALERTS are kept for /getAlerts
+ANOMALY_ENABLED = os.environ.get("ADINTELLI_ANOMALY", "1") == "1"
+ANOMALY_ALPHA = float(os.environ.get("ADINTELLI_ANOMALY_ALPHA", 0.1))
+ANOMALY_Z_THRESHOLD = float(os.environ.get("ADINTELLI_ANOMALY_Z", 3.5))
+ANOMALY_CRITICAL_Z = float(os.environ.get("ADINTELLI_ANOMALY_CRITICAL_Z", 5.0))
+ANOMALY_MIN_OBSERVATIONS = int(os.environ.get("ADINTELLI_ANOMALY_MIN_OBSERVATIONS", 10))
+ANOMALY_VARIANCE_FLOOR = float(os.environ.get("ADINTELLI_ANOMALY_VARIANCE_FLOOR", 1.0))
+ANOMALY_MAX_ALERTS = int(os.environ.get("ADINTELLI_ANOMALY_MAX_ALERTS", 1000))
+
+# Budget simulator (budget_simulator.py, /simulateBudget): the default
+# spend grid in multiples of each campaign's current spend, the most
+# campaign x level points one request may simulate, and the cache of
+# simulated curves per campaign row and grid
+SIMULATE_MIN_SCALE = float(os.environ.get("ADINTELLI_SIMULATE_MIN_SCALE", 0.25))
+SIMULATE_MAX_SCALE = float(os.environ.get("ADINTELLI_SIMULATE_MAX_SCALE", 2.0))
+SIMULATE_STEPS = int(os.environ.get("ADINTELLI_SIMULATE_STEPS", 100))
+SIMULATE_MAX_POINTS = int(os.environ.get("ADINTELLI_SIMULATE_MAX_POINTS", 20000))
+SIMULATE_CACHE_SIZE = int(os.environ.get("ADINTELLI_SIMULATE_CACHE_SIZE", 4096))
+SIMULATE_CACHE_TTL = int(os.environ.get("ADINTELLI_SIMULATE_CACHE_TTL", 600))
+
+# Budget optimizer (budget_optimizer.py, /optimizeBudget): the budget
+# period in days, how far above its history a unit's spend may go by
+# default (OPTIMIZER_MAX_SCALE x its average daily spend), how many days of
+# history a unit needs before its own curve slope outweighs the portfolio
+# one, the range slopes are clipped to, and the bisection limits
+OPTIMIZER_DAYS = int(os.environ.get("ADINTELLI_OPTIMIZER_DAYS", 30))
+OPTIMIZER_MAX_SCALE = float(os.environ.get("ADINTELLI_OPTIMIZER_MAX_SCALE", 3.0))
+OPTIMIZER_PRIOR_DAYS = float(os.environ.get("ADINTELLI_OPTIMIZER_PRIOR_DAYS", 14))
+OPTIMIZER_MIN_ELASTICITY = float(os.environ.get("ADINTELLI_OPTIMIZER_MIN_ELASTICITY", 0.05))
+OPTIMIZER_MAX_ELASTICITY = float(os.environ.get("ADINTELLI_OPTIMIZER_MAX_ELASTICITY", 0.95))
+OPTIMIZER_MAX_ITERATIONS = int(os.environ.get("ADINTELLI_OPTIMIZER_MAX_ITERATIONS", 100))
+OPTIMIZER_TOLERANCE = float(os.environ.get("ADINTELLI_OPTIMIZER_TOLERANCE", 1e-9))
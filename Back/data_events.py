@@ -0,0 +1,28 @@
+"""
+In-process notifications for writes to the campaigns table.
+
+Write paths (ingest_records, real_time_update, ...) call campaigns_changed();
+caches and other derived state subscribe to be told when to invalidate.
+"""
+import logging
+
+logger = logging.getLogger(__name__)
+
+_listeners = []
+
+
+def subscribe(listener):
+    """Register listener(campaign_names); campaign_names is None when every campaign may have changed."""
+    if listener not in _listeners:
+        _listeners.append(listener)
+    return listener
+
+
+def campaigns_changed(campaign_names=None):
+    if campaign_names is not None:
+        campaign_names = list(campaign_names)
+    for listener in list(_listeners):
+        try:
+            listener(campaign_names)
+        except Exception as e:
+            logger.error(f"Error in campaigns_changed listener {listener.__name__}: {str(e)}")
@@ -1,19 +1,432 @@
+"""
+Parallel, resumable CSV loader into SQLite or MySQL.
+
+Each file is split into byte ranges on line boundaries. Worker processes
+parse the ranges with pinned dtypes, and a single writer appends them in
+large transactions. Every chunk is checkpointed per target table in the
+same transaction as its rows, so a restart skips committed chunks and
+never loads a row twice. Ranges are split on newlines, so quoted fields
+must not contain line breaks, and every file of one run must have the
+same columns.
+
+Loading into `campaigns` also refreshes the daily rollup for the days the
+load touched (all of it after --fresh or when resuming) and bumps the data
+version, as ingest.py does, so the dashboard caches see the new rows.
+
+    python database.py mock_ads_deep_training_data.csv
+    python database.py "exports/*.csv" --target mysql --table campaign_data --workers 8
+    python database.py "exports/*.csv" --target sqlite:campaigns.db --fresh
+"""
+import argparse
+import csv
+import glob
+import io
+import math
+import os
+import sqlite3
+import time
+from collections import defaultdict
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+
+import mysql.connector
 import pandas as pd
-from sqlalchemy import create_engine
 
-# CSV file path
-csv_file = r"C:\Users\jyoti\OneDrive\Desktop\ASF Hackathon\lasttry\mock_ads_deep_training_data.csv"
+import datastore
+import rollup
+from config import DB_CONFIG
+
+CHECKPOINT_TABLE = "csv_load_checkpoints"
+DEFAULT_CHUNK_BYTES = 16 * 1024 * 1024
+DEFAULT_COMMIT_ROWS = 250_000
+# Rows per executemany call; keeps MySQL multi-row INSERTs under max_allowed_packet
+WRITE_BATCH_ROWS = 10_000
+
+# Pinned dtypes per known CSV layout; other columns are read as strings so
+# every chunk gets the same types regardless of its contents.
+SCHEMAS = {
+    # mock_ads_deep_training_data.csv (the model training data)
+    "training": {
+        "platform": "str",
+        "campaign_id": "int64",
+        "campaign_name": "str",
+        "impressions": "int64",
+        "clicks": "int64",
+        "spend": "float64",
+        "conversions": "int64",
+        "CTR": "float64",
+        "ROAS": "float64",
+        "campaign_score": "int64",
+        "performance_alerts": "int64",
+        "budget_recommendation": "str",
+        "recommended_budget_distribution": "str",
+        "avg_performance_score": "int64",
+        "budget_reallocation_opportunity": "str",
+        "audience_expansion_opportunity": "str",
+        "bid_strategy_optimization": "str"
+    },
+    # Exports of the campaigns table
+    "campaigns": {
+        "Ad_ID": "str",
+        "Clicks": "int64",
+        "Impressions": "int64",
+        "Campaign_Name": "str",
+        "Cost": "float64",
+        "Leads": "int64",
+        "Conversions": "int64",
+        "Conversion Rate": "float64",
+        "Sale_Amount": "float64",
+        "Ad_Date": "str",
+        "Location": "str",
+        "Device": "str",
+        "Keyword": "str",
+        "Platform": "str"
+    }
+}
+
+
+# ---------------- Planning ----------------
+def source_key(path):
+    """Identifies one version of a file; an edited file is loaded again from scratch."""
+    st = os.stat(path)
+    return f"{os.path.abspath(path)}|{st.st_size}|{st.st_mtime_ns}"
+
+
+def plan_chunks(path, chunk_bytes):
+    """Header line and (start, end) byte ranges that each end on a newline."""
+    size = os.path.getsize(path)
+    with open(path, "rb") as f:
+        header = f.readline()
+        ranges = []
+        start = f.tell()
+        while start < size:
+            f.seek(min(start + chunk_bytes, size))
+            f.readline()
+            end = min(f.tell(), size)
+            ranges.append((start, end))
+            start = end
+    return header, ranges
+
+
+# ---------------- Parsing (worker processes) ----------------
+def parse_chunk(task):
+    """Parse one byte range into (columns, sql kinds, rows); runs in a worker process."""
+    path, start, end, header, dtypes = task
+    began = time.perf_counter()
+    with open(path, "rb") as f:
+        f.seek(start)
+        data = f.read(end - start)
+    df = pd.read_csv(io.BytesIO(header + data), dtype=defaultdict(lambda: "str", dtypes))
+
+    kinds, columns = [], []
+    for col in df.columns:
+        if pd.api.types.is_integer_dtype(df[col]):
+            kinds.append("int")
+        elif pd.api.types.is_float_dtype(df[col]):
+            kinds.append("float")
+        else:
+            kinds.append("text")
+        values = df[col].tolist()
+        if df[col].hasnans:
+            values = [None if isinstance(v, float) and math.isnan(v) else v for v in values]
+        columns.append(values)
+
+    return {
+        "path": path,
+        "start": start,
+        "end": end,
+        "columns": list(df.columns),
+        "kinds": kinds,
+        "rows": list(zip(*columns)),
+        "parse_seconds": time.perf_counter() - began
+    }
+
+
+# ---------------- Targets ----------------
+class SQLiteTarget:
+    placeholder = "?"
+    types = {"int": "INTEGER", "float": "REAL", "text": "TEXT"}
+
+    def __init__(self, path):
+        self.conn = sqlite3.connect(path, isolation_level=None)
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        # The checkpoint table makes the load restartable, so a crash only
+        # costs the chunks of the open transaction
+        self.conn.execute("PRAGMA synchronous=OFF")
+        # Accepts the %s markers of the shared rollup/data version SQL too
+        self.cursor = datastore.SQLiteCursor(self.conn.cursor())
+        self.cursor.execute(f"""
+            CREATE TABLE IF NOT EXISTS {CHECKPOINT_TABLE} (
+                target_table TEXT NOT NULL,
+                source TEXT NOT NULL,
+                chunk_bytes INTEGER NOT NULL,
+                start_offset INTEGER NOT NULL,
+                end_offset INTEGER NOT NULL,
+                row_count INTEGER NOT NULL,
+                PRIMARY KEY (target_table, source, start_offset)
+            )
+        """)
+        self.cursor.execute("BEGIN")
+
+    @staticmethod
+    def quote(name):
+        return '"' + name.replace('"', '""') + '"'
+
+    def commit(self):
+        self.cursor.execute("COMMIT")
+        self.cursor.execute("BEGIN")
+
+    def rollback(self):
+        self.cursor.execute("ROLLBACK")
+        self.cursor.execute("BEGIN")
+
+    def close(self):
+        self.conn.close()
+
+
+class MySQLTarget:
+    placeholder = "%s"
+    types = {"int": "BIGINT", "float": "DOUBLE", "text": "TEXT"}
+
+    def __init__(self):
+        self.conn = mysql.connector.connect(**DB_CONFIG)
+        self.cursor = self.conn.cursor()
+        self.cursor.execute(f"""
+            CREATE TABLE IF NOT EXISTS {CHECKPOINT_TABLE} (
+                target_table VARCHAR(64) NOT NULL,
+                source VARCHAR(700) NOT NULL,
+                chunk_bytes BIGINT NOT NULL,
+                start_offset BIGINT NOT NULL,
+                end_offset BIGINT NOT NULL,
+                row_count BIGINT NOT NULL,
+                PRIMARY KEY (target_table, source, start_offset)
+            )
+        """)
+        self.conn.commit()
+
+    @staticmethod
+    def quote(name):
+        return "`" + name.replace("`", "``") + "`"
+
+    def commit(self):
+        self.conn.commit()
+
+    def rollback(self):
+        self.conn.rollback()
+
+    def close(self):
+        self.cursor.close()
+        self.conn.close()
+
+
+def open_target(spec):
+    """`sqlite:PATH` or `mysql` (connection settings from config.DB_CONFIG)."""
+    if spec == "mysql":
+        return MySQLTarget()
+    if spec.startswith("sqlite:"):
+        return SQLiteTarget(spec[len("sqlite:"):])
+    raise SystemExit(f"❌ Unknown target {spec!r}; use sqlite:PATH or mysql")
+
+
+class Writer:
+    """Single writer: creates the table on first use and appends chunks with their checkpoint."""
+
+    def __init__(self, target, table):
+        self.target = target
+        self.table_name = table
+        self.table = target.quote(table)
+        self.insert_sql = {}  # column tuple -> INSERT; files may order their columns differently
+        self.dates = set()  # Ad_Date values written, for the rollup refresh
+
+    def completed(self, source):
+        """{start_offset: chunk_bytes} of chunks already committed for this file version and table."""
+        p = self.target.placeholder
+        self.target.cursor.execute(
+            f"SELECT start_offset, chunk_bytes FROM {CHECKPOINT_TABLE} WHERE target_table = {p} AND source = {p}",
+            (self.table_name, source)
+        )
+        return dict(self.target.cursor.fetchall())
+
+    def reset(self):
+        p = self.target.placeholder
+        self.target.cursor.execute(f"DROP TABLE IF EXISTS {self.table}")
+        self.target.cursor.execute(f"DELETE FROM {CHECKPOINT_TABLE} WHERE target_table = {p}", (self.table_name,))
+        self.target.commit()
+
+    def write(self, chunk, source, chunk_bytes):
+        cursor = self.target.cursor
+        columns = tuple(chunk["columns"])
+        if columns not in self.insert_sql:
+            quoted = [self.target.quote(c) for c in columns]
+            definitions = ", ".join(f"{q} {self.target.types[k]}" for q, k in zip(quoted, chunk["kinds"]))
+            cursor.execute(f"CREATE TABLE IF NOT EXISTS {self.table} ({definitions})")
+            placeholders = ", ".join([self.target.placeholder] * len(quoted))
+            self.insert_sql[columns] = f"INSERT INTO {self.table} ({', '.join(quoted)}) VALUES ({placeholders})"
+
+        rows = chunk["rows"]
+        for i in range(0, len(rows), WRITE_BATCH_ROWS):
+            cursor.executemany(self.insert_sql[columns], rows[i:i + WRITE_BATCH_ROWS])
+        if "Ad_Date" in columns:
+            at = columns.index("Ad_Date")
+            self.dates.update(row[at] or rollup.UNDATED for row in rows)
+        p = self.target.placeholder
+        cursor.execute(
+            f"INSERT INTO {CHECKPOINT_TABLE} (target_table, source, chunk_bytes, start_offset, end_offset, row_count) "
+            f"VALUES ({p}, {p}, {p}, {p}, {p}, {p})",
+            (self.table_name, source, chunk_bytes, chunk["start"], chunk["end"], len(chunk["rows"]))
+        )
+
+    def refresh_rollup(self, rebuild=False):
+        """After a load into campaigns: the rollup days it touched (or all of it) and the data version."""
+        if rebuild:
+            rollup.rebuild(self.target.cursor)
+        elif self.dates:
+            rollup.refresh_dates(self.target.cursor, self.dates)
+        else:
+            return
+        datastore.bump_data_version(self.target.cursor)
+        self.target.commit()
+
+
+# ---------------- Driver ----------------
+def expand_paths(patterns):
+    paths = []
+    for pattern in patterns:
+        matches = sorted(glob.glob(pattern))
+        if not matches:
+            print(f"⚠️ No files match {pattern}")
+        paths.extend(matches)
+    return paths
+
+
+def check_headers(paths):
+    """Every file of one load must have the same columns (in any order)."""
+    expected = None
+    for path in paths:
+        with open(path, newline="", encoding="utf-8") as f:
+            columns = next(csv.reader(f), [])
+        if expected is None:
+            expected, first = set(columns), path
+        elif set(columns) != expected:
+            raise SystemExit(f"❌ {path} has different columns from {first}: "
+                             f"{sorted(set(columns) ^ expected)}")
+
+
+def build_tasks(writer, paths, chunk_bytes, dtypes):
+    tasks, sources, skipped = [], {}, 0
+    for path in paths:
+        source = source_key(path)
+        done = writer.completed(source)
+        file_chunk_bytes = chunk_bytes
+        if done:
+            # Resume with the split the earlier run used so offsets line up
+            file_chunk_bytes = next(iter(done.values()))
+        header, ranges = plan_chunks(path, file_chunk_bytes)
+        for start, end in ranges:
+            if start in done:
+                skipped += 1
+                continue
+            tasks.append((path, start, end, header, dtypes))
+        sources[path] = (source, file_chunk_bytes)
+    return tasks, sources, skipped
+
+
+def load(paths, target_spec, table, schema, workers, chunk_bytes, commit_rows, fresh=False):
+    target = open_target(target_spec)
+    writer = Writer(target, table)
+    stats = {"rows": 0, "parse_seconds": 0.0, "write_seconds": 0.0, "commit_seconds": 0.0, "commits": 0}
+    wall_start = time.perf_counter()
+    pending_rows = 0
+
+    def commit():
+        began = time.perf_counter()
+        target.commit()
+        stats["commit_seconds"] += time.perf_counter() - began
+        stats["commits"] += 1
+
+    check_headers(paths)
+    try:
+        if fresh:
+            writer.reset()
+        tasks, sources, skipped = build_tasks(writer, paths, chunk_bytes, SCHEMAS.get(schema, {}))
+        print(f"📂 {len(paths)} file(s), {len(tasks) + skipped} chunk(s), {skipped} already loaded")
+
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            queue = iter(tasks)
+            in_flight = set()
+            # Keep a bounded number of parsed chunks in memory
+            for task in queue:
+                in_flight.add(pool.submit(parse_chunk, task))
+                if len(in_flight) >= workers * 2:
+                    break
+            while in_flight:
+                finished, in_flight = wait(in_flight, return_when=FIRST_COMPLETED)
+                for future in finished:
+                    chunk = future.result()
+                    source, file_chunk_bytes = sources[chunk["path"]]
+                    began = time.perf_counter()
+                    writer.write(chunk, source, file_chunk_bytes)
+                    stats["write_seconds"] += time.perf_counter() - began
+                    stats["parse_seconds"] += chunk["parse_seconds"]
+                    stats["rows"] += len(chunk["rows"])
+                    pending_rows += len(chunk["rows"])
+                    if pending_rows >= commit_rows:
+                        commit()
+                        pending_rows = 0
+                        print(f"💾 {stats['rows']:,} rows committed")
+                    next_task = next(queue, None)
+                    if next_task is not None:
+                        in_flight.add(pool.submit(parse_chunk, next_task))
+        commit()
+        if table == "campaigns":
+            # A resumed load does not know the days of the chunks committed before
+            try:
+                writer.refresh_rollup(rebuild=fresh or skipped > 0)
+            except (sqlite3.Error, mysql.connector.Error) as e:
+                target.rollback()
+                print(f"⚠️ Rows committed, but the rollup was not refreshed ({e}); "
+                      f"run python datastore.py rebuild-rollup")
+    except BaseException:
+        # Chunks in the open transaction are not checkpointed either, so a
+        # restart loads them again
+        target.rollback()
+        raise
+    finally:
+        target.close()
+
+    wall = time.perf_counter() - wall_start
+    rows = stats["rows"]
+
+    def rate(seconds):
+        return f"{rows / seconds:,.0f} rows/s" if seconds else "n/a"
+
+    print(f"✅ Loaded {rows:,} rows into {table} in {wall:.1f}s")
+    print(f"   parse : {stats['parse_seconds']:.1f}s CPU across {workers} workers ({rate(stats['parse_seconds'])} per worker)")
+    print(f"   write : {stats['write_seconds']:.1f}s ({rate(stats['write_seconds'])})")
+    print(f"   commit: {stats['commit_seconds']:.1f}s over {stats['commits']} transaction(s)")
+    print(f"   total : {rate(wall)}")
+    return stats
 
 
-# SQLite engine
-engine = create_engine("sqlite:///campaigns.db")  # This will create campaigns.db
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("paths", nargs="+", help="CSV files or glob patterns")
+    parser.add_argument("--target", default="sqlite:campaigns.db", help="sqlite:PATH or mysql")
+    parser.add_argument("--table", default="campaign_data")
+    parser.add_argument("--schema", default="training", choices=sorted(SCHEMAS) + ["text"],
+                        help="pinned dtypes to parse with; 'text' reads every column as text")
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1)
+    parser.add_argument("--chunk-bytes", type=int, default=DEFAULT_CHUNK_BYTES)
+    parser.add_argument("--commit-rows", type=int, default=DEFAULT_COMMIT_ROWS,
+                        help="rows per transaction")
+    parser.add_argument("--fresh", action="store_true", help="drop the table and its checkpoints first")
+    args = parser.parse_args()
 
-# Define chunk size (10,000 rows per batch, you can increase if your RAM allows)
-chunksize = 10000
+    paths = expand_paths(args.paths)
+    if not paths:
+        raise SystemExit(1)
+    load(paths, args.target, args.table, args.schema, args.workers,
+         args.chunk_bytes, args.commit_rows, fresh=args.fresh)
 
-# Load CSV in chunks
-for i, chunk in enumerate(pd.read_csv(csv_file, chunksize=chunksize)):
-    chunk.to_sql("campaign_data", engine, if_exists="append", index=False)
-    print(f"Chunk {i+1} loaded")
 
-print("All chunks loaded successfully into SQLite!")
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,618 @@
+"""
+Data-access layer for the campaigns database.
+
+Every query the dashboard runs is a named Statement with typed wrapper
+functions, executed through one of two drivers chosen by DATA_DRIVER:
+
+- "mysql": the shared db_pool pool, with server-side prepared statements
+- "sqlite": an embedded SQLite file (SQLITE_PATH), so the service and its
+  benchmarks run locally without a MySQL server
+
+Statements are written once with %s markers; a Statement carries a
+SQLite variant only where the dialects differ. Parameters are always
+bound, never formatted into the SQL.
+
+    python datastore.py init                  # create the SQLite schema
+    python datastore.py copy-from-mysql       # copy campaigns + predictive_insights into SQLite
+    python datastore.py rebuild-rollup
+    python datastore.py bump-data-version     # after writing to the tables out of band
+    python datastore.py explain [statement]   # query plan on the active driver
+
+A SQLite file can also be filled from CSV exports:
+    python database.py export.csv --schema campaigns --target sqlite:adintelli.sqlite3 --table campaigns
+"""
+import argparse
+import sqlite3
+import threading
+from contextlib import contextmanager
+from datetime import date, datetime
+from decimal import Decimal
+from typing import Dict, Iterator, List, NamedTuple, Optional, Sequence, Tuple
+
+import mysql.connector
+
+import rollup
+from config import DATA_DRIVER, DB_CONFIG, SQLITE_PATH
+from db_pool import get_connection, get_cursor
+from request_metrics import TimedCursor
+
+
+# ---------------- Statements ----------------
+class Statement(NamedTuple):
+    mysql: str
+    sqlite: Optional[str] = None  # None: the MySQL text works on SQLite too
+
+
+STATEMENTS = {
+    "campaign_totals": Statement("""
+        SELECT SUM(Sale_Amount), SUM(Cost), SUM(Clicks), SUM(Impressions), SUM(Conversions)
+        FROM campaigns
+    """),
+    # Answered from idx_campaigns_platform_cost_clicks_conv alone (migration 001)
+    "platform_totals": Statement("""
+        SELECT Platform, SUM(Conversions), SUM(Cost), SUM(Clicks)
+        FROM campaigns
+        GROUP BY Platform
+        ORDER BY SUM(Cost) DESC
+    """),
+    "platform_totals_between": Statement("""
+        SELECT Platform, SUM(Conversions), SUM(Cost), SUM(Clicks)
+        FROM campaigns
+        WHERE Ad_Date >= %s AND Ad_Date <= %s
+        GROUP BY Platform
+        ORDER BY SUM(Cost) DESC
+    """),
+    "platform_summary": Statement("""
+        SELECT Platform, SUM(Sale_Amount), SUM(Cost), SUM(Clicks), SUM(Impressions), SUM(Conversions)
+        FROM campaigns
+        GROUP BY Platform
+        ORDER BY SUM(Cost) DESC
+    """),
+    "monthly_kpis": Statement("""
+        SELECT month_start, SUM(sale_amount), SUM(cost), SUM(clicks), SUM(impressions)
+        FROM campaign_monthly_rollup
+        WHERE month_start > %s
+        GROUP BY month_start
+        ORDER BY month_start
+    """),
+    "keyword_conversions": Statement("""
+        SELECT Keyword, SUM(conversions) AS total_conversions
+        FROM campaign_daily_rollup
+        GROUP BY Keyword
+        ORDER BY total_conversions DESC
+        LIMIT %s
+    """),
+    "rollup_conversions": Statement("SELECT SUM(conversions) FROM campaign_daily_rollup"),
+    "daily_totals": Statement("""
+        SELECT rollup_date, SUM(impressions), SUM(clicks), SUM(conversions)
+        FROM campaign_daily_rollup
+        WHERE rollup_date >= %s
+        GROUP BY rollup_date
+        ORDER BY rollup_date
+    """),
+    "device_totals": Statement("""
+        SELECT Device, SUM(impressions), SUM(conversions)
+        FROM campaign_daily_rollup
+        GROUP BY Device
+    """),
+    # Spend and outcomes per unit and day, the history budget_optimizer fits response curves to
+    "platform_daily_spend": Statement("""
+        SELECT Platform, rollup_date, SUM(cost), SUM(conversions), SUM(sale_amount)
+        FROM campaign_daily_rollup
+        GROUP BY Platform, rollup_date
+    """),
+    "campaign_daily_spend": Statement(f"""
+        SELECT Campaign_Name, {rollup.DATE_EXPR}, SUM(Cost), SUM(Conversions), SUM(Sale_Amount)
+        FROM campaigns
+        GROUP BY Campaign_Name, {rollup.DATE_EXPR}
+    """),
+    "predictive_insights": Statement("""
+        SELECT Campaign_Name, Spend, Status, CPC, Bidding_Strategy,
+               Conversions, Revenue, Profitable, Recommendation
+        FROM predictive_insights
+        ORDER BY Campaign_Name
+    """),
+    "campaign_by_name": Statement("SELECT * FROM campaigns WHERE Campaign_Name = %s LIMIT 1"),
+    "latest_campaign": Statement("SELECT * FROM campaigns ORDER BY Ad_ID DESC LIMIT 1"),
+    "campaign_costs": Statement("SELECT Ad_ID, Cost, Campaign_Name FROM campaigns"),
+    "all_campaigns": Statement("SELECT * FROM campaigns ORDER BY Ad_ID"),
+    "data_version": Statement("SELECT version FROM data_version WHERE id = 1"),
+    "bump_data_version": Statement("UPDATE data_version SET version = version + 1 WHERE id = 1")
+}
+
+SQLITE_SCHEMA = f"""
+CREATE TABLE IF NOT EXISTS campaigns (
+    Ad_ID TEXT PRIMARY KEY,
+    Clicks INTEGER,
+    Impressions INTEGER,
+    Campaign_Name TEXT,
+    Cost REAL,
+    Leads INTEGER,
+    Conversions INTEGER,
+    "Conversion Rate" REAL,
+    Sale_Amount REAL,
+    Ad_Date TEXT,
+    Location TEXT,
+    Device TEXT,
+    Keyword TEXT,
+    Platform TEXT
+);
+CREATE INDEX IF NOT EXISTS idx_campaigns_platform_cost_clicks_conv
+    ON campaigns (Platform, Cost, Clicks, Conversions);
+
+CREATE TABLE IF NOT EXISTS {rollup.ROLLUP_TABLE} (
+    rollup_date TEXT NOT NULL,
+    Platform TEXT NOT NULL DEFAULT '',
+    Device TEXT NOT NULL DEFAULT '',
+    Keyword TEXT NOT NULL DEFAULT '',
+    row_count INTEGER NOT NULL DEFAULT 0,
+    impressions INTEGER NOT NULL DEFAULT 0,
+    clicks INTEGER NOT NULL DEFAULT 0,
+    conversions INTEGER NOT NULL DEFAULT 0,
+    cost REAL NOT NULL DEFAULT 0,
+    sale_amount REAL NOT NULL DEFAULT 0,
+    PRIMARY KEY (rollup_date, Platform, Device, Keyword)
+);
+CREATE INDEX IF NOT EXISTS idx_rollup_device ON {rollup.ROLLUP_TABLE} (Device);
+CREATE INDEX IF NOT EXISTS idx_rollup_keyword ON {rollup.ROLLUP_TABLE} (Keyword);
+
+CREATE VIEW IF NOT EXISTS campaign_monthly_rollup AS
+SELECT
+    strftime('%Y-%m-01', rollup_date) AS month_start,
+    Platform,
+    Device,
+    Keyword,
+    SUM(row_count) AS row_count,
+    SUM(impressions) AS impressions,
+    SUM(clicks) AS clicks,
+    SUM(conversions) AS conversions,
+    SUM(cost) AS cost,
+    SUM(sale_amount) AS sale_amount
+FROM {rollup.ROLLUP_TABLE}
+GROUP BY strftime('%Y-%m-01', rollup_date), Platform, Device, Keyword;
+
+CREATE TABLE IF NOT EXISTS predictive_insights (
+    Campaign_Name TEXT,
+    Spend REAL,
+    Status TEXT,
+    CPC REAL,
+    Bidding_Strategy TEXT,
+    Conversions REAL,
+    Revenue REAL,
+    Profitable TEXT,
+    Recommendation TEXT
+);
+
+CREATE TABLE IF NOT EXISTS data_version (
+    id INTEGER PRIMARY KEY,
+    version INTEGER NOT NULL DEFAULT 0
+);
+INSERT OR IGNORE INTO data_version (id, version) VALUES (1, 0);
+"""
+
+
+# ---------------- Drivers ----------------
+class MySQLDriver:
+    name = "mysql"
+    explain = "EXPLAIN "
+
+    def sql(self, statement: Statement) -> str:
+        return statement.mysql
+
+    @contextmanager
+    def cursor(self, dictionary=False):
+        """Pooled cursor running server-side prepared statements."""
+        with get_cursor(prepared=True, dictionary=dictionary) as cursor:
+            yield TimedCursor(cursor)
+
+    @contextmanager
+    def stream(self, dictionary=False):
+        """Unbuffered cursor for reading large results batch by batch."""
+        with get_cursor(dictionary=dictionary, buffered=False) as cursor:
+            yield TimedCursor(cursor)
+
+    @contextmanager
+    def transaction(self):
+        with get_connection() as conn:
+            cursor = conn.cursor()
+            try:
+                yield TimedCursor(cursor)
+                conn.commit()
+            finally:
+                cursor.close()
+
+
+def _dict_row(cursor, row):
+    return {d[0]: v for d, v in zip(cursor.description, row)}
+
+
+class SQLiteDriver:
+    name = "sqlite"
+    explain = "EXPLAIN QUERY PLAN "
+
+    def __init__(self, path):
+        self.path = path
+        self._local = threading.local()
+        self._sql = {}
+
+    def sql(self, statement: Statement) -> str:
+        text = statement.sqlite or statement.mysql
+        if text not in self._sql:
+            self._sql[text] = text.replace("%s", "?")
+        return self._sql[text]
+
+    def _conn(self):
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            # One connection per thread; sqlite3 caches the prepared statements on it
+            conn = sqlite3.connect(self.path, timeout=10, cached_statements=256)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            self._local.conn = conn
+        return conn
+
+    @contextmanager
+    def cursor(self, dictionary=False):
+        cursor = self._conn().cursor()
+        if dictionary:
+            cursor.row_factory = _dict_row
+        try:
+            yield TimedCursor(SQLiteCursor(cursor))
+        finally:
+            cursor.close()
+
+    stream = cursor
+
+    @contextmanager
+    def transaction(self):
+        conn = self._conn()
+        cursor = conn.cursor()
+        try:
+            with conn:
+                yield TimedCursor(SQLiteCursor(cursor))
+        finally:
+            cursor.close()
+
+
+class SQLiteCursor:
+    """sqlite3 cursor that accepts the %s markers used by the MySQL code paths."""
+
+    def __init__(self, cursor):
+        self._cursor = cursor
+
+    def execute(self, sql, params=()):
+        return self._cursor.execute(sql.replace("%s", "?"), params)
+
+    def executemany(self, sql, rows):
+        return self._cursor.executemany(sql.replace("%s", "?"), rows)
+
+    def __getattr__(self, name):
+        return getattr(self._cursor, name)
+
+
+def _create_driver():
+    if DATA_DRIVER == "sqlite":
+        return SQLiteDriver(SQLITE_PATH)
+    if DATA_DRIVER != "mysql":
+        raise ValueError(f"Unknown DATA_DRIVER {DATA_DRIVER!r}, expected 'mysql' or 'sqlite'")
+    return MySQLDriver()
+
+
+driver = _create_driver()
+
+
+def fetchall(name: str, params: Sequence = (), dictionary=False) -> list:
+    with driver.cursor(dictionary=dictionary) as cursor:
+        cursor.execute(driver.sql(STATEMENTS[name]), tuple(params))
+        return cursor.fetchall()
+
+
+def fetchone(name: str, params: Sequence = (), dictionary=False):
+    rows = fetchall(name, params, dictionary)
+    return rows[0] if rows else None
+
+
+# ---------------- Typed queries ----------------
+def _num(value, cast=float):
+    """SUM() comes back as Decimal from MySQL and int/float from SQLite; NULL means 0."""
+    return cast(value) if value is not None else cast(0)
+
+
+class CampaignTotals(NamedTuple):
+    sales: float
+    cost: float
+    clicks: float
+    impressions: float
+    conversions: float
+
+    @classmethod
+    def from_row(cls, row):
+        return cls(*(_num(v) for v in row))
+
+
+class PlatformTotals(NamedTuple):
+    platform: Optional[str]
+    conversions: float
+    cost: float
+    clicks: float
+
+    @classmethod
+    def from_row(cls, row):
+        return cls(row[0], *(_num(v) for v in row[1:]))
+
+
+class PlatformSummary(NamedTuple):
+    platform: Optional[str]
+    sales: float
+    cost: float
+    clicks: float
+    impressions: float
+    conversions: float
+
+    @classmethod
+    def from_row(cls, row):
+        return cls(row[0], *(_num(v) for v in row[1:]))
+
+
+class MonthlyKpi(NamedTuple):
+    month: str  # "Nov 2024"
+    sales: float
+    cost: float
+    clicks: float
+    impressions: float
+
+    @classmethod
+    def from_row(cls, row):
+        return cls(datetime.strptime(str(row[0])[:7], "%Y-%m").strftime("%b %Y"), *(_num(v) for v in row[1:]))
+
+
+class DailyTotals(NamedTuple):
+    day: date
+    impressions: int
+    clicks: int
+    conversions: int
+
+    @classmethod
+    def from_row(cls, row):
+        return cls(date.fromisoformat(str(row[0])[:10]), *(_num(v, int) for v in row[1:]))
+
+
+class DeviceTotals(NamedTuple):
+    device: str
+    impressions: int
+    conversions: int
+
+    @classmethod
+    def from_row(cls, row):
+        return cls(row[0], _num(row[1], int), _num(row[2], int))
+
+
+class DailySpend(NamedTuple):
+    unit: str
+    day: str
+    cost: float
+    conversions: float
+    sales: float
+
+    @classmethod
+    def from_row(cls, row):
+        return cls(row[0] or "Unknown", str(row[1]), *(_num(v) for v in row[2:]))
+
+
+def platform_totals_query(start_date: Optional[str] = None, end_date: Optional[str] = None) -> Tuple[str, tuple]:
+    """Statement name and parameters for platform_totals."""
+    if start_date or end_date:
+        return "platform_totals_between", (start_date or "", end_date or "9999-12-31")
+    return "platform_totals", ()
+
+
+def campaigns_by_statement(column: str, count: int) -> Statement:
+    if column not in ("Ad_ID", "Campaign_Name"):
+        raise ValueError(f"Cannot look campaigns up by {column!r}")
+    placeholders = ", ".join(["%s"] * count)
+    return Statement(f"SELECT * FROM campaigns WHERE {column} IN ({placeholders})")
+
+
+def keyword_totals(top_rows, total_row) -> Tuple[List[Tuple[str, float]], float]:
+    return [(r[0], _num(r[1])) for r in top_rows], _num(total_row[0])
+
+
+def campaign_totals() -> CampaignTotals:
+    return CampaignTotals.from_row(fetchone("campaign_totals"))
+
+
+def platform_totals(start_date: Optional[str] = None, end_date: Optional[str] = None) -> List[PlatformTotals]:
+    """Per-platform conversions, cost and clicks, largest cost first, optionally within an Ad_Date range."""
+    return [PlatformTotals.from_row(r) for r in fetchall(*platform_totals_query(start_date, end_date))]
+
+
+def platform_summary() -> List[PlatformSummary]:
+    return [PlatformSummary.from_row(r) for r in fetchall("platform_summary")]
+
+
+def monthly_kpis() -> List[MonthlyKpi]:
+    """Dated months from the monthly rollup, oldest first."""
+    return [MonthlyKpi.from_row(r) for r in fetchall("monthly_kpis", (rollup.UNDATED,))]
+
+
+def keyword_conversions(limit: int = 5) -> Tuple[List[Tuple[str, float]], float]:
+    """(top keywords by conversions, total conversions)."""
+    return keyword_totals(fetchall("keyword_conversions", (int(limit),)), fetchone("rollup_conversions"))
+
+
+def daily_totals(since: date) -> List[DailyTotals]:
+    return [DailyTotals.from_row(r) for r in fetchall("daily_totals", (since.isoformat(),))]
+
+
+def device_totals() -> List[DeviceTotals]:
+    return [DeviceTotals.from_row(r) for r in fetchall("device_totals")]
+
+
+def daily_spend(level: str) -> List[DailySpend]:
+    """Cost, conversions and sales per day for each platform or campaign ("platform"/"campaign")."""
+    return [DailySpend.from_row(r) for r in fetchall(f"{level}_daily_spend")]
+
+
+def predictive_insights() -> List[Dict]:
+    return fetchall("predictive_insights", dictionary=True)
+
+
+def campaign_by_name(name: str) -> Optional[Dict]:
+    return fetchone("campaign_by_name", (name,), dictionary=True)
+
+
+def latest_campaign() -> Optional[Dict]:
+    return fetchone("latest_campaign", dictionary=True)
+
+
+def campaign_costs() -> List[Tuple]:
+    """(Ad_ID, Cost, Campaign_Name) for every campaign."""
+    return fetchall("campaign_costs")
+
+
+def campaigns_by(column: str, values: Sequence) -> List[Dict]:
+    """campaigns rows whose `column` (Ad_ID or Campaign_Name) is in `values`."""
+    statement = campaigns_by_statement(column, len(values))
+    with driver.cursor(dictionary=True) as cursor:
+        cursor.execute(driver.sql(statement), tuple(values))
+        return cursor.fetchall()
+
+
+def stream_rows(sql: str, params: Sequence = (), batch_size: int = 1000, dictionary=True) -> Iterator[list]:
+    """Run ad-hoc SQL (with %s markers) and yield its rows in batches without buffering the result."""
+    with driver.stream(dictionary=dictionary) as cursor:
+        cursor.execute(driver.sql(Statement(sql)), tuple(params))
+        while True:
+            rows = cursor.fetchmany(batch_size)
+            if not rows:
+                break
+            yield rows
+
+
+def iter_campaign_chunks(batch_size: int) -> Iterator[List[Dict]]:
+    yield from stream_rows(STATEMENTS["all_campaigns"].mysql, (), batch_size)
+
+
+def replace_predictive_insights(rows: Sequence[Tuple]) -> int:
+    with driver.transaction() as cursor:
+        cursor.execute("DELETE FROM predictive_insights")
+        cursor.executemany("""
+            INSERT INTO predictive_insights
+            (Campaign_Name, Spend, Status, CPC, Bidding_Strategy, Conversions, Revenue, Profitable, Recommendation)
+            VALUES (%s, %s, %s, %s, %s, %s, %s, %s, %s)
+        """, list(rows))
+        bump_data_version(cursor)
+        cursor.execute("SELECT COUNT(*) FROM predictive_insights")
+        return cursor.fetchone()[0]
+
+
+def rebuild_rollup():
+    """Recompute campaign_daily_rollup; rollup's SQL runs unchanged on SQLite."""
+    with driver.transaction() as cursor:
+        rollup.rebuild(cursor)
+        bump_data_version(cursor)
+
+
+def data_version() -> int:
+    """Counter bumped by every committed write (migration 003)."""
+    row = fetchone("data_version")
+    return int(row[0]) if row else 0
+
+
+def bump_data_version(cursor=None):
+    """
+    Mark the data as changed. Pass the cursor of the write's transaction so
+    the new version becomes visible together with the rows it describes.
+    """
+    if cursor is None:
+        with driver.transaction() as cursor:
+            cursor.execute(STATEMENTS["bump_data_version"].mysql)
+    else:
+        cursor.execute(STATEMENTS["bump_data_version"].mysql)
+
+
+# ---------------- Maintenance ----------------
+def init_sqlite(path=SQLITE_PATH):
+    conn = sqlite3.connect(path)
+    conn.executescript(SQLITE_SCHEMA)
+    conn.close()
+
+
+def _sqlite_value(value):
+    if isinstance(value, Decimal):
+        return float(value)
+    if isinstance(value, (date, datetime)):
+        return value.isoformat()
+    return value
+
+
+def copy_from_mysql(path=SQLITE_PATH, batch_size=10000):
+    """Copy campaigns and predictive_insights from MySQL (DB_CONFIG) into the SQLite file."""
+    init_sqlite(path)
+    source = mysql.connector.connect(**DB_CONFIG)
+    target = sqlite3.connect(path)
+    copied = {}
+    try:
+        for table in ["campaigns", "predictive_insights"]:
+            cursor = source.cursor()
+            cursor.execute(f"SELECT * FROM {table}")
+            columns = ", ".join(f'"{d[0]}"' for d in cursor.description)
+            insert = f"INSERT OR REPLACE INTO {table} ({columns}) VALUES ({', '.join(['?'] * len(cursor.description))})"
+            target.execute(f"DELETE FROM {table}")
+            copied[table] = 0
+            while True:
+                rows = cursor.fetchmany(batch_size)
+                if not rows:
+                    break
+                target.executemany(insert, [tuple(_sqlite_value(v) for v in row) for row in rows])
+                copied[table] += len(rows)
+            cursor.close()
+        target.execute(STATEMENTS["bump_data_version"].mysql)
+        target.commit()
+    finally:
+        source.close()
+        target.close()
+    return copied
+
+
+def explain(name: str) -> list:
+    """Query plan of a named statement on the active driver (placeholders bound to NULL)."""
+    statement = STATEMENTS[name]
+    sql = driver.sql(statement)
+    params = (None,) * (statement.mysql.count("%s"))
+    if name == "keyword_conversions":
+        params = (5,)
+    with driver.stream() as cursor:
+        cursor.execute(driver.explain + sql, params)
+        return cursor.fetchall()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("command", choices=["init", "copy-from-mysql", "rebuild-rollup", "bump-data-version",
+                                            "explain"])
+    parser.add_argument("statement", nargs="?", help="statement name for explain (default: all)")
+    args = parser.parse_args()
+
+    if args.command == "init":
+        init_sqlite()
+        print(f"✅ SQLite schema ready in {SQLITE_PATH}")
+    elif args.command == "copy-from-mysql":
+        copied = copy_from_mysql()
+        print(f"✅ Copied into {SQLITE_PATH}: " + ", ".join(f"{t} {n:,} rows" for t, n in copied.items()))
+    elif args.command == "rebuild-rollup":
+        rebuild_rollup()
+        print(f"✅ Rebuilt {rollup.ROLLUP_TABLE} on {driver.name}")
+    elif args.command == "bump-data-version":
+        bump_data_version()
+        print(f"✅ Data version is now {data_version()} on {driver.name}")
+    else:
+        names = [args.statement] if args.statement else list(STATEMENTS)
+        for name in names:
+            print(f"--- {name} ({driver.name})")
+            for row in explain(name):
+                print("   ", row)
+
+
+if __name__ == "__main__":
+    main()
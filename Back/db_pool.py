@@ -0,0 +1,218 @@
+import logging
+import queue
+import threading
+import time
+from contextlib import contextmanager
+
+import mysql.connector
+
+from config import (DB_CONFIG, DB_POOL_SIZE, DB_POOL_TIMEOUT,
+                    DB_POOL_RECYCLE, DB_POOL_PRE_PING)
+
+logger = logging.getLogger(__name__)
+
+
+class PoolExhausted(Exception):
+    """Raised when no connection becomes free within the pool timeout."""
+
+
+class _PooledConnection:
+    def __init__(self, conn):
+        self.conn = conn
+        self.created_at = time.monotonic()
+
+
+class ConnectionPool:
+    """
+    Fixed-size MySQL connection pool.
+
+    Connections are opened lazily up to `size`, handed out LIFO so the
+    warmest connection is reused first, recycled after `recycle` seconds
+    and optionally pinged before use.
+    """
+
+    def __init__(self, db_config, size=DB_POOL_SIZE, timeout=DB_POOL_TIMEOUT,
+                 recycle=DB_POOL_RECYCLE, pre_ping=DB_POOL_PRE_PING):
+        self.db_config = db_config
+        self.size = size
+        self.timeout = timeout
+        self.recycle = recycle
+        self.pre_ping = pre_ping
+
+        self._idle = queue.LifoQueue(maxsize=size)
+        self._lock = threading.Lock()
+        self._opened = 0
+
+        # Metrics
+        self._checked_out = 0
+        self._borrows = 0
+        self._misses = 0
+        self._timeouts = 0
+        self._recycled = 0
+        self._wait_total = 0.0
+        self._wait_max = 0.0
+
+    def _connect(self):
+        return _PooledConnection(mysql.connector.connect(**self.db_config))
+
+    def _discard(self, pooled):
+        try:
+            pooled.conn.close()
+        except Exception:
+            pass
+        with self._lock:
+            self._opened -= 1
+
+    def _try_open(self):
+        with self._lock:
+            if self._opened >= self.size:
+                return None
+            self._opened += 1
+        try:
+            return self._connect()
+        except Exception:
+            with self._lock:
+                self._opened -= 1
+            raise
+
+    def _is_usable(self, pooled):
+        if time.monotonic() - pooled.created_at > self.recycle:
+            with self._lock:
+                self._recycled += 1
+            return False
+        if self.pre_ping:
+            try:
+                pooled.conn.ping(reconnect=False)
+            except Exception:
+                return False
+        return True
+
+    def acquire(self):
+        start = time.perf_counter()
+        pooled = None
+        try:
+            pooled = self._idle.get_nowait()
+        except queue.Empty:
+            # No idle connection: open a new one if we are under the limit,
+            # otherwise wait for a connection to be released.
+            with self._lock:
+                self._misses += 1
+            pooled = self._try_open() or self._wait_for_idle()
+
+        if not self._is_usable(pooled):
+            self._discard(pooled)
+            pooled = self._try_open() or self._connect_replacement()
+
+        waited = time.perf_counter() - start
+        with self._lock:
+            self._borrows += 1
+            self._checked_out += 1
+            self._wait_total += waited
+            self._wait_max = max(self._wait_max, waited)
+        return pooled
+
+    def _wait_for_idle(self):
+        """Wait for a released connection; raises PoolExhausted after the pool timeout."""
+        try:
+            return self._idle.get(timeout=self.timeout)
+        except queue.Empty:
+            with self._lock:
+                self._timeouts += 1
+            raise PoolExhausted(
+                f"No database connection available after {self.timeout}s "
+                f"(pool size {self.size})"
+            )
+
+    def _connect_replacement(self):
+        # The slot freed by _discard may have been taken by another thread
+        # in the meantime; fall back to waiting for a released connection.
+        return self._wait_for_idle()
+
+    def release(self, pooled):
+        with self._lock:
+            self._checked_out -= 1
+        conn = pooled.conn
+        try:
+            if conn.unread_result:
+                # An abandoned unbuffered cursor (e.g. a client disconnecting
+                # mid-stream) may have millions of rows left; reconnecting is
+                # cheaper than draining them.
+                self._discard(pooled)
+                return
+            if conn.in_transaction:
+                conn.rollback()
+        except Exception as e:
+            logger.warning(f"Discarding broken pooled connection: {str(e)}")
+            self._discard(pooled)
+            return
+        self._idle.put(pooled)
+
+    def stats(self):
+        with self._lock:
+            return {
+                "size": self.size,
+                "opened": self._opened,
+                "idle": self._idle.qsize(),
+                "checked_out": self._checked_out,
+                "borrows": self._borrows,
+                "misses": self._misses,
+                "timeouts": self._timeouts,
+                "recycled": self._recycled,
+                "wait_total_ms": round(self._wait_total * 1000, 3),
+                "wait_avg_ms": round(self._wait_total * 1000 / self._borrows, 3) if self._borrows else 0,
+                "wait_max_ms": round(self._wait_max * 1000, 3)
+            }
+
+    def close(self):
+        while True:
+            try:
+                pooled = self._idle.get_nowait()
+            except queue.Empty:
+                break
+            self._discard(pooled)
+
+
+_pool = None
+_pool_lock = threading.Lock()
+
+
+def get_pool():
+    global _pool
+    if _pool is None:
+        with _pool_lock:
+            if _pool is None:
+                _pool = ConnectionPool(DB_CONFIG)
+    return _pool
+
+
+@contextmanager
+def get_connection():
+    """Borrow a connection from the shared pool for the duration of the block."""
+    pool = get_pool()
+    pooled = pool.acquire()
+    try:
+        yield pooled.conn
+    finally:
+        pool.release(pooled)
+
+
+@contextmanager
+def get_cursor(**cursor_kwargs):
+    """Borrow a pooled connection and yield a cursor on it; the cursor is closed on exit."""
+    with get_connection() as conn:
+        cursor = conn.cursor(**cursor_kwargs)
+        try:
+            yield cursor
+        finally:
+            try:
+                cursor.close()
+            except mysql.connector.errors.InternalError:
+                # Unread rows left by an abandoned unbuffered cursor;
+                # release() discards the connection instead.
+                pass
+
+
+def pool_stats():
+    if _pool is None:
+        return {"size": DB_POOL_SIZE, "opened": 0}
+    return _pool.stats()
@@ -1,14 +1,16 @@
 import sqlite3
 
-conn = sqlite3.connect("campaigns.db")
+from config import SQLITE_PATH
+
+conn = sqlite3.connect(SQLITE_PATH)
 cursor = conn.cursor()
 
 # List tables
 cursor.execute("SELECT name FROM sqlite_master WHERE type='table';")
 print(cursor.fetchall())
 
-# Check first 5 rows from correct table
-cursor.execute("SELECT * FROM campaign_data LIMIT 5;")
+# Check first 5 rows from the campaigns table
+cursor.execute("SELECT * FROM campaigns LIMIT 5;")
 for row in cursor.fetchall():
     print(row)
 
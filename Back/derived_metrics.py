@@ -0,0 +1,107 @@
+"""
+Shared derived-metric calculations (CTR, CPC, ROAS, ROI, conversion rate).
+
+Every function works on NumPy column arrays (or plain scalars) and applies
+the same zero guard everywhere: when the denominator is zero, negative or
+missing the metric is 0 rather than an error or inf.
+
+    CTR             = Clicks / Impressions * 100
+    CPC             = Cost / Clicks
+    ROAS            = Sale_Amount / Cost
+    ROI             = (Sale_Amount - Cost) / Cost * 100
+    Conversion Rate = Conversions / Clicks * 100
+"""
+import numpy as np
+
+METRIC_INPUTS = ["Impressions", "Clicks", "Cost", "Sale_Amount", "Conversions"]
+
+
+def as_column(values):
+    """Float64 column from a sequence that may contain None/Decimal/str values (missing -> 0)."""
+    if isinstance(values, np.ndarray) and values.dtype.kind in "fiu":
+        return values.astype(np.float64, copy=False)
+    try:
+        out = np.array([0.0 if v is None or v == "" else v for v in values], dtype=np.float64)
+    except (TypeError, ValueError):
+        out = np.array([_to_float(v) for v in values], dtype=np.float64)
+    return np.nan_to_num(out, nan=0.0)
+
+
+def _to_float(value):
+    try:
+        return float(value)
+    except (TypeError, ValueError):
+        return 0.0
+
+
+def safe_divide(numerator, denominator, scale=1.0):
+    """numerator / denominator * scale, with 0 wherever the denominator is not positive."""
+    numerator = np.asarray(numerator, dtype=np.float64)
+    denominator = np.asarray(denominator, dtype=np.float64)
+    out = np.zeros(np.broadcast(numerator, denominator).shape, dtype=np.float64)
+    np.divide(numerator * scale, denominator, out=out, where=denominator > 0)
+    return out if out.ndim else float(out)
+
+
+def ctr(clicks, impressions):
+    return safe_divide(clicks, impressions, 100.0)
+
+
+def cpc(cost, clicks):
+    return safe_divide(cost, clicks)
+
+
+def roas(sale_amount, cost):
+    return safe_divide(sale_amount, cost)
+
+
+def roi(sale_amount, cost):
+    return safe_divide(np.asarray(sale_amount, dtype=np.float64) - np.asarray(cost, dtype=np.float64), cost, 100.0)
+
+
+def conversion_rate(conversions, clicks):
+    return safe_divide(conversions, clicks, 100.0)
+
+
+def compute(columns):
+    """
+    All derived metrics for a dict of input columns keyed like the
+    campaigns table (Impressions, Clicks, Cost, Sale_Amount, Conversions).
+    Missing columns are treated as zeros.
+    """
+    n = len(next(iter(columns.values()))) if columns else 0
+    cols = {name: as_column(columns[name]) if name in columns else np.zeros(n) for name in METRIC_INPUTS}
+    return {
+        "ctr": ctr(cols["Clicks"], cols["Impressions"]),
+        "cpc": cpc(cols["Cost"], cols["Clicks"]),
+        "roas": roas(cols["Sale_Amount"], cols["Cost"]),
+        "roi": roi(cols["Sale_Amount"], cols["Cost"]),
+        "conversion_rate": conversion_rate(cols["Conversions"], cols["Clicks"])
+    }
+
+
+def columns_from_rows(rows, names=METRIC_INPUTS):
+    """Turn a list of dict rows (cursor(dictionary=True)) into float columns."""
+    return {name: as_column([row.get(name) for row in rows]) for name in names}
+
+
+def columns_from_arrow(batch):
+    """
+    Float columns from a pyarrow RecordBatch or Table; nulls become 0.
+    pyarrow is only needed when this is called.
+    """
+    import pyarrow.compute as pc
+
+    return {
+        name: pc.fill_null(batch.column(name), 0).to_numpy(zero_copy_only=False).astype(np.float64)
+        for name in METRIC_INPUTS if name in batch.schema.names
+    }
+
+
+def compute_arrow(batch):
+    return compute(columns_from_arrow(batch))
+
+
+def campaign_score(sale_amount, cost, clicks, impressions, conversions):
+    """Simple average of ROI %, CTR % and conversion rate %."""
+    return (roi(sale_amount, cost) + ctr(clicks, impressions) + conversion_rate(conversions, clicks)) / 3
@@ -0,0 +1,93 @@
+"""
+Export the Keras multi-task model to ONNX for the lightweight CPU runtime.
+
+    python export_model.py            # export, then verify against Keras
+    python export_model.py --verify   # only re-run the equivalence check
+
+Needs tensorflow and tf2onnx for the export; serving the exported model
+only needs onnxruntime. The check feeds the same scaled inputs to both
+backends and fails if any output differs beyond tolerance or if any
+decoded label (argmax / 0.5 threshold) changes.
+"""
+import argparse
+import json
+import sys
+
+import joblib
+import numpy as np
+
+import model_runtime
+from predictor import OUTPUT_NAMES, SCALER_PATH
+
+CLASSIFICATION_OUTPUTS = {"budget_rec", "bid_strategy"}
+BINARY_OUTPUTS = {"performance_alerts", "audience_exp"}
+
+
+def export(opset=13):
+    import tensorflow as tf
+    import tf2onnx
+
+    model = tf.keras.models.load_model(model_runtime.KERAS_MODEL_PATH)
+    n_features = model.inputs[0].shape[-1]
+    spec = (tf.TensorSpec((None, n_features), tf.float32, name="features"),)
+    onnx_model, _ = tf2onnx.convert.from_keras(model, input_signature=spec, opset=opset,
+                                               output_path=model_runtime.ONNX_MODEL_PATH)
+
+    # ONNX graph outputs follow the Keras output order; keep their names so
+    # the runtime can request them in exactly that order.
+    meta = {
+        "outputs": [o.name for o in onnx_model.graph.output],
+        "keras_outputs": OUTPUT_NAMES,
+        "model_version": model_runtime.file_version(model_runtime.KERAS_MODEL_PATH),
+        "opset": opset
+    }
+    with open(model_runtime.ONNX_META_PATH, "w") as f:
+        json.dump(meta, f, indent=2)
+    print(f"✅ Exported {model_runtime.KERAS_MODEL_PATH} -> {model_runtime.ONNX_MODEL_PATH}")
+
+
+def sample_inputs(n=2048, seed=0):
+    """Scaled inputs drawn around the scaler's training distribution."""
+    scaler = joblib.load(SCALER_PATH)
+    rng = np.random.default_rng(seed)
+    mean = getattr(scaler, "mean_", np.zeros(scaler.n_features_in_))
+    scale = getattr(scaler, "scale_", np.ones(scaler.n_features_in_))
+    raw = rng.normal(mean, scale * 2, size=(n, scaler.n_features_in_))
+    return scaler.transform(raw).astype(np.float32)
+
+
+def verify(rtol=1e-4, atol=1e-4):
+    X = sample_inputs()
+    keras_out = model_runtime.KerasRuntime().predict(X)
+    onnx_out = model_runtime.OnnxRuntime().predict(X)
+
+    ok = True
+    for name, k, o in zip(OUTPUT_NAMES, keras_out, onnx_out):
+        k = np.asarray(k).reshape(len(X), -1)
+        o = np.asarray(o).reshape(len(X), -1)
+        max_err = float(np.max(np.abs(k - o)))
+        close = np.allclose(k, o, rtol=rtol, atol=atol)
+        if name in CLASSIFICATION_OUTPUTS:
+            close = close and np.array_equal(k.argmax(axis=1), o.argmax(axis=1))
+        elif name in BINARY_OUTPUTS:
+            close = close and np.array_equal(k[:, 0] > 0.5, o[:, 0] > 0.5)
+        ok = ok and close
+        print(f"{'✅' if close else '❌'} {name:<20} max abs diff {max_err:.2e}")
+    return ok
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--verify", action="store_true", help="skip the export and only verify")
+    args = parser.parse_args()
+
+    if not args.verify:
+        export()
+    if not verify():
+        print("❌ ONNX outputs differ from Keras; do not deploy this export")
+        sys.exit(1)
+    print("✅ ONNX model is numerically equivalent to Keras")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,145 @@
+"""
+Local stand-in for the Hugging Face chat-completions API.
+
+Serves POST /v1/chat/completions in the OpenAI-compatible shape that
+InferenceClient speaks (plain JSON, or Server-Sent Events with
+"stream": true) after a configurable latency, and counts calls so a load
+test can check how many requests reached the "model".
+
+    python fake_inference_server.py --port 8089 --latency 0.5
+    ADINTELLI_HF_BASE_URL=http://127.0.0.1:8089/v1 python app.py
+
+GET /stats returns {"calls", "in_flight", "max_in_flight"}; POST /reset
+zeroes them.
+"""
+import argparse
+import json
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+
+class FakeInferenceServer(ThreadingHTTPServer):
+    daemon_threads = True
+
+    def __init__(self, address, latency=0.2, token_delay=0.02):
+        super().__init__(address, FakeInferenceHandler)
+        self.latency = latency
+        self.token_delay = token_delay
+        self.lock = threading.Lock()
+        self.reset()
+
+    def reset(self):
+        with self.lock:
+            self.calls = 0
+            self.in_flight = 0
+            self.max_in_flight = 0
+
+    def stats(self):
+        with self.lock:
+            return {"calls": self.calls, "in_flight": self.in_flight, "max_in_flight": self.max_in_flight}
+
+    @property
+    def base_url(self):
+        host, port = self.server_address[:2]
+        return f"http://{host}:{port}/v1"
+
+
+def fake_reply(messages):
+    question = next((m["content"] for m in reversed(messages) if m.get("role") == "user"), "")
+    return (f"Go to the Executive Overview tab for '{question[:60]}'. "
+            "You'll find ROI, CTR and platform data there. Click any card for details.")
+
+
+class FakeInferenceHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+
+    def log_message(self, format, *args):
+        pass
+
+    def _json(self, status, body):
+        payload = json.dumps(body).encode()
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(payload)))
+        self.end_headers()
+        self.wfile.write(payload)
+
+    def do_GET(self):
+        if self.path == "/stats":
+            return self._json(200, self.server.stats())
+        self._json(404, {"error": "not found"})
+
+    def do_POST(self):
+        body = json.loads(self.rfile.read(int(self.headers.get("Content-Length", 0))) or b"{}")
+        if self.path == "/reset":
+            self.server.reset()
+            return self._json(200, {"ok": True})
+        if not self.path.endswith("/chat/completions"):
+            return self._json(404, {"error": "not found"})
+
+        server = self.server
+        with server.lock:
+            server.calls += 1
+            server.in_flight += 1
+            server.max_in_flight = max(server.max_in_flight, server.in_flight)
+        try:
+            time.sleep(server.latency)
+            reply = fake_reply(body.get("messages", []))
+            if body.get("stream"):
+                self._stream(body, reply)
+            else:
+                self._json(200, {
+                    "id": "fake", "object": "chat.completion", "created": int(time.time()),
+                    "model": body.get("model", "fake"),
+                    "choices": [{"index": 0, "finish_reason": "stop",
+                                 "message": {"role": "assistant", "content": reply}}],
+                    "usage": {"prompt_tokens": 0, "completion_tokens": 0, "total_tokens": 0}
+                })
+        finally:
+            with server.lock:
+                server.in_flight -= 1
+
+    def _stream(self, body, reply):
+        self.send_response(200)
+        self.send_header("Content-Type", "text/event-stream")
+        self.send_header("Connection", "close")
+        self.end_headers()
+        self.close_connection = True
+        words = reply.split(" ")
+        for i, word in enumerate(words):
+            chunk = {
+                "id": "fake", "object": "chat.completion.chunk", "created": int(time.time()),
+                "model": body.get("model", "fake"),
+                "choices": [{"index": 0, "finish_reason": "stop" if i == len(words) - 1 else None,
+                             "delta": {"role": "assistant", "content": word + ("" if i == len(words) - 1 else " ")}}]
+            }
+            self.wfile.write(f"data: {json.dumps(chunk)}\n\n".encode())
+            self.wfile.flush()
+            time.sleep(self.server.token_delay)
+        self.wfile.write(b"data: [DONE]\n\n")
+        self.wfile.flush()
+
+
+def start(host="127.0.0.1", port=0, latency=0.2, token_delay=0.02):
+    """Run a server in a background thread; port 0 picks a free one (see .base_url)."""
+    server = FakeInferenceServer((host, port), latency, token_delay)
+    threading.Thread(target=server.serve_forever, name="fake-inference", daemon=True).start()
+    return server
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8089)
+    parser.add_argument("--latency", type=float, default=0.5, help="seconds before the first token")
+    parser.add_argument("--token-delay", type=float, default=0.02, help="seconds between streamed tokens")
+    args = parser.parse_args()
+
+    server = FakeInferenceServer((args.host, args.port), args.latency, args.token_delay)
+    print(f"🤖 Fake inference server on {server.base_url}")
+    server.serve_forever()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,35 @@
+import bisect
+import threading
+
+
+class Histogram:
+    """
+    Thread-safe fixed-bucket histogram (cumulative bucket counts on export,
+    like Prometheus). `bounds` are the inclusive upper bounds of each bucket.
+    """
+
+    def __init__(self, bounds):
+        self.bounds = sorted(bounds)
+        self._counts = [0] * (len(self.bounds) + 1)
+        self._sum = 0.0
+        self._count = 0
+        self._lock = threading.Lock()
+
+    def observe(self, value):
+        idx = bisect.bisect_left(self.bounds, value)
+        with self._lock:
+            self._counts[idx] += 1
+            self._sum += value
+            self._count += 1
+
+    def snapshot(self):
+        with self._lock:
+            counts = list(self._counts)
+            total, count = self._sum, self._count
+        buckets = {}
+        running = 0
+        for bound, c in zip(self.bounds, counts):
+            running += c
+            buckets[str(bound)] = running
+        buckets["+Inf"] = count
+        return {"buckets": buckets, "sum": round(total, 6), "count": count}
@@ -0,0 +1,259 @@
+"""
+Bulk ingestion of campaign records into the campaigns table.
+
+ingest_records() takes any iterable (or generator) of campaign dicts and
+streams it through in batches:
+
+- each batch is validated and coerced column-wise with pandas
+- rows are upserted on Ad_ID, so re-running a load is idempotent
+- each batch is one multi-row INSERT (or one LOAD DATA LOCAL INFILE into a
+  staging table) and one commit
+- new Ad_IDs are added to the daily rollup in the batch's own transaction;
+  rows that overwrote an existing Ad_ID can move between days, so their
+  old and new days are refreshed once at the end (also when a later batch
+  fails), and data_events is notified so caches drop the changed campaigns
+- committed metrics are fed to the anomaly detector (Performance Alerts)
+
+A failure rolls back the current batch only; earlier batches stay
+committed, with the rollup brought up to date for them, and re-running
+the same input picks up where it stopped.
+"""
+import csv
+import logging
+import os
+import tempfile
+import time
+import uuid
+from itertools import islice
+
+import mysql.connector
+import numpy as np
+import pandas as pd
+
+import anomaly
+import data_events
+import datastore
+import rollup
+from config import DB_CONFIG, INGEST_BATCH_SIZE, INGEST_METHOD
+
+logger = logging.getLogger(__name__)
+
+STAGING_TABLE = "campaigns_ingest_stage"
+
+INT_COLUMNS = ["Clicks", "Impressions", "Leads", "Conversions"]
+FLOAT_COLUMNS = ["Cost", "Conversion Rate", "Sale_Amount"]
+TEXT_DEFAULTS = {
+    "Campaign_Name": "Unknown",
+    "Location": "",
+    "Device": "",
+    "Keyword": "",
+    "Platform": ""
+}
+# Column order of the INSERT, same as the old insertIntoDB
+COLUMNS = ["Ad_ID", "Clicks", "Impressions", "Campaign_Name", "Cost", "Leads", "Conversions",
+           "Conversion Rate", "Sale_Amount", "Ad_Date", "Location", "Device", "Keyword", "Platform"]
+COLUMN_LIST = ", ".join(f"`{c}`" for c in COLUMNS)
+UPSERT_CLAUSE = "ON DUPLICATE KEY UPDATE " + ", ".join(
+    f"`{c}` = VALUES(`{c}`)" for c in COLUMNS if c != "Ad_ID"
+)
+# Beyond this many changed campaigns, tell listeners that everything changed
+INVALIDATE_ALL_THRESHOLD = 10000
+
+
+def _blank(series):
+    if pd.api.types.is_numeric_dtype(series):
+        return series.isna()
+    return series.isna() | (series == "")
+
+
+def coerce_batch(records):
+    """
+    Validate and coerce a list of campaign dicts.
+
+    Missing values fall back to the old insertIntoDB defaults (0, "Unknown",
+    ""), Ad_ID is generated when absent and Ad_Date is normalised to
+    YYYY-MM-DD. Rows with a non-numeric or negative metric, or an Ad_Date
+    that cannot be parsed, are rejected.
+
+    Returns (DataFrame of valid rows in COLUMNS order, list of rejections).
+    """
+    df = pd.DataFrame.from_records(records, columns=COLUMNS)
+    rejected_mask = np.zeros(len(df), dtype=bool)
+    reasons = np.empty(len(df), dtype=object)
+
+    def reject(condition, reason):
+        # Keep the first reason per row
+        new = np.asarray(condition, dtype=bool) & ~rejected_mask
+        reasons[new] = reason
+        rejected_mask[new] = True
+
+    for col in INT_COLUMNS + FLOAT_COLUMNS:
+        raw = df[col]
+        missing = _blank(raw)
+        values = pd.to_numeric(raw.where(~missing), errors="coerce")
+        reject(~missing & values.isna(), f"{col} is not a number")
+        reject(values < 0, f"{col} is negative")
+        values = values.fillna(0)
+        df[col] = values.round().astype(np.int64) if col in INT_COLUMNS else values.astype(np.float64)
+
+    missing_date = _blank(df["Ad_Date"])
+    dates = pd.to_datetime(df["Ad_Date"].where(~missing_date), errors="coerce", format="mixed")
+    reject(~missing_date & dates.isna(), "Ad_Date is not a date")
+    df["Ad_Date"] = dates.dt.strftime("%Y-%m-%d").fillna("")
+
+    for col, default in TEXT_DEFAULTS.items():
+        df[col] = df[col].where(~_blank(df[col]), default).astype(str)
+
+    missing_id = _blank(df["Ad_ID"])
+    df["Ad_ID"] = df["Ad_ID"].astype(object)
+    df.loc[missing_id, "Ad_ID"] = [str(uuid.uuid4()) for _ in range(int(missing_id.sum()))]
+    df["Ad_ID"] = df["Ad_ID"].astype(str)
+
+    rejected = [{"row": int(i), "reason": reasons[i]} for i in np.flatnonzero(rejected_mask)]
+    return df[~rejected_mask].reset_index(drop=True), rejected
+
+
+def _rows(df):
+    # tolist() hands mysql.connector plain Python scalars instead of NumPy types
+    return list(zip(*(df[c].tolist() for c in COLUMNS)))
+
+
+def write_insert(cursor, df, table="campaigns"):
+    """Upsert a coerced batch with a single multi-row INSERT."""
+    placeholders = "(" + ", ".join(["%s"] * len(COLUMNS)) + ")"
+    sql = (f"INSERT INTO {table} ({COLUMN_LIST}) VALUES "
+           + ", ".join([placeholders] * len(df)) + " " + UPSERT_CLAUSE)
+    cursor.execute(sql, [value for row in _rows(df) for value in row])
+
+
+def write_load_data(cursor, df, table="campaigns"):
+    """Upsert a coerced batch via LOAD DATA LOCAL INFILE into a staging table."""
+    cursor.execute(f"DROP TEMPORARY TABLE IF EXISTS {STAGING_TABLE}")
+    cursor.execute(f"CREATE TEMPORARY TABLE {STAGING_TABLE} SELECT {COLUMN_LIST} FROM {table} LIMIT 0")
+    fd, path = tempfile.mkstemp(suffix=".csv")
+    try:
+        with os.fdopen(fd, "w", newline="", encoding="utf-8") as f:
+            df[COLUMNS].to_csv(f, header=False, index=False, quoting=csv.QUOTE_MINIMAL, lineterminator="\n")
+        cursor.execute(f"""
+            LOAD DATA LOCAL INFILE '{path.replace(os.sep, "/")}'
+            INTO TABLE {STAGING_TABLE}
+            CHARACTER SET utf8mb4
+            FIELDS TERMINATED BY ',' OPTIONALLY ENCLOSED BY '"' ESCAPED BY ''
+            LINES TERMINATED BY '\\n'
+            ({COLUMN_LIST})
+        """)
+        cursor.execute(f"INSERT INTO {table} ({COLUMN_LIST}) SELECT {COLUMN_LIST} FROM {STAGING_TABLE} {UPSERT_CLAUSE}")
+    finally:
+        os.remove(path)
+        cursor.execute(f"DROP TEMPORARY TABLE IF EXISTS {STAGING_TABLE}")
+
+
+WRITERS = {"insert": write_insert, "load_data": write_load_data}
+
+
+def _existing_dates(cursor, ad_ids, table):
+    """Rollup day of each Ad_ID that is already in `table`, so an upsert also fixes the old day."""
+    placeholders = ", ".join(["%s"] * len(ad_ids))
+    cursor.execute(f"SELECT Ad_ID, {rollup.DATE_EXPR} FROM {table} WHERE Ad_ID IN ({placeholders})", ad_ids)
+    return {str(row[0]): str(row[1]) for row in cursor.fetchall()}
+
+
+def _refresh_rollup(conn, cursor, dates):
+    """Recompute the rollup for `dates` and bump the data version in one transaction."""
+    try:
+        rollup.refresh_dates(cursor, dates)
+        datastore.bump_data_version(cursor)
+        conn.commit()
+    except mysql.connector.Error:
+        conn.rollback()
+        raise
+
+
+def ingest_records(records, batch_size=INGEST_BATCH_SIZE, method=INGEST_METHOD,
+                   table="campaigns", update_rollup=True, conn=None):
+    """
+    Upsert campaign dicts into `table` in batches of `batch_size`.
+
+    Pass `conn` to reuse an open connection; otherwise one is opened (with
+    allow_local_infile for method="load_data") and closed at the end.
+    Returns a report dict with rows written, rejections and rows/sec.
+    """
+    if method not in WRITERS:
+        raise ValueError(f"Unknown ingest method {method!r}, expected one of {sorted(WRITERS)}")
+    write = WRITERS[method]
+
+    own_conn = conn is None
+    cursor = None
+    report = {"rows": 0, "rejected": 0, "rejections": [], "batches": 0, "method": method}
+    touched_dates, changed_names = set(), set()
+    completed = False
+    start = time.perf_counter()
+
+    try:
+        if own_conn:
+            conn = mysql.connector.connect(**DB_CONFIG, allow_local_infile=(method == "load_data"))
+        cursor = conn.cursor()
+
+        records = iter(records)
+        offset = 0
+        while True:
+            batch = list(islice(records, batch_size))
+            if not batch:
+                break
+            df, rejected = coerce_batch(batch)
+            for r in rejected:
+                r["row"] += offset
+            offset += len(batch)
+            report["rejected"] += len(rejected)
+            report["rejections"].extend(rejected[:max(0, 20 - len(report["rejections"]))])
+            if df.empty:
+                continue
+
+            ad_ids = df["Ad_ID"].tolist()
+            try:
+                old_dates = _existing_dates(cursor, ad_ids, table) if update_rollup else {}
+                write(cursor, df, table)
+                if update_rollup:
+                    rollup.apply_ad_ids(cursor, [a for a in ad_ids if a not in old_dates])
+                datastore.bump_data_version(cursor)
+                conn.commit()
+            except mysql.connector.Error:
+                conn.rollback()
+                raise
+
+            if table == "campaigns":
+                anomaly.detector.observe(ad_ids, df["Clicks"].to_numpy(), df["Impressions"].to_numpy(),
+                                         df["Conversions"].to_numpy(), df["Cost"].to_numpy(),
+                                         df["Campaign_Name"].tolist())
+            if old_dates:
+                upserted = df["Ad_ID"].isin(old_dates)
+                touched_dates |= set(old_dates.values()) | set(
+                    df.loc[upserted, "Ad_Date"].replace("", rollup.UNDATED).unique())
+            changed_names.update(df["Campaign_Name"].unique())
+            report["rows"] += len(df)
+            report["batches"] += 1
+        completed = True
+    finally:
+        try:
+            # Only days of committed upserts are in touched_dates, so this also
+            # runs after a failed batch to keep the rollup in step with them
+            if update_rollup and touched_dates and cursor is not None:
+                try:
+                    _refresh_rollup(conn, cursor, touched_dates)
+                except mysql.connector.Error as e:
+                    if completed:
+                        raise
+                    logger.error(f"Error in ingest_records rollup refresh: {str(e)}")
+        finally:
+            if cursor is not None:
+                cursor.close()
+            if own_conn and conn is not None:
+                conn.close()
+            if changed_names:
+                data_events.campaigns_changed(
+                    None if len(changed_names) > INVALIDATE_ALL_THRESHOLD else changed_names
+                )
+
+    report["seconds"] = round(time.perf_counter() - start, 3)
+    report["rows_per_sec"] = round(report["rows"] / report["seconds"]) if report["seconds"] else 0
+    return report
@@ -0,0 +1,200 @@
+"""
+Local answers for /chat navigation questions.
+
+Most chat traffic asks where something is on the dashboard, and the
+system prompt's UI guide already holds those answers. IntentRouter parses
+the guide into intents (every dashboard item, every section and every
+header feature), indexes them with TF-IDF, and answers a question locally
+when its best match is strong and clearly ahead of the best match in any
+other section. Everything else goes to the model.
+
+    python intent_router.py "where is the budget simulator?"
+"""
+import argparse
+import re
+import time
+from typing import List, NamedTuple, Optional
+
+import numpy as np
+
+from config import CHAT_ROUTER_MIN_SCORE, CHAT_ROUTER_MIN_MARGIN
+
+STOPWORDS = set("""
+a an and are as at be by can do does for from get go how i in is it me my of on or see show
+shows that the there this to use view want what where which who why will with you your
+""".split())
+
+
+def tokenize(text):
+    """Lowercase word tokens without stopwords; a trailing plural 's' is dropped."""
+    tokens = []
+    for word in re.findall(r"[a-z0-9]+", text.lower()):
+        if word in STOPWORDS:
+            continue
+        if len(word) > 3 and word.endswith("s") and not word.endswith("ss"):
+            word = word[:-1]
+        tokens.append(word)
+    return tokens
+
+
+class Intent(NamedTuple):
+    section: str  # destination the answer points to
+    text: str  # what is indexed
+    answer: str
+
+
+class Match(NamedTuple):
+    intent: Intent
+    score: float
+    margin: float  # lead over the best intent of any other section
+
+
+def _lower_first(text):
+    return text[:1].lower() + text[1:]
+
+
+def parse_guide(prompt):
+    """
+    Intents from the UI guide in the chat system prompt: sections (a title
+    followed by "Location:" and "Contains:" lines), header features
+    ("Name: description" lines), workflow lines ("To X: Go to Y tab") and
+    the example responses, which become the section answers.
+    """
+    lines = [line.strip() for line in prompt.splitlines() if line.strip()]
+    sections = {}  # title -> {"location", "items", "workflow", "example"}
+    header = []
+    current = None
+    mode = None
+    for i, line in enumerate(lines):
+        nxt = lines[i + 1] if i + 1 < len(lines) else ""
+        if nxt.startswith("Location:"):
+            current = re.sub(r"^\d+\.\s*", "", line)
+            sections[current] = {"location": nxt.split(":", 1)[1].strip(), "items": [], "workflow": [], "example": None}
+            mode = "section"
+        elif line.startswith("Location:"):
+            continue
+        elif line.startswith("Contains:"):
+            rest = line.split(":", 1)[1].strip()
+            if rest and current:
+                sections[current]["items"].append(rest)
+        elif line == "Header Features":
+            mode = "header"
+        elif line in ("User Workflow Guide", "Response Guidelines for AI Assistant", "Example responses:"):
+            mode = "workflow" if line == "User Workflow Guide" else "examples"
+        elif mode == "section" and current:
+            sections[current]["items"].append(line)
+        elif mode == "header" and ":" in line:
+            name, description = line.split(":", 1)
+            header.append((name.strip(), description.strip()))
+        elif mode == "workflow" and line.startswith("To ") and ":" in line:
+            goal, target = line[3:].split(":", 1)
+            for title in sections:
+                if title.lower() in target.lower():
+                    sections[title]["workflow"].append(goal.strip())
+        elif mode == "examples" and line.startswith('"'):
+            for title in sections:
+                if title.lower() in line.lower():
+                    sections[title]["example"] = line.strip('"')
+
+    intents = []
+    for title, s in sections.items():
+        location = _lower_first(s["location"])
+        example = s["example"]
+        if not example:
+            shown = ", ".join(_lower_first(item.split(" (")[0]) for item in s["items"][:3])
+            example = f"Go to {title} ({location}). You'll find {shown} there."
+            if s["workflow"]:
+                example += f" Use it to {s['workflow'][0]}."
+        intents.append(Intent(title, " ".join([title, title] + s["workflow"]), example))
+        for item in s["items"]:
+            answer = f"Go to {title} ({location}): it has the {_lower_first(item)}."
+            intents.append(Intent(title, f"{title} {item}", answer))
+    for name, description in header:
+        intents.append(Intent(name, f"{name} {description} header",
+                              f"Use the {name} in the top header: {_lower_first(description)}."))
+    return intents
+
+
+class IntentRouter:
+    def __init__(self, intents: List[Intent], min_score=CHAT_ROUTER_MIN_SCORE, min_margin=CHAT_ROUTER_MIN_MARGIN):
+        self.intents = intents
+        self.min_score = min_score
+        self.min_margin = min_margin
+
+        docs = [tokenize(intent.text) for intent in intents]
+        vocab = sorted({t for doc in docs for t in doc})
+        self.index = {t: i for i, t in enumerate(vocab)}
+        df = np.zeros(len(vocab))
+        for doc in docs:
+            for t in set(doc):
+                df[self.index[t]] += 1
+        self.idf = np.log((1 + len(docs)) / (1 + df)) + 1
+        # Words the guide never uses still dilute a question's match
+        self.unknown_idf = float(self.idf.max())
+
+        self.matrix = np.zeros((len(docs), len(vocab)))
+        for row, doc in enumerate(docs):
+            for t in doc:
+                self.matrix[row, self.index[t]] += 1
+        self.matrix *= self.idf
+        self.matrix /= np.linalg.norm(self.matrix, axis=1, keepdims=True)
+
+        sections = sorted({intent.section for intent in intents})
+        self.section_ids = np.array([sections.index(intent.section) for intent in intents])
+
+    @classmethod
+    def from_guide(cls, prompt, **kwargs):
+        return cls(parse_guide(prompt), **kwargs)
+
+    def best(self, question) -> Optional[Match]:
+        """Best-scoring intent (cosine similarity) and its margin over other sections."""
+        counts = {}
+        unknown = 0
+        for t in tokenize(question):
+            if t in self.index:
+                counts[self.index[t]] = counts.get(self.index[t], 0) + 1
+            else:
+                unknown += 1
+        if not counts:
+            return None
+        cols = np.fromiter(counts, dtype=np.intp)
+        weights = np.fromiter(counts.values(), dtype=np.float64) * self.idf[cols]
+        norm = np.sqrt(weights @ weights + unknown * self.unknown_idf ** 2)
+        scores = self.matrix[:, cols] @ weights / norm
+
+        top = int(np.argmax(scores))
+        others = scores[self.section_ids != self.section_ids[top]]
+        runner_up = float(others.max()) if len(others) else 0.0
+        return Match(self.intents[top], float(scores[top]), float(scores[top]) - runner_up)
+
+    def route(self, question) -> Optional[Match]:
+        """The match when it is confident enough to answer locally, else None."""
+        match = self.best(question)
+        if match is None or match.score < self.min_score or match.margin < self.min_margin:
+            return None
+        return match
+
+
+def main():
+    import chat
+
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("question", nargs="+")
+    args = parser.parse_args()
+
+    router = IntentRouter.from_guide(chat.SYSTEM_PROMPT)
+    question = " ".join(args.question)
+    start = time.perf_counter()
+    match = router.best(question)
+    elapsed_us = (time.perf_counter() - start) * 1e6
+    if match is None:
+        print(f"❌ no guide words in the question ({elapsed_us:.0f} µs)")
+        return
+    local = match.score >= router.min_score and match.margin >= router.min_margin
+    print(f"{'✅ local' if local else '➡️ model'}: score {match.score:.2f}, margin {match.margin:.2f}, "
+          f"section {match.intent.section} ({elapsed_us:.0f} µs)")
+    print(match.intent.answer)
+
+
+if __name__ == "__main__":
+    main()
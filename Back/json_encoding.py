@@ -0,0 +1,195 @@
+"""
+Response encoding: the JSON provider and response compression.
+
+init_app() installs a JSON provider on the Flask or Quart app (jsonify,
+app.json.dumps) chosen by JSON_ENCODER:
+
+- "orjson": orjson, several times faster than the standard library on
+  large lists (used by "auto" when it is installed)
+- "stdlib": the standard json module
+
+Both encode Decimal (what MySQL returns for DECIMAL columns) as a number,
+date/datetime as ISO 8601 and NumPy scalars and arrays natively, so
+routes can hand over database rows and NumPy results as they are.
+
+Responses of at least COMPRESS_MIN_BYTES are compressed with the first of
+COMPRESS_ENCODINGS ("br" needs the brotli package) that the client
+accepts. Streamed responses are left alone by the hook; routes that
+stream large bodies compress them chunk by chunk with compress_chunks().
+
+    python bench_json_encoding.py --rows 100000
+"""
+import json
+import zlib
+from datetime import date, datetime
+from decimal import Decimal
+
+import numpy as np
+from flask.json.provider import JSONProvider
+
+import request_metrics
+from config import JSON_ENCODER, COMPRESS_MIN_BYTES, COMPRESS_ENCODINGS, GZIP_LEVEL, BROTLI_QUALITY
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+
+def default(value):
+    """Types neither encoder handles natively."""
+    if isinstance(value, Decimal):
+        return float(value)
+    if isinstance(value, (datetime, date)):
+        return value.isoformat()
+    if isinstance(value, np.generic):
+        return value.item()
+    if isinstance(value, np.ndarray):
+        return value.tolist()
+    if isinstance(value, (set, frozenset)):
+        return list(value)
+    raise TypeError(f"Object of type {type(value).__name__} is not JSON serializable")
+
+
+class StdlibProvider(JSONProvider):
+    name = "stdlib"
+
+    def dumps_bytes(self, obj, **kwargs) -> bytes:
+        return self.dumps(obj, **kwargs).encode()
+
+    def dumps(self, obj, **kwargs) -> str:
+        kwargs.setdefault("default", default)
+        kwargs.setdefault("separators", (",", ":"))
+        with request_metrics.timed("serialization"):
+            return json.dumps(obj, **kwargs)
+
+    def loads(self, s, **kwargs):
+        return json.loads(s, **kwargs)
+
+    def response(self, *args, **kwargs):
+        obj = self._prepare_response_obj(args, kwargs)
+        return self._app.response_class(self.dumps_bytes(obj) + b"\n", mimetype="application/json")
+
+
+class OrjsonProvider(StdlibProvider):
+    name = "orjson"
+    OPTIONS = orjson.OPT_SERIALIZE_NUMPY | orjson.OPT_NON_STR_KEYS if orjson is not None else 0
+
+    def dumps_bytes(self, obj, **kwargs) -> bytes:
+        # kwargs are json.dumps options (indent, separators); orjson output is always compact
+        with request_metrics.timed("serialization"):
+            return orjson.dumps(obj, default=default, option=self.OPTIONS)
+
+    def dumps(self, obj, **kwargs) -> str:
+        return self.dumps_bytes(obj).decode()
+
+    def loads(self, s, **kwargs):
+        return orjson.loads(s)
+
+
+def provider_class(encoder=JSON_ENCODER):
+    if encoder == "orjson" or (encoder == "auto" and orjson is not None):
+        if orjson is None:
+            raise ImportError("JSON_ENCODER is 'orjson' but orjson is not installed")
+        return OrjsonProvider
+    if encoder in ("stdlib", "auto"):
+        return StdlibProvider
+    raise ValueError(f"Unknown JSON_ENCODER {encoder!r}, expected 'auto', 'orjson' or 'stdlib'")
+
+
+# ---------------- Compression ----------------
+def available_encodings():
+    return [e for e in COMPRESS_ENCODINGS if e == "gzip" or (e == "br" and brotli is not None)]
+
+
+def negotiate(request):
+    """Content-Encoding to use for this request's response, or None."""
+    if COMPRESS_MIN_BYTES <= 0:
+        return None
+    return request.accept_encodings.best_match(available_encodings())
+
+
+def _compressor(encoding):
+    """(write, finish) of a streaming compressor."""
+    if encoding == "br":
+        compressor = brotli.Compressor(quality=BROTLI_QUALITY)
+        return compressor.process, compressor.finish
+    # wbits 31: gzip container rather than raw zlib
+    compressor = zlib.compressobj(GZIP_LEVEL, zlib.DEFLATED, 31)
+    return compressor.compress, compressor.flush
+
+
+def compress(data: bytes, encoding) -> bytes:
+    write, finish = _compressor(encoding)
+    return write(data) + finish()
+
+
+def compress_chunks(chunks, encoding):
+    """Compress an iterable of str/bytes chunks as one stream."""
+    write, finish = _compressor(encoding)
+    for chunk in chunks:
+        out = write(chunk.encode() if isinstance(chunk, str) else chunk)
+        if out:
+            yield out
+    yield finish()
+
+
+async def compress_chunks_async(chunks, encoding):
+    write, finish = _compressor(encoding)
+    async for chunk in chunks:
+        out = write(chunk.encode() if isinstance(chunk, str) else chunk)
+        if out:
+            yield out
+    yield finish()
+
+
+def _should_compress(response):
+    return (response.status_code == 200 and "Content-Encoding" not in response.headers
+            and not getattr(response, "is_streamed", False) and (response.content_length or 0) >= COMPRESS_MIN_BYTES)
+
+
+def mark_encoded(response, encoding):
+    response.headers["Content-Encoding"] = encoding
+    response.vary.add("Accept-Encoding")
+    # The compressed bytes differ from the identity ones; like nginx, keep
+    # the ETag but make it weak, which If-None-Match still matches
+    etag, weak = response.get_etag()
+    if etag and not weak:
+        response.set_etag(etag, weak=True)
+
+
+def init_app(app):
+    """JSON provider and response compression for a Flask app."""
+    from flask import request
+
+    app.json = provider_class()(app)
+
+    @app.after_request
+    def _compress(response):
+        if _should_compress(response):
+            encoding = negotiate(request)
+            if encoding:
+                response.set_data(compress(response.get_data(), encoding))
+                mark_encoded(response, encoding)
+        return response
+
+
+def init_async_app(app):
+    """JSON provider and response compression for a Quart app."""
+    from quart import request
+
+    app.json = provider_class()(app)
+
+    @app.after_request
+    async def _compress(response):
+        if _should_compress(response):
+            encoding = negotiate(request)
+            if encoding:
+                response.set_data(compress(await response.get_data(), encoding))
+                mark_encoded(response, encoding)
+        return response
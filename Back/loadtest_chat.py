@@ -0,0 +1,212 @@
+"""
+Check the chat subsystem against a local fake inference server.
+
+Starts fake_inference_server in-process, points chat.ChatService at it and
+verifies local answers from the intent router, coalescing, the reply
+cache, the in-flight cap, the timeout and streaming. Exits with status 1 if any check fails.
+
+    python loadtest_chat.py
+    python loadtest_chat.py --clients 200 --latency 0.5
+
+With --http the same burst of identical questions is sent to a running
+API instead (start the fake server and the API with
+ADINTELLI_HF_BASE_URL=http://127.0.0.1:8089/v1 first):
+
+    python loadtest_chat.py --http http://127.0.0.1:5000 --clients 200
+"""
+import argparse
+import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+import requests
+
+import fake_inference_server
+import chat
+from chat import ChatBusy, ChatService, ChatTimeout, InferenceUpstream
+from intent_router import IntentRouter
+
+results = []
+
+
+def check(name, ok, detail):
+    results.append(ok)
+    print(f"{'✅' if ok else '❌'} {name}: {detail}")
+
+
+def make_service(server, **kwargs):
+    return ChatService(InferenceUpstream(base_url=server.base_url, api_key="fake"), **kwargs)
+
+
+def burst(fn, args_list, clients):
+    """Call fn(*args) for every args tuple from `clients` threads released together."""
+    gate = threading.Barrier(min(clients, len(args_list)))
+
+    def call(args):
+        try:
+            gate.wait(timeout=10)
+        except threading.BrokenBarrierError:
+            pass
+        start = time.perf_counter()
+        try:
+            return fn(*args), time.perf_counter() - start
+        except Exception as e:
+            return e, time.perf_counter() - start
+
+    with ThreadPoolExecutor(max_workers=clients) as executor:
+        return list(executor.map(call, args_list))
+
+
+def check_local_route(server):
+    server.latency = 0.3
+    server.reset()
+    service = make_service(server, router=IntentRouter.from_guide(chat.SYSTEM_PROMPT))
+    navigation = ["Where is the budget simulator?", "where do I find audience demographics",
+                  "show me live data", "where is the search bar"]
+    replies = [service.reply(q) for q in navigation]
+    local_ms = service.stats()["latency_ms"]["local"]
+    avg_ms = local_ms["sum"] / max(local_ms["count"], 1)
+    check("local answers", all(r.source == "local" for r in replies) and server.stats()["calls"] == 0 and avg_ms < 1,
+          f"{len(navigation)} navigation questions answered locally in {avg_ms * 1000:.0f} µs on average, "
+          f"{server.stats()['calls']} upstream calls")
+
+    reply = service.reply("Which campaigns should I pause to improve ROAS?")
+    streamed = list(service.stream("where is the campaign distribution pie chart"))
+    check("low confidence to model", reply.source == "upstream" and server.stats()["calls"] == 1
+          and len(streamed) == 1 and service.stats()["local"] == len(navigation) + 1,
+          f"an analysis question went {reply.source}, local hit rate {service.stats()['local_hit_rate']:.0%}")
+
+
+def check_coalescing_and_cache(server, clients):
+    server.latency = 0.3
+    server.reset()
+    service = make_service(server)
+    variants = ["Where can I see my ROI?", "where can i see my roi", "WHERE can I see my ROI ??"]
+    replies = burst(service.reply, [(variants[i % len(variants)],) for i in range(clients)], clients)
+    texts = {r.text for r, _ in replies if not isinstance(r, Exception)}
+    sources = [r.source for r, _ in replies if not isinstance(r, Exception)]
+    check("coalescing", server.stats()["calls"] == 1 and len(texts) == 1,
+          f"{clients} identical questions -> {server.stats()['calls']} upstream call(s), "
+          f"{sources.count('coalesced')} coalesced, {sources.count('cache')} from cache")
+
+    start = time.perf_counter()
+    reply = service.reply("where can I see my ROI")
+    elapsed_ms = (time.perf_counter() - start) * 1000
+    check("cache", reply.source == "cache" and server.stats()["calls"] == 1,
+          f"repeat answered from {reply.source} in {elapsed_ms:.2f} ms")
+
+
+def check_inflight_cap(server, max_inflight):
+    server.latency = 0.3
+    server.reset()
+    service = make_service(server, max_inflight=max_inflight)
+    questions = [(f"question number {i}",) for i in range(max_inflight * 4)]
+    replies = burst(service.reply, questions, len(questions))
+    busy = sum(isinstance(r, ChatBusy) for r, _ in replies)
+    answered = sum(not isinstance(r, Exception) for r, _ in replies)
+    peak = server.stats()["max_in_flight"]
+    check("in-flight cap", peak <= max_inflight and answered + busy == len(questions) and answered >= max_inflight,
+          f"{len(questions)} distinct questions, cap {max_inflight}: peak upstream concurrency {peak}, "
+          f"{answered} answered, {busy} told busy")
+
+
+def check_timeout(server):
+    server.latency = 1.0
+    server.reset()
+    service = make_service(server, timeout=0.2)
+    start = time.perf_counter()
+    try:
+        service.reply("a slow question")
+        raised = False
+    except ChatTimeout:
+        raised = True
+    waited = time.perf_counter() - start
+    check("timeout", raised and waited < 0.5, f"caller gave up after {waited:.2f}s (limit 0.2s)")
+
+    time.sleep(1.2)
+    reply = service.reply("a slow question")
+    check("late reply cached", reply.source == "cache" and server.stats()["calls"] == 1,
+          f"the call that outlived its caller served the retry from {reply.source}")
+
+
+def check_streaming(server):
+    server.latency = 0.2
+    server.token_delay = 0.02
+    server.reset()
+    service = make_service(server)
+    start = time.perf_counter()
+    chunks = []
+    first_at = None
+    for chunk in service.stream("how do I change my budget"):
+        if first_at is None:
+            first_at = time.perf_counter() - start
+        chunks.append(chunk)
+    total = time.perf_counter() - start
+    check("streaming", len(chunks) > 1 and first_at < total * 0.75,
+          f"{len(chunks)} chunks, first after {first_at * 1000:.0f} ms, complete after {total * 1000:.0f} ms")
+
+    again = list(service.stream("How do I change my budget?"))
+    check("streamed reply cached", again == ["".join(chunks)] and server.stats()["calls"] == 1,
+          f"repeat streamed as {len(again)} chunk from cache")
+
+    # One chunk that takes far longer than the timeout must not hold the caller past it
+    server.token_delay = 2.0
+    service = make_service(server, timeout=0.5)
+    start = time.perf_counter()
+    received = []
+    try:
+        for chunk in service.stream("how do I change my budget"):
+            received.append(chunk)
+        raised = False
+    except ChatTimeout:
+        raised = True
+    waited = time.perf_counter() - start
+    check("stalled stream timeout", raised and received and waited < 0.8,
+          f"gave up after {waited:.2f}s (limit 0.5s) with {len(received)} chunk(s) received")
+    server.token_delay = 0.02
+
+
+def over_http(base_url, clients):
+    def post(message):
+        start = time.perf_counter()
+        response = requests.post(f"{base_url}/chat", json={"message": message}, timeout=60)
+        return response.status_code, (time.perf_counter() - start) * 1000
+
+    with ThreadPoolExecutor(max_workers=clients) as executor:
+        replies = list(executor.map(post, ["Where can I see my ROI?"] * clients))
+    statuses = [s for s, _ in replies]
+    latencies = [ms for _, ms in replies]
+    print(f"{clients} identical /chat requests: "
+          + ", ".join(f"{statuses.count(s)}x {s}" for s in sorted(set(statuses))))
+    print(f"latency p50 {np.percentile(latencies, 50):.0f} ms, p99 {np.percentile(latencies, 99):.0f} ms")
+    stats = requests.get(f"{base_url}/getServerStats", timeout=10).json().get("chat", {})
+    print(f"chat stats: local {stats.get('local')}, upstream {stats.get('upstream')}, coalesced {stats.get('coalesced')}, "
+          f"cache {stats.get('cache')}, busy {stats.get('busy')}, timeout {stats.get('timeout')}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--clients", type=int, default=100)
+    parser.add_argument("--max-inflight", type=int, default=4)
+    parser.add_argument("--http", metavar="BASE_URL", help="burst a running API instead of the in-process checks")
+    args = parser.parse_args()
+
+    if args.http:
+        over_http(args.http, args.clients)
+        return
+
+    server = fake_inference_server.start()
+    print(f"🤖 fake inference server on {server.base_url}")
+    check_local_route(server)
+    check_coalescing_and_cache(server, args.clients)
+    check_inflight_cap(server, args.max_inflight)
+    check_timeout(server)
+    check_streaming(server)
+    server.shutdown()
+    sys.exit(0 if all(results) else 1)
+
+
+if __name__ == "__main__":
+    main()
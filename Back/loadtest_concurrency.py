@@ -0,0 +1,132 @@
+"""
+How many simultaneous dashboard users can one server process serve?
+
+Each simulated user opens the dashboard (the chart and KPI endpoints the
+Executive Overview and Campaign Management tabs load, fetched in
+parallel like a browser does), waits --think seconds and reloads. For each
+user count the page-load p50/p95 and error rate are reported; a level
+counts as served when p95 stays under --p95-target ms with under 1%
+errors. Users are asyncio tasks, so the client itself holds thousands of
+them without threads.
+
+Start the servers first, e.g. on the same data:
+
+    python app.py                                   # Flask dev server, :5000
+    python asgi_app.py --bind 127.0.0.1:5001        # ASGI mode, :5001
+
+    python loadtest_concurrency.py --target flask=http://127.0.0.1:5000 \\
+        --target asgi=http://127.0.0.1:5001 --users 10 50 100 250 500 1000
+
+Setting ADINTELLI_DEMO_DELAY (seconds) on both servers adds a fixed wait to
+every request, which stands in for slow database or upstream I/O.
+"""
+import argparse
+import asyncio
+import time
+import urllib.parse
+
+import numpy as np
+
+DASHBOARD_PATHS = [
+    "/getExecutiveSummary",
+    "/getKpiData",
+    "/getCampaignPerformance",
+    "/getWeeklyTrends",
+    "/getDeviceDemographics",
+    "/getPlatformData",
+]
+
+
+async def http_get(host, port, path, timeout):
+    """One GET on a fresh connection; returns the HTTP status."""
+    reader, writer = await asyncio.wait_for(asyncio.open_connection(host, port), timeout)
+    try:
+        writer.write(f"GET {path} HTTP/1.1\r\nHost: {host}:{port}\r\nConnection: close\r\n\r\n".encode())
+        await writer.drain()
+        response = await asyncio.wait_for(reader.read(), timeout)
+    finally:
+        writer.close()
+    return int(response.split(b" ", 2)[1]) if response else 0
+
+
+async def load_dashboard(host, port, parallel, timeout):
+    """All dashboard requests, at most `parallel` at a time; returns (seconds, ok)."""
+    semaphore = asyncio.Semaphore(parallel)
+
+    async def fetch(path):
+        async with semaphore:
+            try:
+                return await http_get(host, port, path, timeout) == 200
+            except (OSError, asyncio.TimeoutError, ValueError, IndexError):
+                return False
+
+    start = time.perf_counter()
+    results = await asyncio.gather(*(fetch(p) for p in DASHBOARD_PATHS))
+    return time.perf_counter() - start, all(results)
+
+
+async def run_level(base_url, users, seconds, think, parallel, timeout):
+    url = urllib.parse.urlsplit(base_url)
+    host, port = url.hostname, url.port or 80
+    page_loads = []
+    errors = 0
+    deadline = time.perf_counter() + seconds
+
+    async def user(i):
+        nonlocal errors
+        # Spread the first page loads over one think time
+        await asyncio.sleep(think * i / users)
+        while time.perf_counter() < deadline:
+            elapsed, ok = await load_dashboard(host, port, parallel, timeout)
+            page_loads.append(elapsed * 1000)
+            errors += not ok
+            await asyncio.sleep(think)
+
+    start = time.perf_counter()
+    await asyncio.gather(*(user(i) for i in range(users)))
+    wall = time.perf_counter() - start
+    loads = np.array(page_loads) if page_loads else np.array([np.nan])
+    return {
+        "pages": len(page_loads),
+        "pages_per_sec": len(page_loads) / wall,
+        "p50": float(np.percentile(loads, 50)),
+        "p95": float(np.percentile(loads, 95)),
+        "error_rate": errors / max(len(page_loads), 1)
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--target", action="append", metavar="NAME=URL",
+                        help="server to test, repeatable (default: flask=http://127.0.0.1:5000)")
+    parser.add_argument("--users", type=int, nargs="+", default=[10, 50, 100, 250, 500, 1000])
+    parser.add_argument("--seconds", type=float, default=20, help="duration of each user level")
+    parser.add_argument("--think", type=float, default=1.0, help="seconds between a user's page loads")
+    parser.add_argument("--parallel", type=int, default=6, help="concurrent requests per page load")
+    parser.add_argument("--timeout", type=float, default=30)
+    parser.add_argument("--p95-target", type=float, default=1000, help="page-load p95 (ms) that counts as served")
+    args = parser.parse_args()
+
+    targets = [t.split("=", 1) for t in (args.target or ["flask=http://127.0.0.1:5000"])]
+    capacity = {}
+    for name, base_url in targets:
+        print(f"\n🚀 {name} ({base_url})")
+        print(f"{'users':>7} {'pages/s':>9} {'p50 ms':>9} {'p95 ms':>9} {'errors':>8}")
+        capacity[name] = 0
+        for users in args.users:
+            result = asyncio.run(run_level(base_url, users, args.seconds, args.think, args.parallel, args.timeout))
+            served = result["p95"] <= args.p95_target and result["error_rate"] < 0.01
+            if served:
+                capacity[name] = users
+            print(f"{users:>7} {result['pages_per_sec']:>9.1f} {result['p50']:>9.1f} {result['p95']:>9.1f} "
+                  f"{result['error_rate']:>7.1%} {'✅' if served else '❌'}")
+            if not served:
+                break
+
+    print(f"\n📊 simultaneous users served (p95 <= {args.p95_target:.0f} ms, <1% errors):")
+    for name, users in capacity.items():
+        print(f"   {name:<10} {users}")
+
+
+if __name__ == "__main__":
+    main()
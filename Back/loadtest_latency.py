@@ -0,0 +1,64 @@
+"""
+Load-test the dashboard endpoints and check p50/p99 latency targets.
+
+Start the API first (python app.py), then:
+
+    python loadtest_latency.py --requests 200 --concurrency 8
+
+Exits with status 1 if any endpoint misses its target.
+"""
+import argparse
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+import requests
+
+# Latency budget per endpoint in milliseconds: (p50, p99)
+LATENCY_TARGETS = {
+    "/getExecutiveSummary": (50, 200),
+    "/getPlatformData": (30, 150),
+    "/getCampaignScore": (30, 150),
+    "/getConversions": (30, 150),
+    "/getROI": (30, 150),
+    "/getCTR": (30, 150),
+    "/getKpiData": (50, 250),
+    "/getAllCampaigns": (200, 1000),
+}
+
+
+def timed_get(url):
+    start = time.perf_counter()
+    response = requests.get(url, timeout=30)
+    response.raise_for_status()
+    return (time.perf_counter() - start) * 1000
+
+
+def measure(base_url, path, total, concurrency):
+    with ThreadPoolExecutor(max_workers=concurrency) as executor:
+        latencies = list(executor.map(timed_get, [base_url + path] * total))
+    return np.percentile(latencies, 50), np.percentile(latencies, 99)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--base-url", default="http://127.0.0.1:5000")
+    parser.add_argument("--requests", type=int, default=200)
+    parser.add_argument("--concurrency", type=int, default=8)
+    args = parser.parse_args()
+
+    failed = False
+    print(f"{'endpoint':<24} {'p50 ms':>9} {'p99 ms':>9}   target")
+    for path, (p50_target, p99_target) in LATENCY_TARGETS.items():
+        p50, p99 = measure(args.base_url, path, args.requests, args.concurrency)
+        ok = p50 <= p50_target and p99 <= p99_target
+        failed = failed or not ok
+        status = "OK" if ok else "MISS"
+        print(f"{path:<24} {p50:>9.1f} {p99:>9.1f}   {p50_target}/{p99_target} {status}")
+
+    sys.exit(1 if failed else 0)
+
+
+if __name__ == "__main__":
+    main()
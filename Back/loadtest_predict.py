@@ -0,0 +1,60 @@
+"""
+Load-test /predict at increasing concurrency and report throughput vs p99.
+
+Start the API first (python app.py). Compare runs with the micro-batcher
+on and off (ADINTELLI_PREDICT_BATCHING=0):
+
+    python loadtest_predict.py --concurrency 1 8 32 64 --requests 500
+"""
+import argparse
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+import requests
+
+
+def campaign_names(base_url, n):
+    response = requests.get(f"{base_url}/getAllCampaigns", params={"limit": n}, timeout=30)
+    response.raise_for_status()
+    return [c["campaign_name"] for c in response.json()]
+
+
+def run_level(base_url, names, total, concurrency):
+    session = requests.Session()
+
+    def call(i):
+        start = time.perf_counter()
+        response = session.post(f"{base_url}/predict", json={"campaign_name": names[i % len(names)]}, timeout=60)
+        return (time.perf_counter() - start) * 1000, response.status_code
+
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency) as executor:
+        results = list(executor.map(call, range(total)))
+    elapsed = time.perf_counter() - start
+
+    latencies = [ms for ms, status in results if status == 200]
+    rejected = sum(1 for _, status in results if status == 503)
+    p50, p99 = (np.percentile(latencies, [50, 99]) if latencies else (float("nan"), float("nan")))
+    return len(latencies) / elapsed, p50, p99, rejected
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--base-url", default="http://127.0.0.1:5000")
+    parser.add_argument("--concurrency", type=int, nargs="+", default=[1, 8, 32, 64])
+    parser.add_argument("--requests", type=int, default=500)
+    args = parser.parse_args()
+
+    names = campaign_names(args.base_url, 100)
+    print(f"{'concurrency':>11} {'req/s':>9} {'p50 ms':>9} {'p99 ms':>9} {'503s':>6}")
+    for level in args.concurrency:
+        rps, p50, p99, rejected = run_level(args.base_url, names, args.requests, level)
+        print(f"{level:>11} {rps:>9.1f} {p50:>9.1f} {p99:>9.1f} {rejected:>6}")
+
+    stats = requests.get(f"{args.base_url}/getServerStats", timeout=10).json().get("predict_batcher", {})
+    print("batch size histogram:", stats.get("batch_size"))
+
+
+if __name__ == "__main__":
+    main()
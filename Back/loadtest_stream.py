@@ -0,0 +1,103 @@
+"""
+Fan-out test for the real-time metrics stream with 500 simulated clients.
+
+In-process mode (default) needs no database: it drives a broadcaster over
+synthetic campaign costs, attaches N subscriber threads and checks that
+every client receives every tick. HTTP mode opens N SSE connections to a
+running server (python app.py; the dev server is threaded).
+
+    python loadtest_stream.py --clients 500 --ticks 20
+    python loadtest_stream.py --clients 500 --http --seconds 30
+"""
+import argparse
+import threading
+import time
+
+import numpy as np
+import requests
+
+from realtime_stream import MetricsBroadcaster
+
+
+def in_process(clients, ticks, campaigns):
+    costs = np.random.default_rng(0).uniform(1, 500, campaigns)
+    ad_ids = [str(i) for i in range(campaigns)]
+    names = [f"Campaign {i}" for i in range(campaigns)]
+    broadcaster = MetricsBroadcaster(lambda: (ad_ids, costs, names), tick_seconds=3600, buffer_size=ticks + 2)
+    received = [0] * clients
+    subscriptions = [broadcaster.subscribe() for _ in range(clients)]
+    done = threading.Event()
+
+    def client(i, subscription):
+        events = broadcaster.sse_events(subscription, heartbeat_seconds=0.5)
+        for chunk in events:
+            if chunk.startswith("event:"):
+                received[i] += 1
+            if done.is_set() and received[i] >= ticks + 1:
+                events.close()
+                return
+
+    threads = [threading.Thread(target=client, args=(i, s), daemon=True) for i, s in enumerate(subscriptions)]
+    for t in threads:
+        t.start()
+
+    start = time.perf_counter()
+    for _ in range(ticks):
+        broadcaster.publish_tick()
+    produce_s = time.perf_counter() - start
+    done.set()
+    for t in threads:
+        t.join(timeout=10)
+
+    stats = broadcaster.stats()
+    complete = sum(1 for r in received if r >= ticks + 1)
+    print(f"clients: {clients}, ticks: {ticks}, campaigns: {campaigns:,}")
+    print(f"producer time per tick (simulate + anomaly detection + fan-out): {produce_s / ticks * 1000:.2f} ms")
+    print(f"clients that received snapshot + every delta: {complete}/{clients}")
+    print(f"fan-out ms: {stats['fanout_ms']}")
+    print(f"delivery ms: {stats['delivery_ms']}")
+
+
+def over_http(base_url, clients, seconds):
+    received = [0] * clients
+    stop = threading.Event()
+
+    def client(i):
+        with requests.get(f"{base_url}/realTime/stream", stream=True, timeout=seconds + 30) as response:
+            for line in response.iter_lines():
+                if line.startswith(b"event:"):
+                    received[i] += 1
+                if stop.is_set():
+                    return
+
+    threads = [threading.Thread(target=client, args=(i,), daemon=True) for i in range(clients)]
+    for t in threads:
+        t.start()
+    time.sleep(seconds)
+    stats = requests.get(f"{base_url}/getServerStats", timeout=10).json()["realtime_stream"]
+    stop.set()
+
+    print(f"connected subscribers: {stats['subscribers']} / {clients}")
+    print(f"events per client: min {min(received)}, median {int(np.median(received))}, max {max(received)}")
+    print(f"fan-out ms: {stats['fanout_ms']}")
+    print(f"delivery ms: {stats['delivery_ms']}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--clients", type=int, default=500)
+    parser.add_argument("--ticks", type=int, default=20)
+    parser.add_argument("--campaigns", type=int, default=100_000)
+    parser.add_argument("--http", action="store_true")
+    parser.add_argument("--base-url", default="http://127.0.0.1:5000")
+    parser.add_argument("--seconds", type=int, default=30)
+    args = parser.parse_args()
+
+    if args.http:
+        over_http(args.base_url, args.clients, args.seconds)
+    else:
+        in_process(args.clients, args.ticks, args.campaigns)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,67 @@
+"""
+Apply the SQL migrations in migrations/ that have not been run yet.
+
+Applied versions are recorded in the schema_migrations table, so running
+this repeatedly is safe:
+
+    python migrate.py            # apply pending migrations
+    python migrate.py --status   # list applied / pending
+"""
+import argparse
+import os
+
+import mysql.connector
+
+from config import DB_CONFIG
+
+MIGRATIONS_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "migrations")
+
+
+def list_migrations():
+    return sorted(f for f in os.listdir(MIGRATIONS_DIR) if f.endswith(".sql"))
+
+
+def split_statements(sql):
+    lines = [line for line in sql.splitlines() if not line.strip().startswith("--")]
+    return [stmt.strip() for stmt in "\n".join(lines).split(";") if stmt.strip()]
+
+
+def applied_versions(cursor):
+    cursor.execute("""
+        CREATE TABLE IF NOT EXISTS schema_migrations (
+            version VARCHAR(255) PRIMARY KEY,
+            applied_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+        )
+    """)
+    cursor.execute("SELECT version FROM schema_migrations")
+    return {row[0] for row in cursor.fetchall()}
+
+
+def migrate(status_only=False):
+    conn = mysql.connector.connect(**DB_CONFIG)
+    cursor = conn.cursor()
+    try:
+        done = applied_versions(cursor)
+        for name in list_migrations():
+            if name in done:
+                print(f"✅ {name} (applied)")
+                continue
+            if status_only:
+                print(f"⏳ {name} (pending)")
+                continue
+            with open(os.path.join(MIGRATIONS_DIR, name)) as f:
+                for statement in split_statements(f.read()):
+                    cursor.execute(statement)
+            cursor.execute("INSERT INTO schema_migrations (version) VALUES (%s)", (name,))
+            conn.commit()
+            print(f"🚀 Applied {name}")
+    finally:
+        cursor.close()
+        conn.close()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--status", action="store_true", help="show migration status without applying")
+    args = parser.parse_args()
+    migrate(status_only=args.status)
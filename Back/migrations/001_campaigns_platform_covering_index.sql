@@ -0,0 +1,7 @@
+-- Covering index for the per-platform aggregate in get_platform_data:
+-- GROUP BY Platform with SUM(Cost), SUM(Clicks), SUM(Conversions) is
+-- answered from the index alone instead of scanning campaigns.
+-- Platform must be a VARCHAR column (TEXT columns need a prefix length,
+-- which stops the index from covering the query).
+CREATE INDEX idx_campaigns_platform_cost_clicks_conv
+    ON campaigns (Platform, Cost, Clicks, Conversions);
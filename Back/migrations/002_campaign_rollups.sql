@@ -0,0 +1,36 @@
+-- Pre-aggregated campaign metrics maintained by rollup.py.
+-- One row per day / platform / device / keyword; rows without a usable
+-- Ad_Date are kept under the 1000-01-01 sentinel date so totals still
+-- match the raw campaigns table.
+CREATE TABLE IF NOT EXISTS campaign_daily_rollup (
+    rollup_date DATE NOT NULL,
+    Platform VARCHAR(64) NOT NULL DEFAULT '',
+    Device VARCHAR(64) NOT NULL DEFAULT '',
+    Keyword VARCHAR(255) NOT NULL DEFAULT '',
+    row_count BIGINT NOT NULL DEFAULT 0,
+    impressions BIGINT NOT NULL DEFAULT 0,
+    clicks BIGINT NOT NULL DEFAULT 0,
+    conversions BIGINT NOT NULL DEFAULT 0,
+    cost DECIMAL(20, 2) NOT NULL DEFAULT 0,
+    sale_amount DECIMAL(20, 2) NOT NULL DEFAULT 0,
+    PRIMARY KEY (rollup_date, Platform, Device, Keyword),
+    KEY idx_rollup_device (Device),
+    KEY idx_rollup_keyword (Keyword)
+);
+
+-- Monthly view over the daily rollup, keyed by the first day of the month
+-- so the same month in different years stays separate.
+CREATE OR REPLACE VIEW campaign_monthly_rollup AS
+SELECT
+    DATE_FORMAT(rollup_date, '%Y-%m-01') AS month_start,
+    Platform,
+    Device,
+    Keyword,
+    SUM(row_count) AS row_count,
+    SUM(impressions) AS impressions,
+    SUM(clicks) AS clicks,
+    SUM(conversions) AS conversions,
+    SUM(cost) AS cost,
+    SUM(sale_amount) AS sale_amount
+FROM campaign_daily_rollup
+GROUP BY DATE_FORMAT(rollup_date, '%Y-%m-01'), Platform, Device, Keyword;
@@ -0,0 +1,10 @@
+-- Single-row counter bumped in the same transaction as every write to
+-- campaigns, the rollup or predictive_insights. response_cache.py keys
+-- cached dashboard responses and their ETags on it, so servers and
+-- writer scripts in other processes agree on when the data changed.
+CREATE TABLE IF NOT EXISTS data_version (
+    id TINYINT PRIMARY KEY,
+    version BIGINT NOT NULL DEFAULT 0
+);
+
+INSERT IGNORE INTO data_version (id, version) VALUES (1, 0);
@@ -0,0 +1,87 @@
+"""
+Inference runtimes for the multi-task model.
+
+Both runtimes take a scaled float matrix (n x 10) and return the model
+outputs as a list in the Keras output order, so predictor.py does not care
+which one is loaded. Heavy imports (TensorFlow, onnxruntime) happen only
+when a runtime is constructed.
+"""
+import hashlib
+import json
+import logging
+import os
+
+import numpy as np
+
+from config import INFERENCE_BACKEND
+
+logger = logging.getLogger(__name__)
+
+KERAS_MODEL_PATH = "multi_task_model2.keras"
+ONNX_MODEL_PATH = "multi_task_model2.onnx"
+# Written by export_model.py next to the ONNX file: output order and version
+ONNX_META_PATH = ONNX_MODEL_PATH + ".json"
+
+
+def file_version(path):
+    """Short content hash of a model file, used as the model version."""
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(1 << 20), b""):
+            digest.update(block)
+    return digest.hexdigest()[:12]
+
+
+class KerasRuntime:
+    name = "keras"
+
+    def __init__(self, path=KERAS_MODEL_PATH):
+        from tensorflow.keras.models import load_model
+
+        self.model = load_model(path)
+        self.version = file_version(path)
+
+    def predict(self, X):
+        return self.model.predict(X, batch_size=len(X), verbose=0)
+
+
+class OnnxRuntime:
+    name = "onnx"
+
+    def __init__(self, path=ONNX_MODEL_PATH, meta_path=ONNX_META_PATH):
+        import onnxruntime as ort
+
+        options = ort.SessionOptions()
+        options.graph_optimization_level = ort.GraphOptimizationLevel.ORT_ENABLE_ALL
+        self.session = ort.InferenceSession(path, options, providers=["CPUExecutionProvider"])
+        self.input_name = self.session.get_inputs()[0].name
+        with open(meta_path) as f:
+            meta = json.load(f)
+        self.output_names = meta["outputs"]
+        self.version = meta["model_version"]
+
+    def predict(self, X):
+        return self.session.run(self.output_names, {self.input_name: np.asarray(X, dtype=np.float32)})
+
+
+def onnx_available():
+    if not (os.path.exists(ONNX_MODEL_PATH) and os.path.exists(ONNX_META_PATH)):
+        return False
+    try:
+        import onnxruntime  # noqa: F401
+    except ImportError:
+        return False
+    return True
+
+
+def load_runtime(backend=INFERENCE_BACKEND):
+    if backend == "auto":
+        backend = "onnx" if onnx_available() else "keras"
+    if backend == "onnx":
+        runtime = OnnxRuntime()
+    elif backend == "keras":
+        runtime = KerasRuntime()
+    else:
+        raise ValueError(f"Unknown inference backend '{backend}' (expected onnx, keras or auto)")
+    logger.info(f"Loaded {runtime.name} inference runtime (model version {runtime.version})")
+    return runtime
@@ -1,18 +1,8 @@
-import mysql.connector
+import datastore
 
 def populate_predictive_insights():
     """Populate the predictive_insights table with sample data"""
     
-    # Database connection
-    conn = mysql.connector.connect(
-        host="localhost",
-        user="root",
-        password="",
-        database="adintelli"
-    )
-    
-    cursor = conn.cursor()
-    
     # Sample data
     sample_data = [
         ("Summer Sale 2024", 15000.00, "Active", 2.45, "Target CPA", 234.00, 45000.00, "Yes", "Increase budget by 20%"),
@@ -28,33 +18,11 @@ def populate_predictive_insights():
     ]
     
     try:
-        # Clear existing data
-        cursor.execute("DELETE FROM predictive_insights")
-        
-        # Insert sample data
-        insert_query = """
-        INSERT INTO predictive_insights 
-        (Campaign_Name, Spend, Status, CPC, Bidding_Strategy, Conversions, Revenue, Profitable, Recommendation)
-        VALUES (%s, %s, %s, %s, %s, %s, %s, %s, %s)
-        """
-        
-        cursor.executemany(insert_query, sample_data)
-        conn.commit()
-        
+        count = datastore.replace_predictive_insights(sample_data)
         print(f"Successfully inserted {len(sample_data)} records into predictive_insights table")
-        
-        # Verify the data
-        cursor.execute("SELECT COUNT(*) FROM predictive_insights")
-        count = cursor.fetchone()[0]
         print(f"Total records in table: {count}")
-        
     except Exception as e:
         print(f"Error: {e}")
-        conn.rollback()
-    
-    finally:
-        cursor.close()
-        conn.close()
 
 if __name__ == "__main__":
     populate_predictive_insights()
@@ -0,0 +1,251 @@
+"""
+Cache of predict_campaign results.
+
+Entries are keyed by a hash of the model version, the campaign name and
+the scaled feature vector, so a changed row or a new model can never
+return a stale result, and campaigns with identical metrics do not share
+an entry (results carry the campaign name). Each entry is also tagged with
+its campaign name, which lets predict_route skip re-reading the row and
+lets write paths invalidate by campaign through data_events. When several
+rows share a name, the first one cached stands for the campaign, as
+predict_route's LIMIT 1 query would pick it.
+
+Two stores share one interface:
+- MemoryStore: per-process LRU with TTL
+- SQLiteStore: a local SQLite file shared by every worker on the host,
+  a stand-in for a shared cache such as Redis
+"""
+import hashlib
+import json
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+
+import numpy as np
+
+import data_events
+from config import (PREDICTION_CACHE_BACKEND, PREDICTION_CACHE_TTL,
+                    PREDICTION_CACHE_SIZE, PREDICTION_CACHE_PATH)
+
+
+def make_key(model_version, scaled_vector, campaign=None):
+    digest = hashlib.sha256(str(model_version).encode())
+    if campaign is not None:
+        digest.update(b"\0" + str(campaign).encode() + b"\0")
+    digest.update(np.ascontiguousarray(scaled_vector, dtype=np.float64).tobytes())
+    return digest.hexdigest()
+
+
+class MemoryStore:
+    def __init__(self, max_entries, ttl):
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self._entries = OrderedDict()  # key -> (expires_at, campaign, value)
+        self._by_campaign = {}  # campaign -> key
+        self._lock = threading.Lock()
+        self.evictions = 0
+
+    def get(self, key):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            if entry[0] < time.monotonic():
+                self._remove(key)
+                return None
+            self._entries.move_to_end(key)
+            return entry[2]
+
+    def key_for_campaign(self, campaign):
+        with self._lock:
+            return self._by_campaign.get(campaign)
+
+    def set(self, key, value, campaign=None):
+        with self._lock:
+            # Another live row of the same campaign keeps standing for it
+            current = self._by_campaign.get(campaign)
+            if campaign is not None and current not in (None, key) and current in self._entries:
+                campaign = None
+            self._entries[key] = (time.monotonic() + self.ttl, campaign, value)
+            self._entries.move_to_end(key)
+            if campaign is not None:
+                self._by_campaign[campaign] = key
+            while len(self._entries) > self.max_entries:
+                oldest = next(iter(self._entries))
+                self._remove(oldest)
+                self.evictions += 1
+
+    def _remove(self, key):
+        _, campaign, _ = self._entries.pop(key)
+        if campaign is not None and self._by_campaign.get(campaign) == key:
+            del self._by_campaign[campaign]
+
+    def invalidate(self, campaigns=None):
+        with self._lock:
+            if campaigns is None:
+                removed = len(self._entries)
+                self._entries.clear()
+                self._by_campaign.clear()
+                return removed
+            removed = 0
+            for campaign in campaigns:
+                key = self._by_campaign.get(campaign)
+                if key in self._entries:
+                    self._remove(key)
+                    removed += 1
+            return removed
+
+    def size(self):
+        return len(self._entries)
+
+
+class SQLiteStore:
+    def __init__(self, path, max_entries, ttl):
+        self.path = path
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self.evictions = 0
+        self._local = threading.local()
+        conn = self._conn()
+        conn.execute("""
+            CREATE TABLE IF NOT EXISTS prediction_cache (
+                key TEXT PRIMARY KEY,
+                campaign TEXT,
+                value TEXT NOT NULL,
+                expires_at REAL NOT NULL,
+                last_used REAL NOT NULL
+            )
+        """)
+        conn.execute("CREATE INDEX IF NOT EXISTS idx_prediction_cache_campaign ON prediction_cache (campaign)")
+        conn.commit()
+
+    def _conn(self):
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(self.path, timeout=5, isolation_level=None)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            self._local.conn = conn
+        return conn
+
+    def get(self, key):
+        now = time.time()
+        row = self._conn().execute(
+            "SELECT value FROM prediction_cache WHERE key = ? AND expires_at >= ?", (key, now)
+        ).fetchone()
+        if row is None:
+            return None
+        self._conn().execute("UPDATE prediction_cache SET last_used = ? WHERE key = ?", (now, key))
+        return json.loads(row[0])
+
+    def key_for_campaign(self, campaign):
+        row = self._conn().execute(
+            "SELECT key FROM prediction_cache WHERE campaign = ? AND expires_at >= ? "
+            "ORDER BY last_used DESC LIMIT 1", (campaign, time.time())
+        ).fetchone()
+        return row[0] if row else None
+
+    def set(self, key, value, campaign=None):
+        now = time.time()
+        conn = self._conn()
+        if campaign is not None and conn.execute(
+                "SELECT 1 FROM prediction_cache WHERE campaign = ? AND key != ? AND expires_at >= ?",
+                (campaign, key, now)).fetchone():
+            campaign = None  # another live row of the same campaign keeps standing for it
+        conn.execute(
+            "INSERT OR REPLACE INTO prediction_cache (key, campaign, value, expires_at, last_used) "
+            "VALUES (?, ?, ?, ?, ?)", (key, campaign, json.dumps(value), now + self.ttl, now)
+        )
+        overflow = self.size() - self.max_entries
+        if overflow > 0:
+            conn.execute(
+                "DELETE FROM prediction_cache WHERE key IN "
+                "(SELECT key FROM prediction_cache ORDER BY last_used LIMIT ?)", (overflow,)
+            )
+            self.evictions += overflow
+
+    def invalidate(self, campaigns=None):
+        conn = self._conn()
+        if campaigns is None:
+            return conn.execute("DELETE FROM prediction_cache").rowcount
+        campaigns = list(campaigns)
+        if not campaigns:
+            return 0
+        placeholders = ", ".join(["?"] * len(campaigns))
+        return conn.execute(f"DELETE FROM prediction_cache WHERE campaign IN ({placeholders})", campaigns).rowcount
+
+    def size(self):
+        return self._conn().execute("SELECT COUNT(*) FROM prediction_cache").fetchone()[0]
+
+
+class PredictionCache:
+    def __init__(self, store):
+        self.store = store
+        self.hits = 0
+        self.misses = 0
+        self.invalidations = 0
+
+    def get(self, key):
+        value = self.store.get(key)
+        if value is None:
+            self.misses += 1
+        else:
+            self.hits += 1
+        return value
+
+    def get_for_campaign(self, campaign):
+        """Cached result for a campaign name without touching the database, or None."""
+        key = self.store.key_for_campaign(campaign)
+        return self.get(key) if key else None
+
+    def set(self, key, value, campaign=None):
+        self.store.set(key, value, campaign)
+
+    def invalidate(self, campaigns=None):
+        self.invalidations += self.store.invalidate(campaigns)
+
+    def stats(self):
+        lookups = self.hits + self.misses
+        return {
+            "backend": type(self.store).__name__,
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_ratio": round(self.hits / lookups, 4) if lookups else 0,
+            "invalidations": self.invalidations,
+            "evictions": self.store.evictions,
+            "size": self.store.size()
+        }
+
+
+class _NoCache(PredictionCache):
+    def __init__(self):
+        super().__init__(None)
+
+    def get(self, key):
+        self.misses += 1
+        return None
+
+    def get_for_campaign(self, campaign):
+        return None
+
+    def set(self, key, value, campaign=None):
+        pass
+
+    def invalidate(self, campaigns=None):
+        pass
+
+    def stats(self):
+        return {"backend": "off", "hits": 0, "misses": self.misses}
+
+
+def _create_cache():
+    if PREDICTION_CACHE_BACKEND == "off":
+        return _NoCache()
+    if PREDICTION_CACHE_BACKEND == "sqlite":
+        return PredictionCache(SQLiteStore(PREDICTION_CACHE_PATH, PREDICTION_CACHE_SIZE, PREDICTION_CACHE_TTL))
+    return PredictionCache(MemoryStore(PREDICTION_CACHE_SIZE, PREDICTION_CACHE_TTL))
+
+
+cache = _create_cache()
+data_events.subscribe(cache.invalidate)
@@ -0,0 +1,187 @@
+import threading
+from types import SimpleNamespace
+
+import joblib
+import numpy as np
+
+import derived_metrics
+import model_runtime
+import prediction_cache
+import request_metrics
+from batcher import MicroBatcher
+from config import (PREDICT_CHUNK_SIZE, PREDICT_BATCHING_ENABLED, PREDICT_BATCH_WINDOW_MS,
+                    PREDICT_BATCH_MAX_SIZE, PREDICT_QUEUE_MAX)
+
+PLATFORM_ENCODER_PATH = "platform_encoder.save"
+BID_ENCODER_PATH = "bid_strategy_encoder.save"
+BUDGET_REC_ENCODER_PATH = "budget_rec_encoder.save"
+AUDIENCE_ENCODER_PATH = "audience_exp_encoder.save"
+SCALER_PATH = "feature_scaler.save"
+
+OUTPUT_NAMES = ['campaign_score', 'roi_forecast', 'avg_perf_score', 'budget_dist',
+                'budget_realloc', 'performance_alerts', 'budget_rec',
+                'audience_exp', 'bid_strategy']
+
+# ---------------- Load ML Components ----------------
+# Loaded on the first prediction rather than at import, so worker start-up
+# and routes unrelated to ML never pay for the model runtime.
+_components = None
+_load_lock = threading.Lock()
+
+
+def components():
+    global _components
+    if _components is None:
+        with _load_lock:
+            if _components is None:
+                _components = SimpleNamespace(
+                    runtime=model_runtime.load_runtime(),
+                    platform_encoder=joblib.load(PLATFORM_ENCODER_PATH),
+                    bid_strategy_encoder=joblib.load(BID_ENCODER_PATH),
+                    budget_rec_encoder=joblib.load(BUDGET_REC_ENCODER_PATH),
+                    audience_exp_encoder=joblib.load(AUDIENCE_ENCODER_PATH),
+                    scaler=joblib.load(SCALER_PATH)
+                )
+    return _components
+
+
+def model_version():
+    return components().runtime.version
+
+
+# ---------------- Feature Building ----------------
+def parse_budget_distribution(value):
+    """'50% Search, 30% Display, 20% Video' -> [50.0, 30.0, 20.0] (missing parts are 0)."""
+    if not isinstance(value, str):
+        return [0.0, 0.0, 0.0]
+    percentages = []
+    for part in value.split(','):
+        try:
+            percent = float(part.strip().split('%')[0])
+        except ValueError:
+            percent = 0.0
+        percentages.append(percent)
+    while len(percentages) < 3:
+        percentages.append(0.0)
+    return percentages[:3]
+
+
+def build_feature_matrix(rows):
+    """
+    Unscaled model input (n x 10) for a list of campaigns rows.
+
+    Columns: platform_encoded, Impressions, Clicks, Cost, Conversions, CTR,
+    ROAS, budget_alpha, budget_beta, budget_gamma.
+    """
+    # Fix platform naming (add " Ads") and encode every row in one call
+    platforms = [str(row.get('Platform', 'Unknown')) + " Ads" for row in rows]
+    platform_encoded = components().platform_encoder.transform(platforms).astype(np.float64)
+
+    cols = derived_metrics.columns_from_rows(rows)
+    impressions = cols["Impressions"]
+    clicks = cols["Clicks"]
+    spend = cols["Cost"]
+    ctr = derived_metrics.ctr(clicks, impressions)
+    roas = derived_metrics.roas(cols["Sale_Amount"], spend)
+
+    budget = np.array([parse_budget_distribution(row.get('recommended_budget_distribution'))
+                       for row in rows], dtype=np.float64).reshape(len(rows), 3)
+
+    return np.column_stack([platform_encoded, impressions, clicks, spend,
+                            cols["Conversions"], ctr, roas, budget])
+
+
+def run_model(X_scaled, chunk_size=PREDICT_CHUNK_SIZE):
+    """Model inference over the scaled matrix in chunks; returns {output_name: (n, k) array}."""
+    runtime = components().runtime
+    chunks = []
+    with request_metrics.timed("model"):
+        for start in range(0, len(X_scaled), chunk_size):
+            chunks.append(runtime.predict(X_scaled[start:start + chunk_size]))
+    return {name: np.concatenate([c[i] for c in chunks]).reshape(len(X_scaled), -1)
+            for i, name in enumerate(OUTPUT_NAMES)}
+
+
+def decode_predictions(rows, preds):
+    """Turn raw model outputs into the predict_campaign result dicts."""
+    c = components()
+    campaign_score = preds['campaign_score'][:, 0]
+    alerts = preds['performance_alerts'][:, 0] > 0.5
+    realloc = preds['budget_realloc'][:, 0]
+    bid_strategy = c.bid_strategy_encoder.inverse_transform(np.argmax(preds['bid_strategy'], axis=1))
+    roi_forecast = preds['roi_forecast'][:, 0]
+    avg_perf = preds['avg_perf_score'][:, 0]
+    audience_exp = preds['audience_exp'][:, 0] > 0.5
+    budget_rec = c.budget_rec_encoder.inverse_transform(np.argmax(preds['budget_rec'], axis=1))
+
+    results = []
+    for i, row in enumerate(rows):
+        results.append({
+            "Campaign Name": row.get("Campaign_Name", "Unknown"),
+            "Campaign Score": round(float(campaign_score[i]), 2),
+            "Performance Alerts": "Triggered" if alerts[i] else "Normal",
+            "Budget Reallocation (%)": round(float(realloc[i]), 2),
+            "Bid Strategy Optimization": bid_strategy[i],
+            "ROI Forecast (ROAS)": round(float(roi_forecast[i]), 2),
+            "Avg Performance Score": round(float(avg_perf[i]), 2),
+            "Audience Expansion": "Yes" if audience_exp[i] else "No",
+            "Budget Recommendation": budget_rec[i]
+        })
+    return results
+
+
+# ---------------- Prediction ----------------
+def cache_keys(X_scaled, rows):
+    version = model_version()
+    return [prediction_cache.make_key(version, x, row.get("Campaign_Name", "Unknown"))
+            for x, row in zip(X_scaled, rows)]
+
+
+def predict_rows(rows, chunk_size=PREDICT_CHUNK_SIZE):
+    """
+    Predictions for many campaigns rows. Cached results are reused; the
+    rest are scored with one model.predict per chunk.
+    """
+    if not rows:
+        return []
+    X_scaled = components().scaler.transform(build_feature_matrix(rows))
+    keys = cache_keys(X_scaled, rows)
+    results = [prediction_cache.cache.get(key) for key in keys]
+
+    missing = [i for i, result in enumerate(results) if result is None]
+    if missing:
+        fresh = decode_predictions([rows[i] for i in missing], run_model(X_scaled[missing], chunk_size))
+        for i, result in zip(missing, fresh):
+            results[i] = result
+            prediction_cache.cache.set(keys[i], result, campaign=rows[i].get("Campaign_Name"))
+    return results
+
+
+def _run_scaled_batch(vectors):
+    """Batcher callback: one model call for all queued rows, sliced back per caller."""
+    preds = run_model(np.vstack(vectors))
+    return [{name: out[i:i + 1] for name, out in preds.items()} for i in range(len(vectors))]
+
+
+batcher = MicroBatcher(_run_scaled_batch, max_batch_size=PREDICT_BATCH_MAX_SIZE,
+                       window_ms=PREDICT_BATCH_WINDOW_MS, max_queue=PREDICT_QUEUE_MAX,
+                       name="predict-batcher")
+
+
+def predict_campaign(row):
+    """
+    Prediction for a single campaigns row. Concurrent callers are merged
+    into one model.predict by the micro-batcher; raises batcher.QueueFull
+    when too many predictions are already waiting.
+    """
+    if not PREDICT_BATCHING_ENABLED:
+        return predict_rows([row])[0]
+    X_scaled = components().scaler.transform(build_feature_matrix([row]))
+    key = cache_keys(X_scaled, [row])[0]
+    result = prediction_cache.cache.get(key)
+    if result is None:
+        with request_metrics.timed("model"):
+            preds = batcher.submit(X_scaled)
+        result = decode_predictions([row], preds)[0]
+        prediction_cache.cache.set(key, result, campaign=row.get("Campaign_Name"))
+    return result
@@ -0,0 +1,88 @@
+"""
+Set-based simulation of live campaign metrics for /realTime.
+
+All random metrics are generated as NumPy arrays, written with one
+temporary-table bulk load plus a single UPDATE ... JOIN keyed on Ad_ID,
+and aggregated from the same arrays.
+"""
+import numpy as np
+
+import derived_metrics
+
+TEMP_TABLE = "realtime_metrics_tmp"
+WRITE_BATCH_SIZE = 10000
+
+
+def simulate_metrics(n, rng=np.random):
+    """Random clicks (0-50), impressions (0-100) and conversions (0-15) for n campaigns."""
+    return {
+        "clicks": rng.randint(0, 51, n),
+        "impressions": rng.randint(0, 101, n),
+        "conversions": rng.randint(0, 16, n)
+    }
+
+
+def bulk_update_metrics(cursor, ad_ids, metrics, table="campaigns", batch_size=WRITE_BATCH_SIZE, dialect="mysql"):
+    """
+    Write Clicks/Impressions/Conversions for every Ad_ID in one UPDATE ... JOIN.
+
+    The temporary table copies Ad_ID's column type from `table` so the join
+    uses its primary key. dialect="sqlite" uses UPDATE ... FROM instead
+    (SQLite 3.33+).
+    """
+    if dialect == "sqlite":
+        drop = f"DROP TABLE IF EXISTS temp.{TEMP_TABLE}"
+        create = f"CREATE TEMP TABLE {TEMP_TABLE} (Ad_ID PRIMARY KEY, Clicks INTEGER, Impressions INTEGER, Conversions INTEGER)"
+        update = f"""
+            UPDATE {table}
+            SET Clicks = r.Clicks, Impressions = r.Impressions, Conversions = r.Conversions
+            FROM {TEMP_TABLE} r
+            WHERE {table}.Ad_ID = r.Ad_ID
+        """
+    else:
+        drop = f"DROP TEMPORARY TABLE IF EXISTS {TEMP_TABLE}"
+        create = f"""
+            CREATE TEMPORARY TABLE {TEMP_TABLE} (PRIMARY KEY (Ad_ID))
+            SELECT Ad_ID, Clicks, Impressions, Conversions FROM {table} LIMIT 0
+        """
+        update = f"""
+            UPDATE {table} c
+            JOIN {TEMP_TABLE} r ON c.Ad_ID = r.Ad_ID
+            SET c.Clicks = r.Clicks, c.Impressions = r.Impressions, c.Conversions = r.Conversions
+        """
+
+    cursor.execute(drop)
+    cursor.execute(create)
+    try:
+        rows = list(zip(ad_ids,
+                        metrics["clicks"].tolist(),
+                        metrics["impressions"].tolist(),
+                        metrics["conversions"].tolist()))
+        # executemany turns a plain INSERT into multi-row INSERT statements
+        insert = f"INSERT INTO {TEMP_TABLE} (Ad_ID, Clicks, Impressions, Conversions) VALUES (%s, %s, %s, %s)"
+        for start in range(0, len(rows), batch_size):
+            cursor.executemany(insert, rows[start:start + batch_size])
+        cursor.execute(update)
+    finally:
+        cursor.execute(drop)
+
+
+def summarize(costs, metrics):
+    """The /realTime response body, computed from the simulated arrays."""
+    count = len(costs)
+    clicks = metrics["clicks"]
+    total_clicks = int(clicks.sum())
+    total_impressions = int(metrics["impressions"].sum())
+    total_conversions = int(metrics["conversions"].sum())
+    total_cpc = float(derived_metrics.cpc(costs, clicks).sum()) if count else 0.0
+    avg_ctr = derived_metrics.ctr(total_clicks, total_impressions)
+    avg_conversions = (total_conversions / count) if count else 0
+
+    return {
+        "total_campaigns": count,
+        "total_impressions": total_impressions,
+        "avg_ctr": round(avg_ctr, 2),
+        "total_clicks": total_clicks,
+        "avg_conversions": round(avg_conversions, 2),
+        "total_cpc": round(total_cpc, 2)
+    }
@@ -0,0 +1,245 @@
+"""
+Push-based real-time metrics for the Real-Time Monitoring tab.
+
+One producer thread per process keeps the running aggregate in memory
+(seeded once from campaigns) and, every tick, simulates the next metrics
+and pushes only the fields that changed to every subscriber. Dashboard
+clients share this producer instead of each poll rewriting the table.
+Each tick's per-campaign metrics also feed the anomaly detector, so
+/getAlerts follows the live stream as it does /realTime.
+"""
+import asyncio
+import json
+import logging
+import queue
+import threading
+import time
+
+import numpy as np
+
+import anomaly
+import data_events
+import datastore
+import derived_metrics
+import realtime_metrics
+from config import REALTIME_TICK_SECONDS, REALTIME_SUBSCRIBER_BUFFER
+from histogram import Histogram
+
+logger = logging.getLogger(__name__)
+
+LATENCY_BOUNDS_MS = [0.1, 0.5, 1, 2, 5, 10, 25, 50, 100, 250, 1000]
+
+
+class Subscription:
+    def __init__(self, buffer_size):
+        self.queue = queue.Queue(maxsize=buffer_size)
+        self.dropped = 0
+
+    def push(self, message):
+        try:
+            self.queue.put_nowait(message)
+        except queue.Full:
+            # Slow consumer: drop its oldest update rather than block the producer
+            try:
+                self.queue.get_nowait()
+                self.dropped += 1
+            except queue.Empty:
+                pass
+            self.queue.put_nowait(message)
+
+    def get(self, timeout):
+        return self.queue.get(timeout=timeout)
+
+
+class AsyncSubscription(Subscription):
+    """Subscription read from an asyncio event loop; each push wakes the waiting coroutine."""
+
+    def __init__(self, buffer_size, loop):
+        super().__init__(buffer_size)
+        self.loop = loop
+        self.ready = asyncio.Event()
+
+    def push(self, message):
+        super().push(message)
+        try:
+            self.loop.call_soon_threadsafe(self.ready.set)
+        except RuntimeError:
+            pass  # event loop already closed
+
+    async def get_async(self, timeout):
+        while True:
+            try:
+                return self.queue.get_nowait()
+            except queue.Empty:
+                pass
+            self.ready.clear()
+            if not self.queue.empty():
+                continue
+            try:
+                await asyncio.wait_for(self.ready.wait(), timeout)
+            except asyncio.TimeoutError:
+                raise queue.Empty
+
+
+class MetricsBroadcaster:
+    def __init__(self, load_campaigns, tick_seconds=REALTIME_TICK_SECONDS,
+                 buffer_size=REALTIME_SUBSCRIBER_BUFFER, rng=None, detector=anomaly.detector):
+        """
+        `load_campaigns` returns (Ad_IDs, Cost column as a float array,
+        campaign names); it is called on start and after data changes.
+        Simulated metrics go to `detector` (None to skip).
+        """
+        self.load_campaigns = load_campaigns
+        self.tick_seconds = tick_seconds
+        self.buffer_size = buffer_size
+        self.rng = rng or np.random.RandomState()
+        self.detector = detector
+
+        self._subscribers = set()
+        self._lock = threading.Lock()
+        self._thread = None
+        self._stop = threading.Event()
+        self._ad_ids = None
+        self._names = None
+        self._costs = None
+        self._costs_stale = False
+        self.snapshot = None
+        self.tick = 0
+
+        self.fanout_ms = Histogram(LATENCY_BOUNDS_MS)
+        self.delivery_ms = Histogram(LATENCY_BOUNDS_MS)
+
+    # ---------------- Subscribers ----------------
+    def subscribe(self, subscription=None):
+        self._ensure_started()
+        subscription = subscription or Subscription(self.buffer_size)
+        with self._lock:
+            self._subscribers.add(subscription)
+            if self.snapshot is not None:
+                subscription.push(self._message("snapshot", self.snapshot))
+        return subscription
+
+    def unsubscribe(self, subscription):
+        with self._lock:
+            self._subscribers.discard(subscription)
+
+    def subscriber_count(self):
+        with self._lock:
+            return len(self._subscribers)
+
+    # ---------------- Producer ----------------
+    def _ensure_started(self):
+        if self._thread is None:
+            with self._lock:
+                if self._thread is None:
+                    self._load()
+                    self.snapshot = self._next_snapshot()
+                    self._thread = threading.Thread(target=self._run, name="realtime-stream", daemon=True)
+                    self._thread.start()
+
+    def _load(self):
+        ad_ids, costs, names = self.load_campaigns()
+        self._ad_ids, self._names = list(ad_ids), list(names)
+        self._costs = np.asarray(costs, dtype=np.float64)
+
+    def invalidate_costs(self, campaign_names=None):
+        """data_events listener: campaigns were added or changed, reload costs on the next tick."""
+        self._costs_stale = True
+
+    def _next_snapshot(self):
+        if self._costs_stale:
+            self._costs_stale = False
+            self._load()
+        metrics = realtime_metrics.simulate_metrics(len(self._costs), self.rng)
+        if self.detector is not None:
+            self.detector.observe(self._ad_ids, metrics["clicks"], metrics["impressions"], metrics["conversions"],
+                                  self._costs, self._names)
+        return realtime_metrics.summarize(self._costs, metrics)
+
+    def _message(self, event, data):
+        return {"event": event, "tick": self.tick, "data": data, "published_at": time.perf_counter()}
+
+    def publish_tick(self):
+        """Advance the aggregate one tick and fan the changed fields out to every subscriber."""
+        snapshot = self._next_snapshot()
+        delta = {k: v for k, v in snapshot.items() if self.snapshot.get(k) != v}
+        self.snapshot = snapshot
+        self.tick += 1
+        if not delta:
+            return
+        message = self._message("delta", delta)
+        with self._lock:
+            subscribers = list(self._subscribers)
+        for subscription in subscribers:
+            subscription.push(message)
+        self.fanout_ms.observe((time.perf_counter() - message["published_at"]) * 1000)
+
+    def _run(self):
+        while not self._stop.wait(self.tick_seconds):
+            if not self.subscriber_count():
+                continue
+            try:
+                self.publish_tick()
+            except Exception as e:
+                logger.error(f"Error in realtime stream tick: {str(e)}")
+
+    def stop(self):
+        self._stop.set()
+
+    # ---------------- Delivery ----------------
+    def sse_events(self, subscription, heartbeat_seconds=15):
+        """Server-Sent Events text for one subscriber; ends when the client disconnects."""
+        try:
+            while True:
+                try:
+                    message = subscription.get(timeout=heartbeat_seconds)
+                except queue.Empty:
+                    yield ": keepalive\n\n"
+                    continue
+                yield self._sse_frame(message)
+        finally:
+            self.unsubscribe(subscription)
+
+    async def subscribe_async(self):
+        """Subscription for an asyncio consumer; the first call loads costs in a worker thread."""
+        subscription = AsyncSubscription(self.buffer_size, asyncio.get_running_loop())
+        return await asyncio.to_thread(self.subscribe, subscription)
+
+    async def sse_events_async(self, subscription, heartbeat_seconds=15):
+        """sse_events for an AsyncSubscription, without holding a thread per client."""
+        try:
+            while True:
+                try:
+                    message = await subscription.get_async(timeout=heartbeat_seconds)
+                except queue.Empty:
+                    yield ": keepalive\n\n"
+                    continue
+                yield self._sse_frame(message)
+        finally:
+            self.unsubscribe(subscription)
+
+    def _sse_frame(self, message):
+        self.delivery_ms.observe((time.perf_counter() - message["published_at"]) * 1000)
+        payload = json.dumps({"tick": message["tick"], **message["data"]})
+        return f"event: {message['event']}\ndata: {payload}\n\n"
+
+    def stats(self):
+        with self._lock:
+            dropped = sum(s.dropped for s in self._subscribers)
+        return {
+            "subscribers": self.subscriber_count(),
+            "tick": self.tick,
+            "tick_seconds": self.tick_seconds,
+            "dropped_updates": dropped,
+            "fanout_ms": self.fanout_ms.snapshot(),
+            "delivery_ms": self.delivery_ms.snapshot()
+        }
+
+
+def load_campaigns():
+    rows = datastore.campaign_costs()
+    return [r[0] for r in rows], derived_metrics.as_column([r[1] for r in rows]), [r[2] for r in rows]
+
+
+broadcaster = MetricsBroadcaster(load_campaigns)
+data_events.subscribe(broadcaster.invalidate_costs)
@@ -0,0 +1,319 @@
+"""
+Per-request latency metrics and the opt-in slow-request profiler.
+
+init_app() hooks a Flask app (init_async_app() the Quart one) so every
+request is timed per route, and the time it spends in each phase is
+recorded separately:
+
+- "db": cursor execute/fetch calls (datastore wraps its cursors in TimedCursor)
+- "model": model inference and waiting on the prediction batcher or chat model
+- "serialization": JSON encoding of the response (json_encoding's providers)
+- "python": everything else, i.e. route logic and post-processing
+
+render() formats them, Prometheus text exposition style, for /metrics.
+
+With ADINTELLI_PROFILE_SLOW_MS set, a sampler thread records the stack of
+every in-flight request each PROFILE_INTERVAL_MS; requests slower than
+the threshold have their samples written to PROFILE_DIR in the folded
+format flamegraph.pl and speedscope read:
+
+    ADINTELLI_PROFILE_SLOW_MS=200 python app.py
+    flamegraph.pl profiles/*-getKpiData.folded > kpi.svg
+
+The profiler relies on one thread per request, so it is Flask-only.
+"""
+import contextvars
+import logging
+import os
+import re
+import sys
+import threading
+import time
+from collections import Counter
+from contextlib import contextmanager
+
+from config import PROFILE_SLOW_MS, PROFILE_INTERVAL_MS, PROFILE_DIR
+from histogram import Histogram
+
+logger = logging.getLogger(__name__)
+
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+LATENCY_BOUNDS_SECONDS = [0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10]
+PHASES = ["db", "model", "serialization"]
+
+
+class RequestRecord:
+    __slots__ = ("started", "phases", "thread")
+
+    def __init__(self):
+        self.started = time.perf_counter()
+        self.phases = dict.fromkeys(PHASES, 0.0)
+        self.thread = threading.get_ident()
+
+
+_current = contextvars.ContextVar("adintelli_request", default=None)
+
+
+def add(phase, seconds):
+    """Charge `seconds` to `phase` of the current request; a no-op outside requests."""
+    record = _current.get()
+    if record is not None:
+        record.phases[phase] += seconds
+
+
+@contextmanager
+def timed(phase):
+    started = time.perf_counter()
+    try:
+        yield
+    finally:
+        add(phase, time.perf_counter() - started)
+
+
+class TimedCursor:
+    """DB-API cursor wrapper that charges execute and fetch calls to the "db" phase."""
+
+    def __init__(self, cursor):
+        self._cursor = cursor
+
+    def _timed(self, method, *args):
+        started = time.perf_counter()
+        try:
+            return method(*args)
+        finally:
+            add("db", time.perf_counter() - started)
+
+    def execute(self, *args):
+        return self._timed(self._cursor.execute, *args)
+
+    def executemany(self, *args):
+        return self._timed(self._cursor.executemany, *args)
+
+    def fetchone(self):
+        return self._timed(self._cursor.fetchone)
+
+    def fetchall(self):
+        return self._timed(self._cursor.fetchall)
+
+    def fetchmany(self, *args):
+        return self._timed(self._cursor.fetchmany, *args)
+
+    def __iter__(self):
+        return iter(self._cursor)
+
+    def __getattr__(self, name):
+        return getattr(self._cursor, name)
+
+
+# ---------------- Metrics ----------------
+class RequestMetrics:
+    def __init__(self, bounds=LATENCY_BOUNDS_SECONDS):
+        self.bounds = bounds
+        self.latency = {}  # (route, method) -> Histogram
+        self.phases = {}  # (route, phase) -> Histogram
+        self.responses = Counter()  # (route, method, status) -> count
+        self.profiles_written = 0
+        self._lock = threading.Lock()
+
+    def _histogram(self, table, key):
+        histogram = table.get(key)
+        if histogram is None:
+            with self._lock:
+                histogram = table.setdefault(key, Histogram(self.bounds))
+        return histogram
+
+    def observe(self, route, method, status, record, elapsed):
+        self._histogram(self.latency, (route, method)).observe(elapsed)
+        for phase, seconds in record.phases.items():
+            self._histogram(self.phases, (route, phase)).observe(seconds)
+        self._histogram(self.phases, (route, "python")).observe(max(elapsed - sum(record.phases.values()), 0.0))
+        with self._lock:
+            self.responses[(route, method, status)] += 1
+
+
+metrics = RequestMetrics()
+
+
+def _label_value(value):
+    return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _labels(names, values, extra=""):
+    pairs = [f'{n}="{_label_value(v)}"' for n, v in zip(names, values)]
+    if extra:
+        pairs.append(extra)
+    return "{" + ",".join(pairs) + "}" if pairs else ""
+
+
+def histogram_text(name, help_text, label_names, histograms):
+    """Prometheus histogram lines for {label values tuple: Histogram}."""
+    lines = [f"# HELP {name} {help_text}", f"# TYPE {name} histogram"]
+    for values, histogram in sorted(histograms.items()):
+        values = values if isinstance(values, tuple) else (values,)
+        snapshot = histogram.snapshot()
+        for bound, count in snapshot["buckets"].items():
+            le = 'le="%s"' % bound
+            lines.append(f"{name}_bucket{_labels(label_names, values, le)} {count}")
+        lines.append(f"{name}_sum{_labels(label_names, values)} {snapshot['sum']}")
+        lines.append(f"{name}_count{_labels(label_names, values)} {snapshot['count']}")
+    return "\n".join(lines) + "\n"
+
+
+def counter_text(name, help_text, label_names, counts):
+    lines = [f"# HELP {name} {help_text}", f"# TYPE {name} counter"]
+    for values, count in sorted(counts.items()):
+        values = values if isinstance(values, tuple) else (values,)
+        lines.append(f"{name}{_labels(label_names, values)} {count}")
+    return "\n".join(lines) + "\n"
+
+
+def render():
+    with metrics._lock:
+        latency = dict(metrics.latency)
+        phases = dict(metrics.phases)
+        responses = dict(metrics.responses)
+        profiles = metrics.profiles_written
+    return "".join([
+        histogram_text("adintelli_http_request_duration_seconds", "Request latency by route.",
+                       ["route", "method"], latency),
+        histogram_text("adintelli_http_request_phase_seconds",
+                       "Time per request spent in db, model, serialization and remaining python code.",
+                       ["route", "phase"], phases),
+        counter_text("adintelli_http_responses_total", "Responses by route and status.",
+                     ["route", "method", "status"], responses),
+        counter_text("adintelli_slow_request_profiles_total", "Slow-request profiles written.",
+                     [], {(): profiles}),
+    ])
+
+
+# ---------------- Profiler ----------------
+def fold_stack(frame):
+    """Stack as 'root;...;leaf' frames, the folded format flame graph tools read."""
+    names = []
+    while frame is not None:
+        code = frame.f_code
+        names.append(f"{os.path.basename(code.co_filename)}:{code.co_name}")
+        frame = frame.f_back
+    return ";".join(reversed(names))
+
+
+class StackSampler:
+    """Samples the stacks of threads serving registered requests every `interval` seconds."""
+
+    def __init__(self, interval):
+        self.interval = interval
+        self._active = {}  # thread id -> Counter of folded stacks
+        self._lock = threading.Lock()
+        self._thread = None
+
+    def start(self):
+        if self._thread is None:
+            self._thread = threading.Thread(target=self._run, name="request-profiler", daemon=True)
+            self._thread.start()
+
+    def _run(self):
+        own = threading.get_ident()
+        while True:
+            time.sleep(self.interval)
+            with self._lock:
+                if not self._active:
+                    continue
+                frames = sys._current_frames()
+                for ident, samples in self._active.items():
+                    frame = frames.get(ident)
+                    if frame is not None and ident != own:
+                        samples[fold_stack(frame)] += 1
+
+    def begin(self, thread):
+        with self._lock:
+            self._active[thread] = Counter()
+
+    def end(self, thread):
+        with self._lock:
+            return self._active.pop(thread, Counter())
+
+
+sampler = StackSampler(PROFILE_INTERVAL_MS / 1000) if PROFILE_SLOW_MS > 0 else None
+
+
+def write_profile(route, elapsed, samples, directory=PROFILE_DIR):
+    os.makedirs(directory, exist_ok=True)
+    slug = re.sub(r"[^A-Za-z0-9]+", "-", route).strip("-") or "root"
+    path = os.path.join(directory, f"{time.strftime('%Y%m%d-%H%M%S')}-{elapsed * 1000:.0f}ms-{slug}.folded")
+    with open(path, "w") as f:
+        for stack, count in samples.most_common():
+            f.write(f"{stack} {count}\n")
+    return path
+
+
+# ---------------- Hooks ----------------
+def begin_request():
+    record = RequestRecord()
+    _current.set(record)
+    if sampler is not None:
+        sampler.begin(record.thread)
+
+
+def finish_request(route, method, status):
+    record = _current.get()
+    if record is None:
+        return
+    elapsed = time.perf_counter() - record.started
+    metrics.observe(route, method, status, record, elapsed)
+    if sampler is not None:
+        samples = sampler.end(record.thread)
+        if elapsed * 1000 >= PROFILE_SLOW_MS and samples:
+            try:
+                path = write_profile(route, elapsed, samples)
+                with metrics._lock:
+                    metrics.profiles_written += 1
+                logger.info(f"Slow request profile ({elapsed * 1000:.0f} ms, {route}): {path}")
+            except Exception as e:
+                logger.error(f"Error in write_profile: {str(e)}")
+
+
+def end_request():
+    record = _current.get()
+    if record is not None and sampler is not None:
+        sampler.end(record.thread)
+    _current.set(None)
+
+
+def _route(request):
+    # The rule, not the path, so a route with URL variables stays one series
+    return request.url_rule.rule if request.url_rule is not None else "unmatched"
+
+
+def init_app(app):
+    """Time every request of a Flask app."""
+    from flask import request
+
+    if sampler is not None:
+        sampler.start()
+
+    @app.before_request
+    def _begin():
+        begin_request()
+
+    @app.after_request
+    def _finish(response):
+        finish_request(_route(request), request.method, response.status_code)
+        return response
+
+    @app.teardown_request
+    def _end(exc=None):
+        end_request()
+
+
+def init_async_app(app):
+    """Time every request of a Quart app (no profiler: requests share the event loop thread)."""
+    from quart import request
+
+    @app.before_request
+    async def _begin():
+        _current.set(RequestRecord())
+
+    @app.after_request
+    async def _finish(response):
+        finish_request(_route(request), request.method, response.status_code)
+        return response
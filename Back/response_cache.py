@@ -0,0 +1,211 @@
+"""
+Dashboard response cache with ETag/304 revalidation.
+
+Routes decorated with @cached (@cached_async in asgi_app.py) are answered
+from memory per (route, query string, data version). The data version is
+the data_version counter every write path bumps in its own transaction
+(migration 003). It is re-read at most every DATA_VERSION_POLL_SECONDS,
+and at once after a write made by this process (data_events), so an
+unchanged reload costs no database query. With the Parquet backend the
+time of the last export is part of the version too.
+
+Responses carry an ETag (a hash of the body) and `Cache-Control:
+no-cache`, so browsers revalidate every time and get a bodiless 304 while
+the data is unchanged.
+
+A route that fell back to sample or error data calls dont_cache() so the
+fallback is not cached.
+"""
+import contextvars
+import functools
+import hashlib
+import logging
+import threading
+import time
+from typing import NamedTuple, Optional
+from urllib.parse import urlencode
+
+import analytics_store
+import data_events
+import datastore
+from config import (ANALYTICS_BACKEND, RESPONSE_CACHE_ENABLED, RESPONSE_CACHE_SIZE, RESPONSE_CACHE_TTL,
+                    DATA_VERSION_POLL_SECONDS)
+from prediction_cache import MemoryStore
+
+logger = logging.getLogger(__name__)
+
+CACHE_CONTROL = "no-cache"
+
+
+class DataVersion:
+    """The data version, read from the database at most every `poll` seconds."""
+
+    def __init__(self, poll=DATA_VERSION_POLL_SECONDS):
+        self.poll = poll
+        self._version = None
+        self._checked = None
+        self.reads = 0
+
+    def _due(self):
+        return self._checked is None or time.monotonic() - self._checked >= self.poll
+
+    def _store(self, version):
+        self._version = version
+        self._checked = time.monotonic()
+        self.reads += 1
+
+    def _token(self):
+        if self._version is None:
+            return None
+        if ANALYTICS_BACKEND == "parquet":
+            return f"{self._version}.{analytics_store.data_version()}"
+        return str(self._version)
+
+    def current(self) -> Optional[str]:
+        """Version token, or None when it cannot be read (the cache is bypassed)."""
+        if self._due():
+            try:
+                self._store(datastore.data_version())
+            except Exception as e:
+                logger.error(f"Error in DataVersion.current: {str(e)}")
+                self._store(None)
+        return self._token()
+
+    async def current_async(self) -> Optional[str]:
+        if self._due():
+            import async_datastore
+            try:
+                self._store(await async_datastore.data_version())
+            except Exception as e:
+                logger.error(f"Error in DataVersion.current_async: {str(e)}")
+                self._store(None)
+        return self._token()
+
+    def invalidate(self, campaign_names=None):
+        """data_events listener: re-read the version on the next request."""
+        self._checked = None
+
+
+class CachedResponse(NamedTuple):
+    body: bytes
+    etag: str
+    mimetype: str
+
+
+class ResponseCache:
+    def __init__(self, max_entries=RESPONSE_CACHE_SIZE, ttl=RESPONSE_CACHE_TTL):
+        self.store = MemoryStore(max_entries, ttl)
+        # hit/miss/bypass count lookups; not_modified counts the 304s among them
+        self._counts = {"hit": 0, "miss": 0, "bypass": 0, "not_modified": 0}
+        self._lock = threading.Lock()
+
+    def count(self, outcome):
+        with self._lock:
+            self._counts[outcome] += 1
+
+    def get(self, key) -> Optional[CachedResponse]:
+        return self.store.get(key)
+
+    def set(self, key, body, mimetype) -> CachedResponse:
+        entry = CachedResponse(body, hashlib.blake2b(body, digest_size=12).hexdigest(), mimetype)
+        self.store.set(key, entry)
+        return entry
+
+    def counts(self):
+        with self._lock:
+            return dict(self._counts)
+
+    def stats(self):
+        counts = self.counts()
+        lookups = counts["hit"] + counts["miss"]
+        return {
+            **counts,
+            "hit_rate": round(counts["hit"] / lookups, 4) if lookups else 0.0,
+            "not_modified_rate": round(counts["not_modified"] / lookups, 4) if lookups else 0.0,
+            "entries": self.store.size(),
+            "data_version": data_version._token(),
+            "version_reads": data_version.reads
+        }
+
+
+data_version = DataVersion()
+cache = ResponseCache()
+data_events.subscribe(data_version.invalidate)
+
+_uncacheable = contextvars.ContextVar("adintelli_uncacheable", default=False)
+
+
+def dont_cache():
+    """Keep the current response out of the cache (sample or error fallbacks)."""
+    _uncacheable.set(True)
+
+
+def cache_key(request, version):
+    query = urlencode(sorted(request.args.items(multi=True)))
+    return f"{version}|{request.path}|{query}"
+
+
+def _cacheable(response):
+    return response.status_code == 200 and not getattr(response, "is_streamed", False) and not _uncacheable.get()
+
+
+def _reply(response_class, request, entry, outcome):
+    cache.count(outcome)
+    if request.if_none_match.contains_weak(entry.etag):
+        cache.count("not_modified")
+        response = response_class(status=304)
+    else:
+        response = response_class(entry.body, mimetype=entry.mimetype)
+    response.set_etag(entry.etag)
+    response.headers["Cache-Control"] = CACHE_CONTROL
+    return response
+
+
+def cached(view):
+    """Serve a Flask GET route from the response cache."""
+    from flask import Response, make_response, request
+
+    @functools.wraps(view)
+    def wrapper(*args, **kwargs):
+        version = data_version.current() if RESPONSE_CACHE_ENABLED else None
+        if version is None:
+            return view(*args, **kwargs)
+        key = cache_key(request, version)
+        entry = cache.get(key)
+        outcome = "hit"
+        if entry is None:
+            _uncacheable.set(False)
+            response = make_response(view(*args, **kwargs))
+            if not _cacheable(response):
+                cache.count("bypass")
+                return response
+            entry = cache.set(key, response.get_data(), response.mimetype)
+            outcome = "miss"
+        return _reply(Response, request, entry, outcome)
+
+    return wrapper
+
+
+def cached_async(view):
+    """Serve a Quart GET route from the response cache."""
+    from quart import Response, make_response, request
+
+    @functools.wraps(view)
+    async def wrapper(*args, **kwargs):
+        version = await data_version.current_async() if RESPONSE_CACHE_ENABLED else None
+        if version is None:
+            return await view(*args, **kwargs)
+        key = cache_key(request, version)
+        entry = cache.get(key)
+        outcome = "hit"
+        if entry is None:
+            _uncacheable.set(False)
+            response = await make_response(await view(*args, **kwargs))
+            if not _cacheable(response):
+                cache.count("bypass")
+                return response
+            entry = cache.set(key, await response.get_data(), response.mimetype)
+            outcome = "miss"
+        return _reply(Response, request, entry, outcome)
+
+    return wrapper
@@ -0,0 +1,158 @@
+"""
+Maintenance of the campaign_daily_rollup table (see migrations/002).
+
+The dashboard trend and breakdown endpoints read from the rollup instead of
+aggregating the raw campaigns table on every request. Writers keep it in
+step incrementally:
+
+- apply_ad_ids() adds rows that were just inserted (ingest.py, for
+  Ad_IDs that were not in campaigns yet)
+- refresh_dates() recomputes whole days, for bulk loads and for upserts
+  that overwrote an existing Ad_ID (they can move a row between days, so
+  plain addition is not enough)
+- rebuild() recomputes everything from campaigns
+
+Usage:
+    python rollup.py rebuild
+    python rollup.py check
+"""
+import argparse
+import logging
+
+import mysql.connector
+
+from config import DB_CONFIG
+
+logger = logging.getLogger(__name__)
+
+ROLLUP_TABLE = "campaign_daily_rollup"
+UNDATED = "1000-01-01"
+
+# Key expressions shared by every write path so incremental updates and
+# rebuilds always bucket a row the same way.
+DATE_EXPR = f"COALESCE(DATE(NULLIF(Ad_Date, '')), '{UNDATED}')"
+KEY_SELECT = f"""
+    {DATE_EXPR} AS rollup_date,
+    COALESCE(Platform, '') AS Platform,
+    COALESCE(Device, '') AS Device,
+    COALESCE(Keyword, '') AS Keyword
+"""
+GROUP_KEY = f"{DATE_EXPR}, COALESCE(Platform, ''), COALESCE(Device, ''), COALESCE(Keyword, '')"
+METRICS_SELECT = """
+    COUNT(*),
+    COALESCE(SUM(Impressions), 0),
+    COALESCE(SUM(Clicks), 0),
+    COALESCE(SUM(Conversions), 0),
+    COALESCE(SUM(Cost), 0),
+    COALESCE(SUM(Sale_Amount), 0)
+"""
+COLUMNS = "rollup_date, Platform, Device, Keyword, row_count, impressions, clicks, conversions, cost, sale_amount"
+
+
+def _insert_select(where=""):
+    return f"""
+        INSERT INTO {ROLLUP_TABLE} ({COLUMNS})
+        SELECT {KEY_SELECT}, {METRICS_SELECT}
+        FROM campaigns
+        {where}
+        GROUP BY {GROUP_KEY}
+    """
+
+
+def apply_ad_ids(cursor, ad_ids):
+    """
+    Add freshly inserted campaigns rows to the rollup.
+
+    Run in the same transaction as the INSERT so the rollup never drifts
+    from the raw table.
+    """
+    ad_ids = list(ad_ids)
+    if not ad_ids:
+        return
+    placeholders = ", ".join(["%s"] * len(ad_ids))
+    cursor.execute(_insert_select(f"WHERE Ad_ID IN ({placeholders})") + """
+        ON DUPLICATE KEY UPDATE
+            row_count = row_count + VALUES(row_count),
+            impressions = impressions + VALUES(impressions),
+            clicks = clicks + VALUES(clicks),
+            conversions = conversions + VALUES(conversions),
+            cost = cost + VALUES(cost),
+            sale_amount = sale_amount + VALUES(sale_amount)
+    """, tuple(ad_ids))
+
+
+def refresh_dates(cursor, dates):
+    """Recompute the rollup for the given days, e.g. after a bulk load."""
+    dates = sorted({str(d) if d else UNDATED for d in dates})
+    if not dates:
+        return
+    placeholders = ", ".join(["%s"] * len(dates))
+    cursor.execute(f"DELETE FROM {ROLLUP_TABLE} WHERE rollup_date IN ({placeholders})", tuple(dates))
+    cursor.execute(_insert_select(f"WHERE {DATE_EXPR} IN ({placeholders})"), tuple(dates))
+
+
+def rebuild(cursor):
+    """Recompute the whole rollup from campaigns (DELETE, not TRUNCATE, so it stays transactional)."""
+    cursor.execute(f"DELETE FROM {ROLLUP_TABLE}")
+    cursor.execute(_insert_select())
+
+
+def check_consistency(cursor):
+    """
+    Compare per-day totals in the rollup with the raw campaigns table.
+
+    Returns a list of mismatching days; an empty list means the rollup is
+    consistent.
+    """
+    cursor.execute(f"""
+        SELECT {DATE_EXPR} AS d, {METRICS_SELECT}
+        FROM campaigns
+        GROUP BY {DATE_EXPR}
+    """)
+    raw = {str(row[0]): tuple(float(v) for v in row[1:]) for row in cursor.fetchall()}
+
+    cursor.execute(f"""
+        SELECT rollup_date, SUM(row_count), SUM(impressions), SUM(clicks),
+               SUM(conversions), SUM(cost), SUM(sale_amount)
+        FROM {ROLLUP_TABLE}
+        GROUP BY rollup_date
+    """)
+    rolled = {str(row[0]): tuple(float(v) for v in row[1:]) for row in cursor.fetchall()}
+
+    mismatches = []
+    for day in sorted(set(raw) | set(rolled)):
+        expected = raw.get(day)
+        actual = rolled.get(day)
+        if expected is None or actual is None or any(abs(a - b) > 0.01 for a, b in zip(expected, actual)):
+            mismatches.append({"date": day, "raw": expected, "rollup": actual})
+    return mismatches
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Maintain the campaign_daily_rollup table")
+    parser.add_argument("command", choices=["rebuild", "check"])
+    args = parser.parse_args()
+
+    conn = mysql.connector.connect(**DB_CONFIG)
+    cursor = conn.cursor()
+    try:
+        if args.command == "rebuild":
+            rebuild(cursor)
+            conn.commit()
+            cursor.execute(f"SELECT COUNT(*) FROM {ROLLUP_TABLE}")
+            print(f"✅ Rebuilt {ROLLUP_TABLE}: {cursor.fetchone()[0]} rows")
+        else:
+            mismatches = check_consistency(cursor)
+            if mismatches:
+                print(f"❌ {len(mismatches)} day(s) differ between campaigns and {ROLLUP_TABLE}:")
+                for m in mismatches[:20]:
+                    print(f"   {m['date']}: raw={m['raw']} rollup={m['rollup']}")
+                raise SystemExit(1)
+            print(f"✅ {ROLLUP_TABLE} is consistent with campaigns")
+    finally:
+        cursor.close()
+        conn.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -223,21 +223,58 @@ export function AIActionPanel() {
     setInputValue("");
     setIsSending(true);
 
-    // API call to Flask /chat
-    const res = await fetch("http://127.0.0.1:5000/chat", {
-      method: "POST",
-      headers: { "Content-Type": "application/json" },
-      body: JSON.stringify({ message: trimmed }),
-    });
-    const data = await res.json();
-    const assistantText = data.reply;
+    const botId = `${Date.now()}-bot`;
+    setMessages((m) => [
+      ...m,
+      { id: botId, role: "assistant" as const, content: "" },
+    ]);
+    const updateReply = (text: string, replace = false) =>
+      setMessages((m) =>
+        m.map((msg) =>
+          msg.id === botId
+            ? { ...msg, content: replace ? text : msg.content + text }
+            : msg
+        )
+      );
 
-    const botMsg = {
-      id: `${Date.now()}-bot`,
-      role: "assistant" as const,
-      content: assistantText,
-    };
-    setMessages((m) => [...m, botMsg]);
+    try {
+      // API call to Flask /chat/stream: the reply arrives token by token as
+      // Server-Sent Events ("token", then "done" or "error")
+      const res = await fetch("http://127.0.0.1:5000/chat/stream", {
+        method: "POST",
+        headers: { "Content-Type": "application/json" },
+        body: JSON.stringify({ message: trimmed }),
+      });
+      const isStream = (res.headers.get("content-type") ?? "").includes(
+        "text/event-stream"
+      );
+      if (!res.body || !isStream) {
+        const data = await res.json();
+        updateReply(data.reply, true);
+      } else {
+        const reader = res.body.getReader();
+        const decoder = new TextDecoder();
+        let buffer = "";
+        while (true) {
+          const { done, value } = await reader.read();
+          if (done) break;
+          buffer += decoder.decode(value, { stream: true });
+          const events = buffer.split("\n\n");
+          buffer = events.pop() ?? "";
+          for (const raw of events) {
+            const event = raw.match(/^event: (.*)$/m)?.[1];
+            const data = raw.match(/^data: (.*)$/m)?.[1];
+            if (!event || !data) continue;
+            const payload = JSON.parse(data);
+            if (event === "token") updateReply(payload.text);
+            else updateReply(payload.reply, true);
+          }
+        }
+      }
+    } catch (error) {
+      console.error("Chat request failed:", error);
+      updateReply("Could not reach the assistant, please try again.", true);
+    }
 
     setIsSending(false);
     const el = scrollRef.current;
@@ -1,6 +1,6 @@
 "use client";
 
-import { useState } from "react";
+import { useEffect, useState } from "react";
 import {
   Card,
   CardContent,
@@ -82,8 +82,62 @@ const allocationData = [
   { platform: "Twitter", current: 10, recommended: 8, performance: 2.8 },
 ];
 
+const FLASK_BASE_URL = "http://localhost:5000";
+const SLIDER_MIN = 10000;
+const SLIDER_MAX = 100000;
+const SLIDER_STEP = 5000;
+const SLIDER_LEVELS = Array.from(
+  { length: (SLIDER_MAX - SLIDER_MIN) / SLIDER_STEP + 1 },
+  (_, i) => SLIDER_MIN + i * SLIDER_STEP
+);
+
+type SimulationTotal = {
+  spend: number[];
+  revenue: number[];
+  roas: number[];
+  conversions: number[];
+};
+
 export function BudgetOptimization() {
   const [budgetSlider, setBudgetSlider] = useState([75000]);
+  const [simulation, setSimulation] = useState<SimulationTotal | null>(null);
+
+  // One request simulates every slider level for the top campaigns by
+  // spend; moving the slider then only reads the returned curve
+  useEffect(() => {
+    const fetchSimulation = async () => {
+      try {
+        const campaigns = await fetch(
+          `${FLASK_BASE_URL}/getAllCampaigns?limit=50&sort=cost&order=desc`
+        ).then((res) => res.json());
+        if (!Array.isArray(campaigns) || !campaigns.length) return;
+        const res = await fetch(`${FLASK_BASE_URL}/simulateBudget`, {
+          method: "POST",
+          headers: { "Content-Type": "application/json" },
+          body: JSON.stringify({
+            ad_ids: campaigns.map((c) => c.ad_id),
+            total_budgets: SLIDER_LEVELS,
+          }),
+        });
+        if (res.ok) setSimulation((await res.json()).total);
+      } catch (error) {
+        console.error("Error fetching budget simulation:", error);
+      }
+    };
+    fetchSimulation();
+  }, []);
+
+  const level = SLIDER_LEVELS.indexOf(budgetSlider[0]);
+  const simulated = simulation && level >= 0;
+  const projectedConversions = simulated
+    ? Math.round(simulation.conversions[level])
+    : Math.round(budgetSlider[0] * 0.012);
+  const projectedRoas = simulated
+    ? simulation.roas[level]
+    : 4.2 + (budgetSlider[0] - 75000) * 0.00001;
+  const projectedRevenue = simulated
+    ? simulation.revenue[level]
+    : budgetSlider[0] * 4.2;
 
   const getStatusColor = (status: string) => {
     switch (status) {
@@ -353,9 +407,9 @@ export function BudgetOptimization() {
               <Slider
                 value={budgetSlider}
                 onValueChange={setBudgetSlider}
-                max={100000}
-                min={10000}
-                step={5000}
+                max={SLIDER_MAX}
+                min={SLIDER_MIN}
+                step={SLIDER_STEP}
                 className="mt-2"
               />
             </div>
@@ -366,19 +420,19 @@ export function BudgetOptimization() {
                   Projected Conversions
                 </p>
                 <p className="text-2xl font-bold">
-                  {Math.round(budgetSlider[0] * 0.012)}
+                  {projectedConversions}
                 </p>
               </div>
               <div className="p-4 bg-muted rounded-lg">
                 <p className="text-sm text-muted-foreground">Estimated ROAS</p>
                 <p className="text-2xl font-bold">
-                  {(4.2 + (budgetSlider[0] - 75000) * 0.00001).toFixed(1)}x
+                  {projectedRoas.toFixed(1)}x
                 </p>
               </div>
               <div className="p-4 bg-muted rounded-lg">
                 <p className="text-sm text-muted-foreground">Revenue Impact</p>
                 <p className="text-2xl font-bold">
-                  ${Math.round(budgetSlider[0] * 4.2).toLocaleString()}
+                  ${Math.round(projectedRevenue).toLocaleString()}
                 </p>
               </div>
             </div>
@@ -117,91 +117,23 @@ export function ExecutiveOverview() {
   const FLASK_BASE_URL = "http://localhost:5000";
 
   useEffect(() => {
-    const fetchROI = async () => {
+    const fetchExecutiveSummary = async () => {
       try {
         setLoading(true);
-        const res = await fetch("http://127.0.0.1:5000/getROI");
+        const res = await fetch(`${FLASK_BASE_URL}/getExecutiveSummary`);
         const data = await res.json();
-        if (typeof data.roi === "number") {
+        if (typeof data.roi === "number" && Array.isArray(data.platforms)) {
           setRoi(data.roi);
-        } else {
-          throw new Error("Invalid ROI data");
-        }
-      } catch (err) {
-        setError(err instanceof Error ? err.message : "Failed to load ROI");
-      } finally {
-        setLoading(false);
-      }
-    };
-
-    const fetchCTR = async () => {
-      try {
-        setLoading(true);
-        const res = await fetch("http://127.0.0.1:5000/getCTR");
-        const data = await res.json();
-        if (typeof data.ctr === "number") {
           setCtr(data.ctr);
-        } else {
-          throw new Error("Invalid CTR data");
-        }
-      } catch (err) {
-        setError(err instanceof Error ? err.message : "Failed to load CTR");
-      } finally {
-        setLoading(false);
-      }
-    };
-
-    const fetchConversions = async () => {
-      try {
-        setLoading(true);
-        const res = await fetch("http://127.0.0.1:5000/getConversions");
-        const data = await res.json();
-        if (typeof data.total_conversions === "number") {
           setConversions(data.total_conversions);
-        } else {
-          throw new Error("Invalid conversions data");
-        }
-      } catch (err) {
-        setError(
-          err instanceof Error ? err.message : "Failed to load conversions"
-        );
-      } finally {
-        setLoading(false);
-      }
-    };
-
-    const fetchCampaignScore = async () => {
-      try {
-        setLoading(true);
-        const res = await fetch("http://127.0.0.1:5000/getCampaignScore");
-        const data = await res.json();
-        if (typeof data.campaign_score === "number") {
           setCampaignScore(data.campaign_score);
+          setPlatformMetrics(data.platforms);
         } else {
-          throw new Error("Invalid Campaign Score data");
-        }
-      } catch (err) {
-        setError(
-          err instanceof Error ? err.message : "Failed to load Campaign Score"
-        );
-      } finally {
-        setLoading(false);
-      }
-    };
-
-    const fetchPlatformData = async () => {
-      try {
-        setLoading(true);
-        const res = await fetch("http://127.0.0.1:5000/getPlatformData");
-        const data = await res.json();
-        if (Array.isArray(data)) {
-          setPlatformMetrics(data);
-        } else {
-          throw new Error("Invalid platform data");
+          throw new Error("Invalid executive summary data");
         }
       } catch (err) {
         setError(
-          err instanceof Error ? err.message : "Failed to load platform data"
+          err instanceof Error ? err.message : "Failed to load executive summary"
         );
       } finally {
         setLoading(false);
@@ -249,11 +181,7 @@ export function ExecutiveOverview() {
     };
     fetchKpiData();
     fetchCampaignPerformance();
-    fetchPlatformData();
-    fetchCampaignScore();
-    fetchConversions();
-    fetchROI();
-    fetchCTR();
+    fetchExecutiveSummary();
   }, []);
 
   const getPerformanceColor = (performance: string) => {
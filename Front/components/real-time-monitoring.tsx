@@ -86,6 +86,13 @@ const liveAlerts = [
   },
 ];
 
+// Server alerts carry an ISO timestamp; show it the way the samples above do
+const timeAgo = (iso: string) => {
+  const minutes = Math.round((Date.now() - new Date(iso).getTime()) / 60000);
+  if (minutes < 1) return "just now";
+  return minutes === 1 ? "1 minute ago" : `${minutes} minutes ago`;
+};
+
 const liveMetrics = [
   { label: "Active Campaigns", value: 12, change: 0, trend: "stable" },
   { label: "Live Impressions", value: 45672, change: 8.2, trend: "up" },
@@ -109,6 +116,21 @@ export function RealTimeMonitoring() {
     total_cpc: 0,
   });
 
+  // Sample alerts until the anomaly detector has raised some
+  const [alerts, setAlerts] = useState(liveAlerts);
+
+  const fetchAlerts = async () => {
+    try {
+      const res = await fetch("http://localhost:5000/getAlerts?limit=4");
+      const data = await res.json();
+      if (Array.isArray(data) && data.length) {
+        setAlerts(data.map((alert) => ({ ...alert, time: timeAgo(alert.time) })));
+      }
+    } catch (error) {
+      console.error("Error fetching alerts:", error);
+    }
+  };
+
   const fetchLiveMetrics = async () => {
     try {
       await fetch("http://localhost:5000/realTime") // your Flask URL
@@ -122,16 +144,36 @@ export function RealTimeMonitoring() {
   };
 
   useEffect(() => {
-    fetchLiveMetrics(); // initial fetch
-    if (!autoRefresh) return;
+    fetchAlerts();
+    if (!autoRefresh) {
+      fetchLiveMetrics(); // one-off snapshot while paused
+      return;
+    }
+
+    // Server pushes a full snapshot on connect, then only changed fields
+    const source = new EventSource("http://localhost:5000/realTime/stream");
+    source.addEventListener("snapshot", (event) => {
+      setLiveMetricsData(JSON.parse((event as MessageEvent).data));
+      setLastUpdate(new Date());
+    });
+    source.addEventListener("delta", (event) => {
+      const delta = JSON.parse((event as MessageEvent).data);
+      setLiveMetricsData((prev) => ({ ...prev, ...delta }));
+      setLastUpdate(new Date());
+    });
+    source.onerror = (error) => {
+      console.error("Live metrics stream error:", error); // EventSource reconnects on its own
+    };
 
     const interval = setInterval(() => {
-      fetchLiveMetrics();
       setRealTimeData(generateRealTimeData()); // optional chart update
-      setLastUpdate(new Date());
+      fetchAlerts();
     }, 15000); // 15 seconds
 
-    return () => clearInterval(interval);
+    return () => {
+      source.close();
+      clearInterval(interval);
+    };
   }, [autoRefresh]);
 
   const metricsArray = [
@@ -364,7 +406,7 @@ export function RealTimeMonitoring() {
         </CardHeader>
         <CardContent>
           <div className="space-y-4">
-            {liveAlerts.map((alert) => (
+            {alerts.map((alert) => (
               <div
                 key={alert.id}
                 className={`p-4 border rounded-lg ${getAlertColor(alert.type)}`}